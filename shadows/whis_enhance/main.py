@@ -5,8 +5,15 @@ import json
 import requests
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from urllib.parse import urlencode
 import os
 
+SMITHING_URL = os.getenv("SMITHING_URL", "http://whis_smithing:8000")
+CATALOG_PAGE_SIZE = 1000
+MAX_CACHED_PAGES = 256
+# Catalog page URL -> (ETag, parsed page)
+_catalog_pages: Dict[str, tuple] = {}
+
 app = FastAPI(
     title="Whis Enhance Service",
     description="Handles agent enhancement, training, and approval logic for Whis AI",
@@ -154,13 +161,43 @@ async def get_capability_matrix():
         return {"status": "error", "error": str(e)}
 
 
+def fetch_smithing_catalog(kind: str) -> List[Dict[str, Any]]:
+    """Every ORB or RUNE, following smithing's cursor pages
+
+    Pages are revalidated with their ETag, so an unchanged catalog comes
+    back as bodiless 304s and is served from the copy kept here.
+    """
+    items = []
+    cursor = None
+    while True:
+        params = {"limit": CATALOG_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        url = f"{SMITHING_URL}/{kind}?{urlencode(params)}"
+        cached = _catalog_pages.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = requests.get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            page = cached[1]
+        elif response.status_code == 200:
+            page = response.json()
+            if response.headers.get("ETag"):
+                # Cursors change with the catalog, so old URLs are never reused
+                if len(_catalog_pages) >= MAX_CACHED_PAGES:
+                    _catalog_pages.clear()
+                _catalog_pages[url] = (response.headers["ETag"], page)
+        else:
+            return []
+        items.extend(page.get(kind, []))
+        cursor = page.get("next_cursor")
+        if not cursor:
+            return items
+
+
 async def load_orbs_from_smithing() -> List[Dict[str, Any]]:
     """Load ORBs from the smithing service"""
     try:
-        response = requests.get("http://whis_smithing:8000/orbs", timeout=10)
-        if response.status_code == 200:
-            return response.json().get("orbs", [])
-        return []
+        return fetch_smithing_catalog("orbs")
     except Exception:
         return []
 
@@ -168,10 +205,7 @@ async def load_orbs_from_smithing() -> List[Dict[str, Any]]:
 async def load_runes_from_smithing() -> List[Dict[str, Any]]:
     """Load RUNEs from the smithing service"""
     try:
-        response = requests.get("http://whis_smithing:8000/runes", timeout=10)
-        if response.status_code == 200:
-            return response.json().get("runes", [])
-        return []
+        return fetch_smithing_catalog("runes")
     except Exception:
         return []
 
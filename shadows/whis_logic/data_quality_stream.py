@@ -0,0 +1,453 @@
+"""
+Streaming Data Quality - Chunked dataset profiling
+Reads CSV, Parquet and Arrow IPC files chunk by chunk and accumulates the
+statistics behind the MLOps engine's data quality report in bounded memory
+"""
+
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+_HASH_SPACE = float(2**64)
+
+
+def _json_float(value: float) -> Optional[float]:
+    """Report NaN/inf statistics as null so the report stays JSON-serializable"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def detect_file_format(path: str, file_format: Optional[str] = None) -> str:
+    """Resolve the dataset format from an explicit hint or the file extension"""
+    if file_format:
+        file_format = file_format.lower()
+        if file_format not in set(FILE_FORMATS.values()):
+            raise ValueError(f"Unsupported file format: {file_format}")
+        return file_format
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FILE_FORMATS:
+        raise ValueError(f"Cannot infer file format from extension '{extension}'")
+    return FILE_FORMATS[extension]
+
+
+def iter_data_chunks(
+    path: str, file_format: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Yield a dataset as DataFrames of at most chunk_size rows"""
+    file_format = detect_file_format(path, file_format)
+
+    if file_format == "csv":
+        with pd.read_csv(path, chunksize=chunk_size) as reader:
+            for chunk in reader:
+                yield chunk
+        return
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(f"pyarrow is required to read {file_format} files") from e
+
+    if file_format == "parquet":
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    # Arrow IPC: random-access file format first, then the streaming format
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            batches = pa.ipc.open_stream(source)
+
+        for batch in batches:
+            for offset in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(offset, chunk_size).to_pandas()
+
+
+class DataQualityAccumulator:
+    """Accumulates data quality statistics across DataFrame chunks
+
+    Counts, means, variances, correlations and duplicate detection are exact.
+    Quantiles come from a uniform bottom-k sample per numeric column and
+    distinct counts from a k-minimum-values sketch, so memory stays bounded by
+    the sample sizes plus eight bytes per row for duplicate detection.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = 100_000,
+        distinct_sketch_size: int = 4096,
+        track_duplicates: bool = True,
+        seed: int = 42,
+    ):
+        self.sample_size = sample_size
+        self.distinct_sketch_size = distinct_sketch_size
+        self.track_duplicates = track_duplicates
+        self._rng = np.random.default_rng(seed)
+
+        self.row_count = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, np.dtype] = {}
+        self.null_counts: Dict[str, int] = {}
+        self.memory_usage: Dict[str, int] = {}
+
+        # Numeric columns fixed by the first chunk; columns that later turn
+        # non-numeric are dropped from numeric statistics
+        self.numeric_columns: List[str] = []
+        self._numeric_valid: Dict[str, bool] = {}
+        self._moments: Dict[str, Dict[str, float]] = {}
+        self._samples: Dict[str, np.ndarray] = {}
+        self._sample_keys: Dict[str, np.ndarray] = {}
+        self._distinct: Dict[str, np.ndarray] = {}
+        self._row_hashes: List[np.ndarray] = []
+
+        # Pairwise-complete sums for Pearson correlation
+        self._pair_n: Optional[np.ndarray] = None
+        self._pair_sum: Optional[np.ndarray] = None
+        self._pair_sumsq: Optional[np.ndarray] = None
+        self._pair_cross: Optional[np.ndarray] = None
+
+        self.outlier_fences: Dict[str, tuple] = {}
+        self.outlier_counts: Dict[str, int] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold one chunk into the running statistics"""
+        if chunk.empty:
+            return
+
+        if not self.columns:
+            self._init_columns(chunk)
+
+        for column in chunk.columns:
+            if column not in self.null_counts:
+                self.columns.append(column)
+                self.null_counts[column] = self.row_count
+                self.dtypes[column] = chunk[column].dtype
+
+        self.row_count += len(chunk)
+
+        for column, nulls in chunk.isnull().sum().items():
+            self.null_counts[column] += int(nulls)
+        for column in self.columns:
+            if column not in chunk.columns:
+                self.null_counts[column] += len(chunk)
+
+        for column, usage in chunk.memory_usage(deep=True).items():
+            self.memory_usage[column] = self.memory_usage.get(column, 0) + int(usage)
+
+        for column in chunk.columns:
+            self.dtypes[column] = self._merge_dtype(
+                self.dtypes[column], chunk[column].dtype
+            )
+
+        self._update_numeric(chunk)
+        self._update_distinct(chunk)
+
+        if self.track_duplicates:
+            self._row_hashes.append(self._hash_rows(chunk))
+
+    def compute_outlier_fences(self):
+        """Derive IQR outlier fences from the quantile samples"""
+        self.outlier_fences = {}
+        for column in self._active_numeric_columns():
+            sample = self._samples.get(column)
+            if sample is None or len(sample) == 0:
+                continue
+            q1, q3 = np.quantile(sample, [0.25, 0.75])
+            iqr = q3 - q1
+            self.outlier_fences[column] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+        self.outlier_counts = {column: 0 for column in self.outlier_fences}
+
+    def update_outliers(self, chunk: pd.DataFrame):
+        """Count values outside the IQR fences (second pass over the data)"""
+        for column, (lower, upper) in self.outlier_fences.items():
+            if column not in chunk.columns:
+                continue
+            values = pd.to_numeric(chunk[column], errors="coerce").to_numpy(
+                dtype=float, na_value=np.nan
+            )
+            self.outlier_counts[column] += int(
+                np.count_nonzero((values < lower) | (values > upper))
+            )
+
+    def to_report(self, max_duplicate_rows: int = 10_000) -> Dict[str, Any]:
+        """Build the report sections in the shape of detect_data_quality_issues"""
+        return {
+            "data_shape": (self.row_count, len(self.columns)),
+            "missing_values": self._missing_section(),
+            "duplicates": self._duplicates_section(max_duplicate_rows),
+            "outliers": self._outliers_section(),
+            "data_types": self._data_types_section(),
+            "statistical_analysis": self._statistics_section(),
+            "quality_score": 0.0,
+            "recommendations": [],
+        }
+
+    def _init_columns(self, chunk: pd.DataFrame):
+        """Fix the column order and the numeric column set from the first chunk"""
+        self.numeric_columns = list(chunk.select_dtypes(include=[np.number]).columns)
+        self._numeric_valid = {column: True for column in self.numeric_columns}
+        self._moments = {
+            column: {"count": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf}
+            for column in self.numeric_columns
+        }
+        width = len(self.numeric_columns)
+        self._pair_n = np.zeros((width, width))
+        self._pair_sum = np.zeros((width, width))
+        self._pair_sumsq = np.zeros((width, width))
+        self._pair_cross = np.zeros((width, width))
+
+    @staticmethod
+    def _merge_dtype(current: np.dtype, incoming: np.dtype) -> np.dtype:
+        """Promote a column dtype the way a single full read would"""
+        if current == incoming:
+            return current
+        if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(
+            incoming
+        ):
+            return np.result_type(current, incoming)
+        return np.dtype(object)
+
+    @staticmethod
+    def _is_text(dtype) -> bool:
+        return pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(
+            dtype
+        )
+
+    def _active_numeric_columns(self) -> List[str]:
+        return [c for c in self.numeric_columns if self._numeric_valid[c]]
+
+    def _update_numeric(self, chunk: pd.DataFrame):
+        if not self.numeric_columns:
+            return
+
+        matrix = np.full((len(chunk), len(self.numeric_columns)), np.nan)
+        for position, column in enumerate(self.numeric_columns):
+            if not self._numeric_valid[column] or column not in chunk.columns:
+                continue
+            series = chunk[column]
+            if not pd.api.types.is_numeric_dtype(series.dtype):
+                self._numeric_valid[column] = False
+                continue
+            matrix[:, position] = series.to_numpy(dtype=float, na_value=np.nan)
+
+        present = ~np.isnan(matrix)
+        filled = np.where(present, matrix, 0.0)
+        mask = present.astype(float)
+
+        # Pairwise-complete sums: entry [i, j] only covers rows where both
+        # column i and column j are present
+        self._pair_n += mask.T @ mask
+        self._pair_sum += filled.T @ mask
+        self._pair_sumsq += (filled * filled).T @ mask
+        self._pair_cross += filled.T @ filled
+
+        for position, column in enumerate(self.numeric_columns):
+            if not self._numeric_valid[column]:
+                continue
+            values = matrix[present[:, position], position]
+            if len(values) == 0:
+                continue
+            self._merge_moments(self._moments[column], values)
+            self._update_sample(column, values)
+
+    @staticmethod
+    def _merge_moments(moments: Dict[str, float], values: np.ndarray):
+        """Chan's parallel update of count, mean and sum of squared deviations"""
+        count_b = len(values)
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        count_a = moments["count"]
+        total = count_a + count_b
+        delta = mean_b - moments["mean"]
+
+        moments["mean"] += delta * count_b / total
+        moments["m2"] += m2_b + delta * delta * count_a * count_b / total
+        moments["count"] = total
+        moments["min"] = min(moments["min"], float(values.min()))
+        moments["max"] = max(moments["max"], float(values.max()))
+
+    def _update_sample(self, column: str, values: np.ndarray):
+        """Bottom-k sampling: keep the values with the smallest random keys"""
+        keys = self._rng.random(len(values))
+        if column in self._samples:
+            values = np.concatenate([self._samples[column], values])
+            keys = np.concatenate([self._sample_keys[column], keys])
+        if len(values) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[: self.sample_size]
+            values, keys = values[keep], keys[keep]
+        self._samples[column] = values
+        self._sample_keys[column] = keys
+
+    def _update_distinct(self, chunk: pd.DataFrame):
+        """K-minimum-values sketch of distinct non-null values per object column"""
+        for column in chunk.columns:
+            if not self._is_text(self.dtypes[column]):
+                continue
+            values = chunk[column].dropna()
+            if values.empty:
+                continue
+            hashes = pd.util.hash_array(values.to_numpy(dtype=object))
+            if column in self._distinct:
+                hashes = np.concatenate([self._distinct[column], hashes])
+            self._distinct[column] = np.unique(hashes)[: self.distinct_sketch_size]
+
+    def _estimate_distinct(self, column: str) -> int:
+        sketch = self._distinct.get(column)
+        if sketch is None:
+            return 0
+        if len(sketch) < self.distinct_sketch_size:
+            return len(sketch)
+        kth = float(sketch[-1]) + 1.0
+        return int((self.distinct_sketch_size - 1) * _HASH_SPACE / kth)
+
+    def _hash_rows(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Hash each row so equal rows collide regardless of chunk dtypes"""
+        frame = chunk.reindex(columns=self.columns)
+        for column in self._active_numeric_columns():
+            frame[column] = frame[column].astype(float)
+        return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+    def _missing_section(self) -> Dict[str, Any]:
+        total_missing = sum(self.null_counts.values())
+        cells = self.row_count * len(self.columns)
+        return {
+            "total_missing": total_missing,
+            "missing_percentage": (total_missing / cells) * 100 if cells else 0.0,
+            "columns_with_missing": [
+                column for column in self.columns if self.null_counts[column] > 0
+            ],
+            "missing_patterns": {
+                column: self.null_counts[column] for column in self.columns
+            },
+        }
+
+    def _duplicates_section(self, max_duplicate_rows: int) -> Dict[str, Any]:
+        if not self._row_hashes:
+            return {
+                "total_duplicates": 0,
+                "duplicate_percentage": 0.0,
+                "duplicate_rows": [],
+            }
+
+        hashes = np.concatenate(self._row_hashes)
+        _, first_seen = np.unique(hashes, return_index=True)
+        is_duplicate = np.ones(len(hashes), dtype=bool)
+        is_duplicate[first_seen] = False
+        duplicate_rows = np.flatnonzero(is_duplicate)
+        total_duplicates = len(duplicate_rows)
+
+        return {
+            "total_duplicates": total_duplicates,
+            "duplicate_percentage": (total_duplicates / len(hashes)) * 100,
+            "duplicate_rows": duplicate_rows[:max_duplicate_rows].tolist(),
+        }
+
+    def _outliers_section(self) -> Dict[str, Any]:
+        outlier_analysis = {
+            "outlier_columns": [],
+            "outlier_counts": {},
+            "outlier_percentages": {},
+        }
+        for column, count in self.outlier_counts.items():
+            if count > 0:
+                outlier_analysis["outlier_columns"].append(column)
+                outlier_analysis["outlier_counts"][column] = count
+                outlier_analysis["outlier_percentages"][column] = (
+                    count / self.row_count
+                ) * 100
+        return outlier_analysis
+
+    def _data_types_section(self) -> Dict[str, Any]:
+        type_analysis = {
+            "data_types": {column: str(self.dtypes[column]) for column in self.columns},
+            "memory_usage": dict(self.memory_usage),
+            "type_recommendations": [],
+        }
+        for column in self.columns:
+            if self._is_text(self.dtypes[column]) and self.row_count:
+                if self._estimate_distinct(column) / self.row_count < 0.5:
+                    type_analysis["type_recommendations"].append(
+                        f"Convert {column} to category"
+                    )
+        return type_analysis
+
+    def _statistics_section(self) -> Dict[str, Any]:
+        numeric_columns = self._active_numeric_columns()
+        summary = {}
+
+        for column in numeric_columns:
+            moments = self._moments[column]
+            count = moments["count"]
+            sample = self._samples.get(column)
+            if count and sample is not None:
+                quartiles = np.quantile(sample, [0.25, 0.5, 0.75]).tolist()
+            else:
+                quartiles = [np.nan, np.nan, np.nan]
+            statistics = {
+                "count": count,
+                "mean": moments["mean"] if count else np.nan,
+                "std": (moments["m2"] / (count - 1)) ** 0.5 if count > 1 else np.nan,
+                "min": moments["min"] if count else np.nan,
+                "25%": quartiles[0],
+                "50%": quartiles[1],
+                "75%": quartiles[2],
+                "max": moments["max"] if count else np.nan,
+            }
+            summary[column] = {
+                name: _json_float(value) for name, value in statistics.items()
+            }
+
+        if not numeric_columns:
+            # Mirrors describe() on an all-object frame, minus top/freq
+            for column in self.columns:
+                summary[column] = {
+                    "count": self.row_count - self.null_counts[column],
+                    "unique": self._estimate_distinct(column),
+                }
+
+        return {
+            "summary_statistics": summary,
+            "correlations": (
+                self._correlations(numeric_columns) if len(numeric_columns) > 1 else {}
+            ),
+            "distributions": {},
+        }
+
+    def _correlations(self, numeric_columns: List[str]) -> Dict[str, Dict[str, float]]:
+        """Pearson correlation over pairwise-complete observations"""
+        n = self._pair_n
+        sum_x = self._pair_sum
+        sum_y = self._pair_sum.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = n * self._pair_cross - sum_x * sum_y
+            variance_x = n * self._pair_sumsq - sum_x * sum_x
+            variance_y = n * self._pair_sumsq.T - sum_y * sum_y
+            matrix = covariance / np.sqrt(variance_x * variance_y)
+
+        positions = [self.numeric_columns.index(column) for column in numeric_columns]
+        return {
+            column_j: {
+                column_i: _json_float(matrix[i, j])
+                for column_i, i in zip(numeric_columns, positions)
+            }
+            for column_j, j in zip(numeric_columns, positions)
+        }
@@ -1,42 +1,212 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from logic.categorizer import categorize_task
 from logic.merger import dedupe_and_merge
 from logic.recurrence import update_recurrence
+from utils.counters import get_counters
 from utils.io import save_orb, save_rune
+from utils.segments import INDEX_FILE, read_record_at, read_records
 
 SANITIZED_DIR = "data_lake/sanitized_inputs/"
+MANIFEST_PATH = "storage/batch_manifest.json"
+BATCH_WORKERS = int(os.getenv("WHIS_BATCH_WORKERS", "4"))
+SEGMENT_CHUNK_RECORDS = 500
 
 
-def process_batch():
-    processed = []
-    for fname in os.listdir(SANITIZED_DIR):
-        with open(os.path.join(SANITIZED_DIR, fname)) as f:
-            data = json.load(f)
+def load_manifest(path=MANIFEST_PATH):
+    """Return what earlier runs consumed: loose files and the segment position
+
+    files maps legacy one-file-per-input names to their {"mtime_ns", "size"};
+    segment_position is the (segment, offset) to resume the segment store
+    from; failed_records lists record positions to retry.
+    """
+    manifest = {"files": {}, "segment_position": None, "failed_records": {}}
+    try:
+        with open(path) as f:
+            manifest.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"[WHIS] Batch manifest unreadable, reprocessing all inputs: {e}")
+    return manifest
+
+
+def save_manifest(manifest, failures, path=MANIFEST_PATH):
+    """Write the manifest atomically so a crash never leaves it half-written"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            dict(
+                manifest,
+                last_run=datetime.utcnow().isoformat(),
+                last_failures=failures,
+            ),
+            f,
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def find_new_inputs(files, sanitized_dir=SANITIZED_DIR):
+    """Return loose input files that are new or changed, plus all names seen"""
+    pending = []
+    present = set()
+    if not os.path.isdir(sanitized_dir):
+        return pending, present
+    with os.scandir(sanitized_dir) as entries:
+        for entry in entries:
+            if (
+                not entry.is_file()
+                or not entry.name.endswith(".json")
+                or entry.name == INDEX_FILE
+            ):
+                continue
+            present.add(entry.name)
+            stat = entry.stat()
+            key = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            if files.get(entry.name) != key:
+                pending.append((entry.name, entry.path, key))
+    return pending, present
+
+
+def process_record(data):
+    # Step 1: Generate orb & rune
+    orb, rune = generate_orb_and_rune(data)
+
+    # Step 2: Categorize
+    agent = categorize_task(data.get("task_description", ""))
+
+    # Step 3: Deduplication + Refinement
+    refined_orb, refined_rune = dedupe_and_merge(agent, orb, rune)
+
+    # Step 4: Track recurrence
+    updated_orb = update_recurrence(refined_orb)
+
+    # Step 5: Suggest update
+    # prompt = generate_update_prompt(updated_orb, refined_rune)  #
+    # unused
+
+    # Step 6: Save to agent logic
+    save_orb(agent, updated_orb)
+    save_rune(agent, refined_rune)
+    # save_approval_if_needed(agent, updated_orb, refined_rune)  #
+    # undefined
 
-        # Step 1: Generate orb & rune
-        orb, rune = generate_orb_and_rune(data)
 
-        # Step 2: Categorize
-        agent = categorize_task(data.get("task_description", ""))
+def _run_isolated(fn, item_id, arg):
+    try:
+        fn(arg)
+        return item_id, None
+    except Exception as e:
+        return item_id, str(e)
 
-        # Step 3: Deduplication + Refinement
-        refined_orb, refined_rune = dedupe_and_merge(agent, orb, rune)
 
-        # Step 4: Track recurrence
-        updated_orb = update_recurrence(refined_orb)
+def _load_file(path):
+    with open(path) as f:
+        process_record(json.load(f))
 
-        # Step 5: Suggest update
-        # prompt = generate_update_prompt(updated_orb, refined_rune)  #
-        # unused
 
-        # Step 6: Save to agent logic
-        save_orb(agent, updated_orb)
-        save_rune(agent, refined_rune)
-        # save_approval_if_needed(agent, updated_orb, refined_rune)  #
-        # undefined
+def _process_files(pool, manifest, processed, failures):
+    """Legacy loose JSON inputs written before the segment store existed"""
+    files = manifest["files"]
+    pending, present = find_new_inputs(files)
+    stale = [fname for fname in files if fname not in present]
+    for fname in stale:
+        del files[fname]
+
+    keys = {fname: key for fname, _, key in pending}
+    results = pool.map(
+        lambda item: _run_isolated(_load_file, item[0], item[1]), pending
+    )
+    for fname, error in results:
+        if error is None:
+            files[fname] = keys[fname]
+            processed.append(fname)
+        else:
+            print(f"[WHIS] Failed to process {fname}: {error}")
+            failures[fname] = error
+    return bool(pending or stale)
+
+
+def _process_segment_chunk(pool, chunk, manifest, processed, failures):
+    results = pool.map(
+        lambda item: _run_isolated(process_record, item[0], item[1]), chunk
+    )
+    for record_id, error in results:
+        if error is None:
+            processed.append(record_id)
+            manifest["failed_records"].pop(record_id, None)
+        else:
+            print(f"[WHIS] Failed to process record {record_id}: {error}")
+            failures[record_id] = error
+            manifest["failed_records"][record_id] = error
+
+
+def _process_segments(pool, manifest, processed, failures):
+    """Records appended to the segment store since the stored position"""
+    changed = False
+
+    # Retry records that failed on earlier runs
+    retries = []
+    for record_id in list(manifest["failed_records"]):
+        name, offset = record_id.rsplit(":", 1)
+        try:
+            record = read_record_at(SANITIZED_DIR, (name, int(offset)))
+        except (OSError, ValueError) as e:
+            print(f"[WHIS] Dropping unreadable record {record_id}: {e}")
+            del manifest["failed_records"][record_id]
+            changed = True
+            continue
+        retries.append((record_id, record.get("payload", record)))
+    if retries:
+        _process_segment_chunk(pool, retries, manifest, processed, failures)
+        changed = True
+
+    position = manifest["segment_position"]
+    chunk = []
+    for record, record_position, next_position in read_records(
+        SANITIZED_DIR, tuple(position) if position else None
+    ):
+        record_id = f"{record_position[0]}:{record_position[1]}"
+        chunk.append((record_id, record.get("payload", record)))
+        if len(chunk) >= SEGMENT_CHUNK_RECORDS:
+            _process_segment_chunk(pool, chunk, manifest, processed, failures)
+            manifest["segment_position"] = list(next_position)
+            save_manifest(manifest, failures)
+            chunk = []
+        position = next_position
+
+    if chunk:
+        _process_segment_chunk(pool, chunk, manifest, processed, failures)
+    if position and list(position) != manifest["segment_position"]:
+        manifest["segment_position"] = list(position)
+        changed = True
+    return changed
+
+
+def process_batch(max_workers=BATCH_WORKERS):
+    """Process only inputs that arrived since the last run
+
+    Segment store records are read from the position stored in a durable
+    manifest; legacy loose JSON files are skipped when their mtime and size
+    are unchanged. Work runs on a bounded thread pool, and a failing input is
+    reported and retried next run without affecting the rest of the batch.
+    """
+    manifest = load_manifest()
+    processed = []
+    failures = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        files_changed = _process_files(pool, manifest, processed, failures)
+        segments_changed = _process_segments(pool, manifest, processed, failures)
 
-        processed.append(fname)
+    if files_changed or segments_changed:
+        save_manifest(manifest, failures)
+    get_counters().incr("inputs_processed", len(processed))
 
     return processed
 
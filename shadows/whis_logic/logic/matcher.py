@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+STORAGE_DIR = "storage"
+MATCH_THRESHOLD = float(os.getenv("WHIS_MATCH_THRESHOLD", "0.8"))
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace so trivial edits still hit"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def extract_match_text(input_type: str, payload: dict) -> str:
+    """Pick the text that identifies a task pattern for a training payload"""
+    if input_type == "qna":
+        return payload.get("question", "")
+    for key in ("task_description", "description", "title", "content"):
+        value = payload.get(key)
+        if isinstance(value, str) and value:
+            return value
+    return json.dumps(payload, sort_keys=True)
+
+
+def orb_text(orb: dict) -> str:
+    return " ".join(
+        str(orb.get(field, ""))
+        for field in ("title", "description", "task_description")
+    )
+
+
+def rune_text(rune: dict) -> str:
+    return f"{rune.get('task_description', '')} {rune.get('script', '')}"
+
+
+def _optimal_bands(threshold: float, num_perm: int, false_negative_weight=0.9):
+    """Pick (bands, rows) minimizing weighted false positive/negative area
+
+    Candidates are re-scored against full signatures, so false positives only
+    cost a comparison while false negatives lose a match; recall is favored.
+    """
+    grid = np.linspace(0.0, 1.0, 1001)
+    below, above = grid[grid < threshold], grid[grid >= threshold]
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        false_positive = np.mean(1 - (1 - below**rows) ** bands) * threshold
+        false_negative = np.mean((1 - above**rows) ** bands) * (1 - threshold)
+        error = (
+            1 - false_negative_weight
+        ) * false_positive + false_negative_weight * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(1)
+        # a < 2^31 and 32-bit shingle hashes keep a*x+b inside uint64
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, normalized: str):
+        if len(normalized) <= self.shingle_size:
+            return {normalized}
+        k = self.shingle_size
+        return {normalized[i : i + k] for i in range(len(normalized) - k + 1)}
+
+    def signature(self, normalized: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(s.encode(), digest_size=4).digest(), "little"
+                )
+                for s in self.shingles(normalized)
+            ),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+
+class PatternIndex:
+    """Exact + MinHash/LSH lookup over stored orbs and runes"""
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD, num_perm: int = NUM_PERM):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self._exact = {}
+        self._signatures = {}
+        self._entries = {}
+        self._buckets = [dict() for _ in range(self.bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows : (band + 1) * self.rows]
+            yield band, chunk.tobytes()
+
+    def add(self, key: str, text: str, entry: dict):
+        normalized = normalize_text(text)
+        if not normalized:
+            return
+        signature = self.hasher.signature(normalized)
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = dict(entry, fingerprint=fingerprint)
+            self._signatures[key] = signature
+            self._exact.setdefault(fingerprint, key)
+            for band, band_key in self._band_keys(signature):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        signature = self._signatures.pop(key)
+        if self._exact.get(entry["fingerprint"]) == key:
+            del self._exact[entry["fingerprint"]]
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def add_orb(self, agent: str, orb: dict):
+        self.add(
+            f"orb:{orb['id']}",
+            orb_text(orb),
+            {"kind": "orb", "agent": agent, "orb_id": orb["id"], "rune_id": None},
+        )
+
+    def add_rune(self, agent: str, rune: dict):
+        self.add(
+            f"rune:{rune['id']}",
+            rune_text(rune),
+            {
+                "kind": "rune",
+                "agent": agent,
+                "orb_id": rune.get("orb_id"),
+                "rune_id": rune["id"],
+            },
+        )
+
+    def query(self, text: str, threshold: float = None):
+        """Return the best match scoring at least threshold, or None
+
+        Exact normalized-text hits score 1.0; otherwise LSH candidates are
+        ranked by the MinHash estimate of their shingle Jaccard similarity.
+        The bands are sized for the index threshold, so a lower threshold
+        compares against every stored signature instead of the candidates.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()
+        signature = self.hasher.signature(normalized)
+        with self._lock:
+            key = self._exact.get(fingerprint)
+            if key is not None:
+                return dict(self._entries[key], score=1.0, match_type="exact")
+
+            if threshold < self.threshold:
+                candidates = self._signatures.keys()
+            else:
+                candidates = set()
+                for band, band_key in self._band_keys(signature):
+                    candidates |= self._buckets[band].get(band_key, set())
+
+            best_key, best_score = None, 0.0
+            for candidate in candidates:
+                score = float(np.mean(self._signatures[candidate] == signature))
+                if score > best_score:
+                    best_key, best_score = candidate, score
+
+            if best_key is None or best_score < threshold:
+                return None
+            return dict(self._entries[best_key], score=best_score, match_type="near")
+
+    def load_storage(self, storage_dir: str = STORAGE_DIR):
+        for kind in ("orbs", "runes"):
+            for path in glob.glob(os.path.join(storage_dir, kind, "*", "*.json")):
+                agent = os.path.basename(os.path.dirname(path))
+                try:
+                    with open(path) as f:
+                        item = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[WHIS] Skipping unreadable {kind[:-1]} {path}: {e}")
+                    continue
+                if kind == "orbs":
+                    self.add_orb(agent, item)
+                else:
+                    self.add_rune(agent, item)
+
+
+_pattern_index = None
+_pattern_index_lock = threading.Lock()
+
+
+def get_pattern_index() -> PatternIndex:
+    """Shared index, built from storage/ on first use and kept current by utils.io"""
+    global _pattern_index
+    if _pattern_index is None:
+        with _pattern_index_lock:
+            if _pattern_index is None:
+                index = PatternIndex()
+                index.load_storage()
+                _pattern_index = index
+    return _pattern_index
@@ -1,5 +1,197 @@
+"""
+Time-decayed recurrence tracking for orbs.
+
+Each occurrence of an orb adds to a count-min sketch whose counters decay
+exponentially with RECURRENCE_HALF_LIFE_DAYS, so a pattern's score is
+roughly how many times it was seen recently. Counts use forward decay: an
+occurrence at time t adds 2^((t - landmark) / half_life), and reads divide
+by the same factor for the current time. Stored values never need to be
+touched as time passes, and ordering between them never changes, until the
+landmark is moved forward to keep the weights within float range.
+
+Memory is fixed at SKETCH_DEPTH x SKETCH_WIDTH cells plus the TOP_K
+heaviest patterns, however many distinct orbs appear. Both live in the
+Whis state database, so every worker process updates the same counters.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from utils.counters import STATE_DB_PATH
+
+HALF_LIFE_DAYS = float(os.getenv("RECURRENCE_HALF_LIFE_DAYS", "7"))
+SKETCH_WIDTH = 2048
+SKETCH_DEPTH = 4
+TOP_K = 100
+# Highest tier whose minimum decayed score is reached; below all of them is low
+TIERS = (("high", 10.0), ("medium", 3.0))
+# Move the landmark once weights reach 2^RESCALE_EXPONENT
+RESCALE_EXPONENT = 40.0
+
+
+def recurrence_tier(score: float) -> str:
+    for tier, minimum in TIERS:
+        if score >= minimum:
+            return tier
+    return "low"
+
+
+class RecurrenceTracker:
+    def __init__(
+        self,
+        path: str = STATE_DB_PATH,
+        half_life_days: float = HALF_LIFE_DAYS,
+        width: int = SKETCH_WIDTH,
+        depth: int = SKETCH_DEPTH,
+        top_k: int = TOP_K,
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.half_life = half_life_days * 86400
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS recurrence_sketch (
+                row INTEGER NOT NULL,
+                col INTEGER NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (row, col)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS recurrence_top (
+                key TEXT PRIMARY KEY,
+                score REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS recurrence_top_score
+                ON recurrence_top (score);
+            CREATE TABLE IF NOT EXISTS recurrence_meta (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            """)
+
+    def _cells(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [
+            (row, int.from_bytes(digest[row * 4 : row * 4 + 4], "little") % self.width)
+            for row in range(self.depth)
+        ]
+
+    def _weight(self, now: float, rescale: bool = False) -> float:
+        """2^((now - landmark) / half_life), optionally moving the landmark"""
+        row = self._conn.execute(
+            "SELECT value FROM recurrence_meta WHERE name = 'landmark'"
+        ).fetchone()
+        if row is None:
+            if rescale:
+                self._conn.execute(
+                    "INSERT INTO recurrence_meta (name, value) VALUES ('landmark', ?)",
+                    (now,),
+                )
+            return 1.0
+        exponent = (now - row[0]) / self.half_life
+        if rescale and exponent > RESCALE_EXPONENT:
+            factor = 2.0**-exponent
+            self._conn.execute(
+                "UPDATE recurrence_sketch SET value = value * ?", (factor,)
+            )
+            self._conn.execute("UPDATE recurrence_top SET score = score * ?", (factor,))
+            self._conn.execute(
+                "UPDATE recurrence_meta SET value = ? WHERE name = 'landmark'", (now,)
+            )
+            return 1.0
+        return 2.0**exponent
+
+    def _estimate(self, cells) -> float:
+        where = " OR ".join("(row = ? AND col = ?)" for _ in cells)
+        values = self._conn.execute(
+            f"SELECT value FROM recurrence_sketch WHERE {where}",
+            [n for cell in cells for n in cell],
+        ).fetchall()
+        # A cell that was never written holds zero
+        return min(value for (value,) in values) if len(values) == len(cells) else 0.0
+
+    def record(self, key: str, now: float = None) -> float:
+        """Count one occurrence of key and return its decayed score"""
+        now = time.time() if now is None else now
+        cells = self._cells(key)
+        with self._lock, self._conn:
+            weight = self._weight(now, rescale=True)
+            # Conservative update: only raise cells that are below the new estimate
+            estimate = self._estimate(cells) + weight
+            self._conn.executemany(
+                "INSERT INTO recurrence_sketch (row, col, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (row, col) DO UPDATE "
+                "SET value = MAX(value, excluded.value)",
+                [(row, col, estimate) for row, col in cells],
+            )
+            self._conn.execute(
+                "INSERT INTO recurrence_top (key, score, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE "
+                "SET score = excluded.score, last_seen = excluded.last_seen",
+                (key, estimate, now),
+            )
+            self._conn.execute(
+                "DELETE FROM recurrence_top WHERE key IN ("
+                "SELECT key FROM recurrence_top ORDER BY score DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.top_k,),
+            )
+        return estimate / weight
+
+    def score(self, key: str, now: float = None) -> float:
+        """Decayed score of key without counting an occurrence"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._estimate(self._cells(key)) / self._weight(now)
+
+    def top(self, limit: int = 10, now: float = None) -> list:
+        """The most recurrent patterns, highest decayed score first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            weight = self._weight(now)
+            rows = self._conn.execute(
+                "SELECT key, score, last_seen FROM recurrence_top "
+                "ORDER BY score DESC LIMIT ?",
+                (min(limit, self.top_k),),
+            ).fetchall()
+        return [
+            {
+                "key": key,
+                "score": score / weight,
+                "tier": recurrence_tier(score / weight),
+                "last_seen": last_seen,
+            }
+            for key, score, last_seen in rows
+        ]
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_recurrence_tracker() -> RecurrenceTracker:
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = RecurrenceTracker()
+    return _tracker
+
+
 def update_recurrence(orb: dict) -> dict:
-    # TODO: Implement recurrence tracking
-    # For now, just add a default recurrence tag
-    orb["recurrence"] = "low"
+    """Count an occurrence of orb and label it with its recurrence tier"""
+    key = str(orb.get("id") or orb.get("title", ""))
+    score = get_recurrence_tracker().record(key)
+    orb["recurrence"] = recurrence_tier(score)
+    orb["recurrence_score"] = round(score, 3)
     return orb
@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from routes import train, approvals, digest, ml_operations
+from routes import train, approvals, digest, ml_operations, recurrence
 
 app = FastAPI(title="Whis AI Agent - Central ML Brain")
 
@@ -7,3 +7,4 @@ app.include_router(train.router)
 app.include_router(approvals.router)
 app.include_router(digest.router)
 app.include_router(ml_operations.router)
+app.include_router(recurrence.router)
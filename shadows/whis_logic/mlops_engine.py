@@ -3,12 +3,14 @@ MLOps Engine - Central AI/ML Engineering Brain
 Handles data science workflows, model training, and MLOps best practices
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Iterable
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import hashlib
 
+from data_quality_stream import DataQualityAccumulator
+
 
 class MLOpsEngine:
     """Central MLOps engine for AI/ML operations"""
@@ -373,6 +375,46 @@ class MLOpsEngine:
 
         return quality_analysis
 
+    def detect_data_quality_issues_streaming(
+        self,
+        chunk_source: Callable[[], Iterable[pd.DataFrame]],
+        quality_config: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Detect data quality issues chunk by chunk without loading the dataset
+
+        chunk_source is called once per pass and must return a fresh chunk
+        iterator: the first pass gathers statistics and quantile samples, the
+        second counts values outside the resulting IQR fences.
+        """
+        accumulator = DataQualityAccumulator(
+            sample_size=quality_config.get("quantile_sample_size", 100_000),
+            track_duplicates=quality_config.get("check_duplicates", True),
+        )
+
+        for chunk in chunk_source():
+            accumulator.update(chunk)
+
+        accumulator.compute_outlier_fences()
+        if accumulator.outlier_fences:
+            for chunk in chunk_source():
+                accumulator.update_outliers(chunk)
+
+        quality_analysis = accumulator.to_report(
+            max_duplicate_rows=quality_config.get("max_duplicate_rows", 10_000)
+        )
+
+        # Calculate quality score
+        quality_analysis["quality_score"] = self._calculate_quality_score(
+            quality_analysis
+        )
+
+        # Generate recommendations
+        quality_analysis["recommendations"] = self._generate_quality_recommendations(
+            quality_analysis
+        )
+
+        return quality_analysis
+
     def _design_ingestion_layer(
         self, source: Dict[str, Any], requirements: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -1,15 +1,46 @@
-from fastapi import APIRouter
-from utils.io import get_pending_approvals
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import Optional
+from utils.approvals import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, get_approval_store
 
 router = APIRouter(prefix="/api/whis", tags=["Approvals"])
 
 
 @router.get("/approvals")
-def get_approvals():
-    return get_pending_approvals()
+def get_approvals(
+    response: Response,
+    agent: Optional[str] = None,
+    status: str = "pending",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """List approvals oldest first; the next page cursor is in X-Next-Cursor"""
+    try:
+        items, next_cursor = get_approval_store().list_page(
+            status=status, agent=agent, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+def _transition(approval_id: str, status: str):
+    try:
+        approval = get_approval_store().transition(approval_id, status)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Approval not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": approval["status"], "id": approval_id, "approval": approval}
 
 
 @router.post("/approve/{approval_id}")
 def approve_item(approval_id: str):
-    # TODO: Implement approval logic
-    return {"status": "approved", "id": approval_id}
+    return _transition(approval_id, "approved")
+
+
+@router.post("/reject/{approval_id}")
+def reject_item(approval_id: str):
+    return _transition(approval_id, "rejected")
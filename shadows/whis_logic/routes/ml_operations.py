@@ -3,12 +3,19 @@ ML Operations Routes - AI/ML Workflow Endpoints
 Handles data science workflows, model training, and deployment operations
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
+import json
 import logging
+import os
+import tempfile
+
+import pandas as pd
 
 # Import the AI/ML workflows and systems
+from data_quality_stream import DEFAULT_CHUNK_SIZE, detect_file_format, iter_data_chunks
 from mlops_engine import mlops_engine
 from orbs_runes_system import orbs_runes_system
 from ai_ml_workflows import ai_ml_workflows
@@ -16,6 +23,10 @@ from ai_ml_workflows import ai_ml_workflows
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ml", tags=["ML Operations"])
 
+# Server-side datasets may only be profiled from under this directory
+DATA_QUALITY_ROOT = os.getenv("DATA_QUALITY_ROOT", "data_lake")
+UPLOAD_COPY_BUFFER = 1024 * 1024
+
 
 class DataWorkflowRequest(BaseModel):
     data_sources: List[Dict[str, Any]]
@@ -259,6 +270,85 @@ async def analyze_data_quality(request: DataQualityRequest):
         )
 
 
+@router.post("/data-quality/analyze-file")
+async def analyze_data_quality_file(
+    file: Optional[UploadFile] = File(None),
+    file_path: Optional[str] = Form(None),
+    file_format: Optional[str] = Form(None),
+    chunk_size: int = Form(DEFAULT_CHUNK_SIZE),
+    quality_config: str = Form("{}"),
+):
+    """Stream a CSV, Parquet or Arrow IPC dataset through the quality analyzer
+
+    Accepts either a multipart upload or a path under DATA_QUALITY_ROOT. The
+    dataset is read chunk by chunk, so memory does not grow with file size.
+    """
+    if (file is None) == (file_path is None):
+        raise HTTPException(
+            status_code=400, detail="Provide exactly one of 'file' or 'file_path'"
+        )
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+
+    try:
+        config = json.loads(quality_config)
+        file_format = detect_file_format(
+            file.filename if file is not None else file_path, file_format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not isinstance(config, dict):
+        raise HTTPException(
+            status_code=400, detail="quality_config must be a JSON object"
+        )
+
+    temp_path = None
+    try:
+        if file is not None:
+            # Spool the upload to disk so the analyzer can make two passes over it
+            suffix = os.path.splitext(file.filename or "")[1]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+                temp_path = temp_file.name
+                while True:
+                    block = await file.read(UPLOAD_COPY_BUFFER)
+                    if not block:
+                        break
+                    temp_file.write(block)
+            dataset_path = temp_path
+        else:
+            root = os.path.realpath(DATA_QUALITY_ROOT)
+            dataset_path = os.path.realpath(file_path)
+            if os.path.commonpath([root, dataset_path]) != root:
+                raise HTTPException(
+                    status_code=403,
+                    detail=f"file_path must be under {DATA_QUALITY_ROOT}",
+                )
+            if not os.path.isfile(dataset_path):
+                raise HTTPException(status_code=404, detail="Dataset file not found")
+
+        try:
+            quality_analysis = await run_in_threadpool(
+                mlops_engine.detect_data_quality_issues_streaming,
+                lambda: iter_data_chunks(dataset_path, file_format, chunk_size),
+                config,
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing data quality file: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to analyze data quality: {str(e)}"
+            )
+        return {
+            "status": "success",
+            "quality_analysis": quality_analysis,
+            "quality_score": quality_analysis["quality_score"],
+            "recommendations": quality_analysis["recommendations"],
+        }
+    finally:
+        # Also covers a copy cut short by a failed write or client disconnect
+        if temp_path:
+            os.unlink(temp_path)
+
+
 @router.post("/rune/execute")
 async def execute_rune(request: RuneExecutionRequest):
     """Execute a Rune for ML task"""
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Query
+from logic.recurrence import TOP_K, get_recurrence_tracker
+
+router = APIRouter(prefix="/api/whis", tags=["Recurrence"])
+
+
+@router.get("/recurrence/top")
+def get_top_recurring(limit: int = Query(10, ge=1, le=TOP_K)):
+    """Most recurrent orb patterns by time-decayed frequency, with their tier"""
+    return get_recurrence_tracker().top(limit)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Optional
 from logic.generator import process_batch
 from logic.categorizer import categorize_input
+from logic.matcher import extract_match_text, get_pattern_index
 from logic.updater import update_training_data
+from utils.counters import get_counters
 import uuid
-import random
 
 router = APIRouter(prefix="/api/whis", tags=["Training"])
 
@@ -12,12 +14,14 @@ router = APIRouter(prefix="/api/whis", tags=["Training"])
 class TrainingPayload(BaseModel):
     input_type: str
     payload: dict
+    match_threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
 
 
 @router.post("/train")
 def receive_training_data(data: TrainingPayload):
     """Receive training data from sanitizer and other services"""
     print(f"[WHIS] Received training data: {data.input_type}")
+    get_counters().incr("inputs_received")
 
     # Special handling for solution_entry
     if data.input_type == "solution_entry":
@@ -69,22 +73,23 @@ def receive_training_data(data: TrainingPayload):
         # Update training data
         update_training_data(data.input_type, data.payload, category)
 
-        # Check if we have a match (placeholder logic)
-        match_found = random.choice(
-            [True, False]
-        )  # TODO: Replace with real matching logic
-
-        if match_found:
-            # Generate Orb and Rune IDs
-            orb_id = f"orb-{task_id[:8]}"
-            rune_id = f"rune-{task_id[:8]}"
+        # Look the task up against existing orbs and runes
+        match = get_pattern_index().query(
+            extract_match_text(data.input_type, data.payload),
+            threshold=data.match_threshold,
+        )
 
+        if match:
             result = {
                 "status": "match_found",
                 "type": data.input_type,
                 "category": category,
-                "orb_id": orb_id,
-                "rune_id": rune_id,
+                "task_id": task_id,
+                "orb_id": match["orb_id"],
+                "rune_id": match["rune_id"],
+                "matched_agent": match["agent"],
+                "match_type": match["match_type"],
+                "match_score": match["score"],
                 "autonomous": True,
                 "message": "Existing pattern matched, ready for deployment",
             }
@@ -93,6 +98,7 @@ def receive_training_data(data: TrainingPayload):
                 "status": "no_match",
                 "type": data.input_type,
                 "category": category,
+                "task_id": task_id,
                 "reason": "New task pattern",
                 "needs_approval": True,
                 "message": "New pattern detected, requires manual review",
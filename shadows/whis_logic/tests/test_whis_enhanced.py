@@ -136,6 +136,41 @@ class TestMLOpsEngine:
         assert "quality_score" in result
         assert "recommendations" in result
 
+    def test_detect_data_quality_issues_streaming(self, tmp_path):
+        """Test chunked data quality analysis matches the in-memory report"""
+        from data_quality_stream import iter_data_chunks
+
+        data = pd.DataFrame(
+            {
+                "col1": [1.0, 2.0, np.nan, 4.0, 5.0, 1.0, 250.0, 3.0],
+                "col2": [1, 1, 2, 2, 2, 1, 3, 2],
+                "col3": [1, 2, 3, 4, 5, 1, 7, 8],
+            }
+        )
+        csv_path = tmp_path / "dataset.csv"
+        data.to_csv(csv_path, index=False)
+        quality_config = {"outlier_method": "iqr"}
+
+        expected = mlops_engine.detect_data_quality_issues(data, quality_config)
+        result = mlops_engine.detect_data_quality_issues_streaming(
+            lambda: iter_data_chunks(str(csv_path), chunk_size=3), quality_config
+        )
+
+        assert result["data_shape"] == expected["data_shape"]
+        assert (
+            result["missing_values"]["total_missing"]
+            == expected["missing_values"]["total_missing"]
+        )
+        assert result["duplicates"]["duplicate_rows"] == [5]
+        assert (
+            result["outliers"]["outlier_counts"]
+            == expected["outliers"]["outlier_counts"]
+        )
+        assert result["quality_score"] == pytest.approx(expected["quality_score"])
+        summary = result["statistical_analysis"]["summary_statistics"]["col1"]
+        assert summary["mean"] == pytest.approx(data["col1"].mean())
+        assert summary["std"] == pytest.approx(data["col1"].std())
+
 
 class TestOrbsRunesSystem:
     """Test Orbs and Runes system"""
@@ -456,5 +491,318 @@ class TestMLOperationsIntegration:
         assert workflow["type"] == "data_workflow"
 
 
+class TestPatternIndex:
+    """Test orb/rune similarity lookup used by /api/whis/train"""
+
+    def _index(self):
+        from logic.matcher import PatternIndex
+
+        index = PatternIndex(threshold=0.8)
+        index.add_orb(
+            "katie",
+            {"id": "orb_1", "title": "Restart crashlooping pod in kubernetes"},
+        )
+        index.add_rune(
+            "igris",
+            {"id": "rune_2", "orb_id": "orb_2", "script": "terraform apply -auto"},
+        )
+        return index
+
+    def test_exact_match_ignores_case_and_punctuation(self):
+        """Test normalized-text hash hits"""
+        match = self._index().query("restart CRASHLOOPING pod, in Kubernetes!")
+
+        assert match["match_type"] == "exact"
+        assert match["score"] == 1.0
+        assert match["orb_id"] == "orb_1"
+
+    def test_near_duplicate_match_reports_score(self):
+        """Test MinHash/LSH near-duplicate lookup and threshold"""
+        index = self._index()
+        text = "Restart crashlooping pod in kubernetes now"
+
+        match = index.query(text)
+        assert match["match_type"] == "near"
+        assert 0.8 <= match["score"] < 1.0
+        assert index.query(text, threshold=0.99) is None
+
+    def test_threshold_below_index_threshold_scans_all_signatures(self):
+        """Test a lower per-query threshold is not limited by the LSH bands"""
+        from logic.matcher import PatternIndex
+
+        index = PatternIndex(threshold=0.9)
+        index.add_orb(
+            "katie",
+            {"id": "orb_1", "title": "Restart crashlooping pod in kubernetes"},
+        )
+        text = "Restart crashlooping pod in kubernetes cluster after deploy"
+
+        assert index.query(text) is None
+        match = index.query(text, threshold=0.5)
+        assert match["orb_id"] == "orb_1"
+        assert 0.5 <= match["score"] < 0.9
+
+    def test_training_payload_rejects_thresholds_outside_unit_interval(self):
+        """Test a bad match_threshold is a validation error, not a silent miss"""
+        import pytest
+        from pydantic import ValidationError
+        from routes.train import TrainingPayload
+
+        for threshold in (-0.1, 1.5):
+            with pytest.raises(ValidationError):
+                TrainingPayload(input_type="qna", payload={}, match_threshold=threshold)
+        assert TrainingPayload(input_type="qna", payload={}, match_threshold=0.5)
+
+    def test_unrelated_text_has_no_match(self):
+        """Test new patterns fall through to manual review"""
+        assert self._index().query("Rotate the audit log bucket keys") is None
+
+
+class TestNightlyBatch:
+    """Test incremental processing of sanitized inputs"""
+
+    def test_process_batch_skips_consumed_and_isolates_failures(
+        self, tmp_path, monkeypatch
+    ):
+        """Test manifest-based skipping and per-file failure isolation"""
+        import json
+        from logic.generator import process_batch
+
+        monkeypatch.chdir(tmp_path)
+        inputs = tmp_path / "data_lake" / "sanitized_inputs"
+        inputs.mkdir(parents=True)
+        (inputs / "qna_1.json").write_text(json.dumps({"question": "create pod"}))
+        (inputs / "broken.json").write_text("{not json")
+
+        assert process_batch() == ["qna_1.json"]
+        assert process_batch() == []
+
+        (inputs / "fixlog_2.json").write_text(json.dumps({"log": "pod failed"}))
+        assert process_batch() == ["fixlog_2.json"]
+
+        manifest = json.loads((tmp_path / "storage/batch_manifest.json").read_text())
+        assert set(manifest["files"]) == {"qna_1.json", "fixlog_2.json"}
+        assert "broken.json" in manifest["last_failures"]
+
+    def test_process_batch_resumes_segment_store(self, tmp_path, monkeypatch):
+        """Test JSONL segment records are consumed from the stored position"""
+        import json
+        from logic.generator import process_batch
+
+        monkeypatch.chdir(tmp_path)
+        inputs = tmp_path / "data_lake" / "sanitized_inputs"
+        inputs.mkdir(parents=True)
+        (inputs / "segments.json").write_text(
+            json.dumps({"segments": [{"name": "segment-000001.jsonl"}]})
+        )
+        segment = inputs / "segment-000001.jsonl"
+
+        def append(payload):
+            record = {"input_type": "qna", "payload": payload}
+            with open(segment, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+        append({"question": "create pod"})
+        append({"question": "scale deployment"})
+        assert len(process_batch()) == 2
+
+        offset = segment.stat().st_size
+        append({"question": "drain node"})
+        assert process_batch() == [f"segment-000001.jsonl:{offset}"]
+        assert process_batch() == []
+
+    def test_concurrent_saves_of_one_id_leave_whole_files(self, tmp_path, monkeypatch):
+        """Test same-size records saved by parallel workers never tear a file"""
+        import glob
+        import hashlib
+        import json
+        import time
+        from logic.generator import process_batch
+
+        def chunked_dump(obj, f, **kwargs):
+            # Flush in small pieces so overlapping writers interleave
+            text = json.dumps(obj, **kwargs)
+            for start in range(0, len(text), 64):
+                f.write(text[start : start + 64])
+                f.flush()
+                time.sleep(0)
+
+        monkeypatch.setattr(json, "dump", chunked_dump)
+        monkeypatch.chdir(tmp_path)
+        inputs = tmp_path / "data_lake" / "sanitized_inputs"
+        inputs.mkdir(parents=True)
+        # Same key count, so every record maps to the same orb_N/rune_N ids;
+        # distinct text of different lengths keeps the runes from merging
+        for n in range(16):
+            (inputs / f"qna_{n}.json").write_text(
+                json.dumps(
+                    {
+                        "question": " ".join(
+                            hashlib.sha1(f"{n}-{i}".encode()).hexdigest()
+                            for i in range(5 * (n + 1))
+                        )
+                    }
+                )
+            )
+
+        assert len(process_batch(max_workers=8)) == 16
+
+        saved = glob.glob(str(tmp_path / "storage" / "*" / "*" / "*"))
+        assert saved and all(path.endswith(".json") for path in saved)
+        for path in saved:
+            with open(path) as f:
+                json.load(f)
+
+
+class TestDigestCounters:
+    """Test day-bucketed counters behind /api/whis/digest"""
+
+    def test_counters_are_bucketed_by_day(self, tmp_path):
+        """Test per-day counts, prefixed lookups and gauges"""
+        from utils.counters import DayCounters
+
+        counters = DayCounters(str(tmp_path / "state.db"))
+        counters.incr("inputs_received", day="2025-01-01")
+        counters.incr("inputs_received", 2, day="2025-01-02")
+        counters.incr("orbs_saved:katie", day="2025-01-02")
+        counters.incr("orbs_saved:igris", day="2025-01-02")
+
+        assert counters.get("inputs_received", day="2025-01-01") == 1
+        assert counters.get("inputs_received", day="2025-01-02") == 2
+        assert counters.get_prefixed("orbs_saved:", day="2025-01-02") == {
+            "katie": 1,
+            "igris": 1,
+        }
+
+        assert counters.get_gauge("pending_approvals") is None
+        counters.set_gauge("pending_approvals", 1)
+        counters.adjust_gauge("pending_approvals", -3)
+        assert counters.get_gauge("pending_approvals") == 0
+
+
+class TestApprovalStore:
+    """Test indexed approval storage behind /api/whis/approvals"""
+
+    def _store(self, tmp_path):
+        from utils.approvals import ApprovalStore
+
+        store = ApprovalStore(str(tmp_path / "state.db"))
+        for n in range(5):
+            agent = "katie" if n % 2 == 0 else "igris"
+            store.save(
+                agent,
+                {"id": f"orb_{n}"},
+                {"id": f"rune_{n}"},
+                created_at=f"2025-01-01T00:00:0{n}",
+            )
+        return store
+
+    def test_cursor_pagination_by_agent(self, tmp_path):
+        """Test keyset pages cover every pending approval exactly once"""
+        store = self._store(tmp_path)
+
+        first, cursor = store.list_page(limit=2)
+        second, cursor = store.list_page(limit=2, cursor=cursor)
+        third, cursor = store.list_page(limit=2, cursor=cursor)
+        ids = [item["id"] for item in first + second + third]
+
+        assert ids == [
+            f"{'katie' if n % 2 == 0 else 'igris'}_orb_{n}" for n in range(5)
+        ]
+        assert cursor is None
+        katie, _ = store.list_page(agent="katie")
+        assert [item["orb"]["id"] for item in katie] == ["orb_0", "orb_2", "orb_4"]
+
+    def test_transitions_are_atomic_and_update_gauge(self, tmp_path):
+        """Test approve/reject only succeed once from pending"""
+        store = self._store(tmp_path)
+
+        approved = store.transition("katie_orb_0", "approved")
+        assert approved["status"] == "approved"
+        with pytest.raises(ValueError):
+            store.transition("katie_orb_0", "rejected")
+        with pytest.raises(KeyError):
+            store.transition("missing", "approved")
+
+        pending, _ = store.list_page()
+        assert len(pending) == 4
+        assert store.save("igris", {"id": "orb_1"}, {"id": "rune_1b"}) is False
+        row = store._conn.execute(
+            "SELECT value FROM gauges WHERE name = 'pending_approvals'"
+        ).fetchone()
+        assert row[0] == 4
+
+
+class TestDedupeIndex:
+    """Test near-duplicate orb/rune merging in the batch pipeline"""
+
+    def test_near_duplicates_merge_into_persisted_canonical(self, tmp_path):
+        """Test counts and confidence combine, per agent, across restarts"""
+        from logic.merger import DedupeIndex
+        from logic.matcher import orb_text
+
+        def orb(orb_id, title, confidence):
+            return {
+                "id": orb_id,
+                "title": title,
+                "description": "Delete the pod so its deployment recreates it",
+                "confidence": confidence,
+            }
+
+        path = str(tmp_path / "state.db")
+        first = orb("orb_1", "Restart crashlooping pod in kubernetes", 0.9)
+        near = orb("orb_2", "Restart crashlooping pods in kubernetes", 0.6)
+        other = orb("orb_3", "Rotate the audit log bucket keys", 0.8)
+
+        index = DedupeIndex(path)
+        assert index.merge("orb", "katie", first, orb_text(first))["occurrences"] == 1
+        merged = index.merge("orb", "katie", near, orb_text(near))
+        assert merged["id"] == "orb_1"
+        assert merged["occurrences"] == 2
+        assert merged["confidence"] == pytest.approx(0.75)
+        assert index.merge("orb", "katie", other, orb_text(other))["id"] == "orb_3"
+        assert index.merge("orb", "igris", near, orb_text(near))["id"] == "orb_2"
+
+        reopened = DedupeIndex(path)
+        again = reopened.merge("orb", "katie", near, orb_text(near))
+        assert again["id"] == "orb_1"
+        assert again["occurrences"] == 3
+
+
+class TestRecurrenceTracker:
+    """Test time-decayed recurrence behind update_recurrence"""
+
+    def test_scores_decay_and_rank_top_patterns(self, tmp_path):
+        """Test half-life decay, tiers, bounded top-N and landmark rescaling"""
+        from logic.recurrence import RecurrenceTracker
+
+        day = 86400
+        now = 1_700_000_000
+        tracker = RecurrenceTracker(
+            str(tmp_path / "state.db"), half_life_days=1, top_k=3
+        )
+        for _ in range(12):
+            tracker.record("orb_restart_pod", now)
+        for _ in range(4):
+            tracker.record("orb_scale_deploy", now)
+        for n in range(10):
+            tracker.record(f"orb_one_off_{n}", now)
+
+        assert tracker.score("orb_restart_pod", now + day) == pytest.approx(6.0)
+        top = tracker.top(10, now)
+        assert len(top) == 3
+        assert [(p["key"], p["tier"]) for p in top[:2]] == [
+            ("orb_restart_pod", "high"),
+            ("orb_scale_deploy", "medium"),
+        ]
+
+        # Far past RESCALE_EXPONENT half-lives the landmark moves forward
+        later = now + 60 * day
+        assert tracker.record("orb_scale_deploy", later) == pytest.approx(1.0)
+        assert tracker.top(1, later)[0]["key"] == "orb_scale_deploy"
+        cells = tracker._conn.execute("SELECT COUNT(*) FROM recurrence_sketch")
+        assert cells.fetchone()[0] <= tracker.depth * tracker.width
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,221 @@
+"""
+Approval store for orbs/runes waiting on manual review.
+
+Approvals live in the Whis state database next to the digest counters,
+indexed by (status, created_at) and (agent, status, created_at) so listing
+is a keyset-paginated index range scan. Approve/reject are single
+conditional UPDATEs, and the pending_approvals gauge is adjusted in the
+same transaction so the digest never drifts from the store.
+"""
+
+import base64
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.counters import STATE_DB_PATH
+
+APPROVALS_DIR = "storage/approvals"
+PENDING_GAUGE = "pending_approvals"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: str, approval_id: str) -> str:
+    raw = f"{created_at}|{approval_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, approval_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        )
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, approval_id
+
+
+class ApprovalStore:
+    def __init__(self, path: str = STATE_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS approvals (
+                id TEXT PRIMARY KEY,
+                agent TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                decided_at TEXT,
+                orb TEXT NOT NULL,
+                rune TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS approvals_status_created
+                ON approvals (status, created_at, id);
+            CREATE INDEX IF NOT EXISTS approvals_agent_status_created
+                ON approvals (agent, status, created_at, id);
+            CREATE TABLE IF NOT EXISTS gauges (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """)
+        # Reconcile the digest gauge with the store on every startup
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO gauges (name, value) "
+                "SELECT ?, COUNT(*) FROM approvals WHERE status = 'pending' "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (PENDING_GAUGE,),
+            )
+
+    def import_legacy_files(self, approvals_dir: str = APPROVALS_DIR) -> int:
+        """Import storage/approvals/<agent>/<orb>.json files written before the
+        store existed, then move the directory aside so it is only read once"""
+        imported = 0
+        for path in glob.glob(os.path.join(approvals_dir, "*", "*.json")):
+            agent = os.path.basename(os.path.dirname(path))
+            try:
+                with open(path) as f:
+                    item = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[WHIS] Skipping unreadable approval {path}: {e}")
+                continue
+            created_at = datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+            if self.save(agent, item["orb"], item["rune"], created_at=created_at):
+                imported += 1
+        os.replace(approvals_dir, f"{approvals_dir}.imported")
+        return imported
+
+    def save(self, agent: str, orb: dict, rune: dict, created_at: str = None) -> bool:
+        """Insert or refresh a pending approval; returns True if it is new"""
+        approval_id = f"{agent}_{orb['id']}"
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO approvals "
+                "(id, agent, status, created_at, orb, rune) "
+                "VALUES (?, ?, 'pending', ?, ?, ?)",
+                (
+                    approval_id,
+                    agent,
+                    created_at or datetime.utcnow().isoformat(),
+                    json.dumps(orb),
+                    json.dumps(rune),
+                ),
+            )
+            if cursor.rowcount:
+                self._adjust_pending(1)
+                return True
+            self._conn.execute(
+                "UPDATE approvals SET orb = ?, rune = ? WHERE id = ?",
+                (json.dumps(orb), json.dumps(rune), approval_id),
+            )
+            return False
+
+    def _adjust_pending(self, delta: int):
+        self._conn.execute(
+            "UPDATE gauges SET value = MAX(0, value + ?) WHERE name = ?",
+            (delta, PENDING_GAUGE),
+        )
+
+    def transition(self, approval_id: str, status: str) -> dict:
+        """Atomically move a pending approval to approved/rejected
+
+        Raises KeyError for an unknown id and ValueError if it is not pending.
+        """
+        if status not in ("approved", "rejected"):
+            raise ValueError(f"Unsupported approval status: {status}")
+        decided_at = datetime.utcnow().isoformat()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE approvals SET status = ?, decided_at = ? "
+                "WHERE id = ? AND status = 'pending'",
+                (status, decided_at, approval_id),
+            )
+            if cursor.rowcount:
+                self._adjust_pending(-1)
+            row = self._conn.execute(
+                "SELECT * FROM approvals WHERE id = ?", (approval_id,)
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(approval_id)
+        if not cursor.rowcount:
+            raise ValueError(f"Approval {approval_id} is already {row['status']}")
+        return self._to_dict(row)
+
+    def get(self, approval_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM approvals WHERE id = ?", (approval_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(approval_id)
+        return self._to_dict(row)
+
+    def list_page(
+        self,
+        status: str = "pending",
+        agent: str = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+    ):
+        """Return (items, next_cursor), oldest first, via keyset pagination"""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses = ["status = ?"]
+        params = [status]
+        if agent:
+            clauses.append("agent = ?")
+            params.append(agent)
+        if cursor:
+            clauses.append("(created_at, id) > (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM approvals WHERE {' AND '.join(clauses)} "
+                "ORDER BY created_at, id LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return [self._to_dict(row) for row in rows], next_cursor
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        return {
+            "id": row["id"],
+            "agent": row["agent"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "decided_at": row["decided_at"],
+            "orb": json.loads(row["orb"]),
+            "rune": json.loads(row["rune"]),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_approval_store() -> ApprovalStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = ApprovalStore()
+                if os.path.isdir(APPROVALS_DIR):
+                    store.import_legacy_files()
+                _store = store
+    return _store
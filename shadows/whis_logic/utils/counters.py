@@ -0,0 +1,107 @@
+"""
+Day-bucketed counters and gauges for the Whis training digest.
+
+Counters are incremented where the events happen (training input received,
+batch record processed, orb saved) so /api/whis/digest reads a handful of
+rows instead of listing directories. Backed by SQLite in WAL mode so updates
+are atomic across threads and worker processes.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+STATE_DB_PATH = os.getenv("WHIS_STATE_DB", "storage/whis_state.db")
+
+
+def today() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+class DayCounters:
+    def __init__(self, path: str = STATE_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS day_counters (
+                day TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value INTEGER NOT NULL,
+                PRIMARY KEY (day, name)
+            );
+            CREATE TABLE IF NOT EXISTS gauges (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """)
+
+    def incr(self, name: str, amount: int = 1, day: str = None):
+        if amount == 0:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO day_counters (day, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (day, name) DO UPDATE SET value = value + excluded.value",
+                (day or today(), name, amount),
+            )
+
+    def get(self, name: str, day: str = None) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM day_counters WHERE day = ? AND name = ?",
+                (day or today(), name),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_prefixed(self, prefix: str, day: str = None) -> dict:
+        """All of a day's counters named prefix<suffix>, keyed by suffix"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, value FROM day_counters "
+                "WHERE day = ? AND name >= ? AND name < ?",
+                (day or today(), prefix, prefix + "\uffff"),
+            ).fetchall()
+        return {name[len(prefix) :]: value for name, value in rows}
+
+    def adjust_gauge(self, name: str, delta: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO gauges (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = MAX(0, value + excluded.value)",
+                (name, delta),
+            )
+
+    def set_gauge(self, name: str, value: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO gauges (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (name, value),
+            )
+
+    def get_gauge(self, name: str):
+        """Current gauge value, or None if it has never been set"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM gauges WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+
+_counters = None
+_counters_lock = threading.Lock()
+
+
+def get_counters() -> DayCounters:
+    global _counters
+    if _counters is None:
+        with _counters_lock:
+            if _counters is None:
+                _counters = DayCounters()
+    return _counters
@@ -1,41 +1,58 @@
 import os
 import json
+import tempfile
+from logic.matcher import get_pattern_index
+from utils.approvals import DEFAULT_PAGE_SIZE, get_approval_store
+from utils.counters import get_counters
+
+
+def _write_json(path, data):
+    """Write data to a private temp file and rename it over path
+
+    Batch workers can save the same id at once; each rename is atomic, so
+    the file always holds one complete document.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def save_orb(agent, orb):
-    os.makedirs(f"storage/orbs/{agent}", exist_ok=True)
-    with open(f"storage/orbs/{agent}/{orb['id']}.json", "w") as f:
-        json.dump(orb, f, indent=2)
+    _write_json(f"storage/orbs/{agent}/{orb['id']}.json", orb)
+    get_pattern_index().add_orb(agent, orb)
+    get_counters().incr(f"orbs_saved:{agent}")
 
 
 def save_rune(agent, rune):
-    os.makedirs(f"storage/runes/{agent}", exist_ok=True)
-    with open(f"storage/runes/{agent}/{rune['id']}.json", "w") as f:
-        json.dump(rune, f, indent=2)
+    _write_json(f"storage/runes/{agent}/{rune['id']}.json", rune)
+    get_pattern_index().add_rune(agent, rune)
 
 
 def save_approval_if_needed(agent, orb, rune):
-    os.makedirs(f"storage/approvals/{agent}", exist_ok=True)
-    fname = f"storage/approvals/{agent}/{orb['id']}.json"
-    with open(fname, "w") as f:
-        json.dump({"orb": orb, "rune": rune}, f, indent=2)
+    get_approval_store().save(agent, orb, rune)
 
 
-def get_pending_approvals():
-    approvals = []
-    for agent_dir in os.listdir("storage/approvals"):
-        agent_path = f"storage/approvals/{agent_dir}"
-        if os.path.isdir(agent_path):
-            for fname in os.listdir(agent_path):
-                with open(f"{agent_path}/{fname}") as f:
-                    approvals.append(json.load(f))
-    return approvals
+def get_pending_approvals(agent=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+    """One page of pending approvals, oldest first, plus the next-page cursor"""
+    return get_approval_store().list_page(
+        status="pending", agent=agent, limit=limit, cursor=cursor
+    )
 
 
 def get_training_digest():
-    # TODO: Implement digest generation
+    counters = get_counters()
+    # The approval store keeps the pending gauge in step with its rows
+    get_approval_store()
     return {
-        "processed_today": len(os.listdir("data_lake/sanitized_inputs/")),
-        "pending_approvals": len(get_pending_approvals()),
-        "agents_updated": ["katie", "igris", "whis"],
+        "processed_today": counters.get("inputs_received"),
+        "batch_processed_today": counters.get("inputs_processed"),
+        "pending_approvals": counters.get_gauge("pending_approvals") or 0,
+        "agents_updated": sorted(counters.get_prefixed("orbs_saved:")),
     }
@@ -0,0 +1,61 @@
+"""
+Reader for the sanitized-input JSONL segment store written by whis_sanitize.
+
+Segments are listed by the segments.json index, so consumers never list the
+data lake directory. Positions are (segment name, byte offset) pairs.
+"""
+
+import json
+import os
+
+INDEX_FILE = "segments.json"
+
+
+def load_index(data_dir: str) -> dict:
+    try:
+        with open(os.path.join(data_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"segments": []}
+
+
+def read_records(data_dir: str, position=None):
+    """Yield (record, position, next_position) for records from position on
+
+    Pass the next_position of a previous read to resume there; None starts at
+    the oldest segment. Only newline-terminated lines are yielded, so a record
+    still being written is picked up by the next read.
+    """
+    start_segment, start_offset = position or (None, 0)
+    for segment in load_index(data_dir)["segments"]:
+        name = segment["name"]
+        if start_segment is not None and name < start_segment:
+            continue
+        offset = start_offset if name == start_segment else 0
+        try:
+            f = open(os.path.join(data_dir, name), "rb")
+        except FileNotFoundError:
+            continue
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record_offset = offset
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(
+                        f"[WHIS] Skipping corrupt record in {name} at {record_offset}"
+                    )
+                    continue
+                yield record, (name, record_offset), (name, offset)
+
+
+def read_record_at(data_dir: str, position) -> dict:
+    """Read the single record starting at a (segment name, byte offset)"""
+    name, offset = position
+    with open(os.path.join(data_dir, name), "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
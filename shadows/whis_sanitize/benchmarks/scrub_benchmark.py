@@ -0,0 +1,95 @@
+"""
+Benchmark the compiled scrubber against the original sequential rule passes.
+
+Builds a synthetic transcript corpus (default 100 MB) sprinkled with IPs,
+emails, paths, namespaces, error ids and domains, checks both implementations
+produce identical output, and prints throughput for each.
+
+    python benchmarks/scrub_benchmark.py --mb 100
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sanitizer.logic import SCRUB_RULES, SECRET_WORDS, Scrubber  # noqa: E402
+
+WORDS = (
+    "so today we are going to deploy the service to kubernetes and check the "
+    "pods logs then restart the deployment because the rollout was stuck"
+).split()
+SPICES = [
+    "connect to 10.0.{}.{}",
+    "ping ops-{}@example.com about it",
+    "see /var/log/app-{}.log",
+    "namespace ns-team{} is full",
+    "got error-{:08x} again",
+    "open grafana.io dashboard {}",
+    "set the prod token for key {}",
+]
+
+
+def legacy_scrub(text: str, redact: bool = False) -> str:
+    """The pre-compiled implementation: every rule, in order, on every string"""
+    if redact:
+        for word in SECRET_WORDS:
+            text = text.replace(word, "[redacted]")
+    for pattern, replacement, _ in SCRUB_RULES:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+def build_corpus(target_bytes: int, seed: int = 1):
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while size < target_bytes:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18)))
+        if rng.random() < 0.08:
+            n = rng.randint(0, 255)
+            line += " " + rng.choice(SPICES).format(n, n)
+        line += rng.choice([".", "", "?"])
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+
+def timed(fn, lines):
+    start = time.perf_counter()
+    result = [fn(line) for line in lines]
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=float, default=100.0)
+    parser.add_argument("--lines-per-string", type=int, default=50)
+    args = parser.parse_args()
+
+    lines = build_corpus(int(args.mb * 1024 * 1024))
+    step = max(1, args.lines_per_string)
+    chunks = ["\n".join(lines[i : i + step]) for i in range(0, len(lines), step)]
+    total_mb = sum(len(chunk) for chunk in chunks) / (1024 * 1024)
+    print(f"Corpus: {total_mb:.1f} MB in {len(chunks)} strings")
+
+    scrubber = Scrubber()
+    for label, redact in (("scrub", False), ("redact", True)):
+        compiled = scrubber.redact if redact else scrubber.scrub
+        expected, legacy_time = timed(lambda s: legacy_scrub(s, redact), chunks)
+        actual, compiled_time = timed(compiled, chunks)
+        if actual != expected:
+            raise SystemExit(f"{label}: compiled output differs from legacy")
+        print(
+            f"{label:>6}: legacy {total_mb / legacy_time:7.1f} MB/s, "
+            f"compiled {total_mb / compiled_time:7.1f} MB/s "
+            f"({legacy_time / compiled_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 from fastapi import FastAPI, Request
 from routes import clean
+from utils.forwarder import get_forwarder
 
 app = FastAPI(title="Sanitizer Service")
 
 app.include_router(clean.router)
 
 
+@app.on_event("startup")
+def start_forwarder():
+    """Resume delivering anything left in the forward queue"""
+    get_forwarder()
+
+
 @app.post("/sanitize")
 async def sanitize_input(request: Request):
     """
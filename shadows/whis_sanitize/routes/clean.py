@@ -1,12 +1,40 @@
-from fastapi import APIRouter
-from sanitizer.schemas import SanitizationRequest
-from sanitizer.processor import sanitize_input
-import requests
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sanitizer.schemas import (
+    IngestRequest,
+    SanitizationBatchRequest,
+    SanitizationRequest,
+)
+from sanitizer.processor import reload_profanity_filter, sanitize_batch, sanitize_input
+from utils.file_writer import read_clean_log
+from utils.forwarder import get_forwarder
 import os
+import zlib
 
 router = APIRouter(prefix="/api/sanitize", tags=["Sanitizer"])
 
-WHIS_URL = os.getenv("WHIS_URL", "http://whis:8003/api/whis/train")
+BATCH_MAX_ITEMS = int(os.getenv("SANITIZE_BATCH_MAX_ITEMS", "5000"))
+INGEST_MAX_BYTES = int(os.getenv("SANITIZE_INGEST_MAX_BYTES", str(64 << 20)))
+
+
+def _decode_body(body: bytes, content_encoding: str) -> bytes:
+    """Undo gzip Content-Encoding, refusing bodies over INGEST_MAX_BYTES"""
+    if content_encoding.strip().lower() == "gzip":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = inflater.decompress(body, INGEST_MAX_BYTES + 1)
+        except zlib.error as e:
+            raise HTTPException(status_code=400, detail=f"Bad gzip body: {e}")
+    elif content_encoding.strip() not in ("", "identity"):
+        raise HTTPException(
+            status_code=415, detail=f"Unsupported encoding {content_encoding}"
+        )
+    if len(body) > INGEST_MAX_BYTES:
+        raise HTTPException(
+            status_code=413, detail=f"Body exceeds {INGEST_MAX_BYTES} bytes"
+        )
+    return body
 
 
 @router.post("/")
@@ -14,24 +42,119 @@ def sanitize(request: SanitizationRequest):
     # Sanitize the input
     sanitized = sanitize_input(request.input_type, request.payload)
 
+    # The response copy of a long transcript is cut short; Whis gets the
+    # whole cleaned text as stored in the data lake
+    record = sanitized
+    if sanitized.get("cleaned_text_truncated"):
+        record = dict(
+            read_clean_log(sanitized["segment_position"]),
+            sanitization_stats=sanitized["sanitization_stats"],
+        )
+
+    # Queue for Whis; the background forwarder delivers and retries it
+    forward_id = get_forwarder().enqueue(request.input_type, record)
+
+    return {
+        "status": "sanitized",
+        "sanitized": sanitized,
+        "forward_queued": True,
+        "forward_id": forward_id,
+    }
+
+
+@router.post("/batch")
+async def sanitize_many(request: SanitizationBatchRequest):
+    """Sanitize many payloads on the process pool; results keep input order"""
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request.items)} exceeds {BATCH_MAX_ITEMS} items",
+        )
+    results = await run_in_threadpool(
+        sanitize_batch, [(item.input_type, item.payload) for item in request.items]
+    )
+    # The queue commit fsyncs, so it stays off the event loop too
+    await run_in_threadpool(
+        get_forwarder().enqueue_many,
+        [
+            (item.input_type, result["sanitized"])
+            for item, result in zip(request.items, results)
+            if result["status"] == "sanitized"
+        ],
+    )
+    return {
+        "status": "sanitized",
+        "count": len(results),
+        "errors": sum(result["status"] == "error" for result in results),
+        "results": results,
+    }
+
+
+@router.post("/ingest")
+async def ingest(request: Request):
+    """Bulk ingest for producers such as the webscraper
+
+    Takes an IngestRequest body, optionally sent with Content-Encoding: gzip.
+    Items are sanitized on the process pool and queued for Whis; results
+    hold one status per item, in input order, without echoing the payloads.
+    """
+    body = _decode_body(
+        await request.body(), request.headers.get("content-encoding", "")
+    )
     try:
-        # Forward to Whis for training
-        response = requests.post(
-            WHIS_URL,
-            json={"input_type": request.input_type, "payload": sanitized},
-            timeout=10,
+        batch = IngestRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    if len(batch.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(batch.items)} exceeds {BATCH_MAX_ITEMS} items",
+        )
+
+    payloads = [{"source": batch.source, **item} for item in batch.items]
+    results = await run_in_threadpool(
+        sanitize_batch, [(batch.input_type, payload) for payload in payloads]
+    )
+    forward_ids = iter(
+        await run_in_threadpool(
+            get_forwarder().enqueue_many,
+            [
+                (batch.input_type, result["sanitized"])
+                for result in results
+                if result["status"] == "sanitized"
+            ],
         )
+    )
+    statuses = [
+        (
+            {"status": "accepted", "forward_id": next(forward_ids)}
+            if result["status"] == "sanitized"
+            else result
+        )
+        for result in results
+    ]
+    accepted = sum(status["status"] == "accepted" for status in statuses)
+    return {
+        "status": "ingested",
+        "source": batch.source,
+        "count": len(statuses),
+        "accepted": accepted,
+        "errors": len(statuses) - accepted,
+        "results": statuses,
+    }
+
+
+@router.post("/filters/reload")
+def reload_filters():
+    """Reload the profanity list from PROFANITY_LIST_PATH"""
+    try:
+        terms = reload_profanity_filter()
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Could not load list: {e}")
+    return {"status": "reloaded", "profanity_terms": terms}
+
 
-        return {
-            "status": "sanitized",
-            "sanitized": sanitized,
-            "forwarded_to_whis": True,
-            "whis_response": response.json() if response.status_code == 200 else None,
-        }
-    except Exception as e:
-        return {
-            "status": "sanitized",
-            "sanitized": sanitized,
-            "forwarded_to_whis": False,
-            "error": str(e),
-        }
+@router.get("/forwarder/metrics")
+def forwarder_metrics():
+    """Queue depth and delivery counters for the Whis forwarder"""
+    return get_forwarder().metrics()
@@ -0,0 +1,114 @@
+"""
+Aho-Corasick literal replacement for profanity and garbage filtering.
+
+The automaton is built once from the term list and rewrites text in a single
+left-to-right pass, so the cost depends on the text length, not on how many
+terms are loaded. Where terms overlap, the leftmost match wins, and the
+longest term wins among those starting at the same position.
+"""
+
+import re
+
+
+class LiteralFilter:
+    def __init__(self, replacements: dict):
+        """replacements maps each literal term to the text that replaces it"""
+        self.replacements = {term: repl for term, repl in replacements.items() if term}
+        self._goto = [{}]
+        self._fail = [0]
+        self._depth = [0]
+        # Terms ending at each state: own term first, then via failure links
+        self._outputs = [[]]
+        for term in self.replacements:
+            self._insert(term)
+        self._link()
+        first_chars = "".join(sorted(self._goto[0]))
+        self._start = re.compile(f"[{re.escape(first_chars)}]") if first_chars else None
+
+    @classmethod
+    def from_terms(cls, terms, replacement: str = ""):
+        return cls({term: replacement for term in terms})
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def _insert(self, term: str):
+        state = 0
+        for char in term:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._depth.append(self._depth[state] + 1)
+                self._outputs.append([])
+            state = nxt
+        self._outputs[state].append(len(term))
+
+    def _link(self):
+        """Breadth-first failure links, merging each state's outputs"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._outputs[nxt] = self._outputs[nxt] + self._outputs[self._fail[nxt]]
+                queue.append(nxt)
+
+    def _matches(self, text: str):
+        """Yield (start, end) for every term occurrence, in order of end"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        i = 0
+        length = len(text)
+        while i < length:
+            if state == 0:
+                # Jump straight to the next character that can start a term
+                found = self._start.search(text, i)
+                if found is None:
+                    return
+                i = found.start()
+            char = text[i]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            i += 1
+            for size in outputs[state]:
+                yield i - size, i
+
+    def replace(self, text: str) -> str:
+        if self._start is None or not text:
+            return text
+        longest = {}
+        for start, end in self._matches(text):
+            if end > longest.get(start, start):
+                longest[start] = end
+        if not longest:
+            return text
+
+        parts = []
+        position = 0
+        for start in sorted(longest):
+            if start < position:
+                continue  # Overlaps a match already replaced
+            end = longest[start]
+            parts.append(text[position:start])
+            parts.append(self.replacements[text[start:end]])
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+
+def load_terms(path: str):
+    """One term per line; blank lines and lines starting with '# ' are skipped"""
+    terms = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            term = line.rstrip("\r\n")
+            if term.strip() and not term.startswith("# "):
+                terms.append(term)
+    return terms
@@ -1,37 +1,68 @@
 import re
 
+# (pattern, replacement, trigger), applied in order. A trigger is a short
+# pattern that every match of its rule contains; when it is absent from the
+# current text the rule cannot match, so its full pass is skipped.
+SCRUB_RULES = [
+    (r"\b\d{1,3}(?:\.\d{1,3}){3}\b", "<IP_ADDR>", r"\.\d"),
+    (r"\b(?:[a-zA-Z0-9_\-\.]+@\S+)\b", "<EMAIL>", r"@"),
+    (r"/(?:[\w\-]+/)*[\w\-]+\.\w+", "<FILE_PATH>", r"/[\w\-]"),
+    (r"\bns-\w+\b", "<NAMESPACE>", r"ns-"),
+    (r"\berror-[a-f0-9]{6,}\b", "<ERROR_ID>", r"error-"),
+    (r"\b(?:[a-z]{2,10}\.[a-z]{2,6})\b", "<DOMAIN>", r"\.[a-z]"),
+]
 
-def scrub_values(data: dict) -> dict:
-    pattern_map = {
-        r"\b\d{1,3}(?:\.\d{1,3}){3}\b": "<IP_ADDR>",
-        r"\b(?:[a-zA-Z0-9_\-\.]+@\S+)\b": "<EMAIL>",
-        r"/(?:[\w\-]+/)*[\w\-]+\.\w+": "<FILE_PATH>",
-        r"\bns-\w+\b": "<NAMESPACE>",
-        r"\berror-[a-f0-9]{6,}\b": "<ERROR_ID>",
-        r"\b(?:[a-z]{2,10}\.[a-z]{2,6})\b": "<DOMAIN>",
-    }
+# Only "secret" and "token" can overlap ("secretoken") and the earlier word
+# wins either way, so one alternation matches what sequential replaces did
+SECRET_WORDS = ["prod", "password", "secret", "token", "key"]
+
+
+class Scrubber:
+    """Precompiled PII/secret scrubber
+
+    Rules run in their original order, each one only if its trigger occurs in
+    the text as it stands at that point, so the output is identical to
+    applying every rule in turn while most strings skip most passes. No rule
+    can match across a newline, so multi-line text is scrubbed line by line
+    and each line only pays for the rules it actually triggers.
+    """
+
+    def __init__(self, rules=SCRUB_RULES, secret_words=SECRET_WORDS):
+        self._rules = [
+            (re.compile(pattern), replacement, re.compile(trigger))
+            for pattern, replacement, trigger in rules
+        ]
+        self._secrets = re.compile("|".join(map(re.escape, secret_words)))
+
+    def scrub(self, text: str) -> str:
+        if "\n" in text:
+            return "\n".join(map(self._scrub_line, text.split("\n")))
+        return self._scrub_line(text)
+
+    def _scrub_line(self, line: str) -> str:
+        for pattern, replacement, trigger in self._rules:
+            if trigger.search(line) is not None:
+                line = pattern.sub(replacement, line)
+        return line
+
+    def redact(self, text: str) -> str:
+        """Redact secret words, then scrub; used for solution entries"""
+        return self.scrub(self._secrets.sub("[redacted]", text))
 
-    def replace_all(text):
-        for pat, repl in pattern_map.items():
-            text = re.sub(pat, repl, text)
-        return text
 
+_scrubber = Scrubber()
+
+
+def scrub_text(text: str) -> str:
+    return _scrubber.scrub(text)
+
+
+def scrub_values(data: dict) -> dict:
     def _clean_str(s):
         """Enhanced string cleaning for solution entries"""
         if not isinstance(s, str):
             return s
-
-        # Basic redaction patterns
-        s = s.replace("prod", "[redacted]")
-        s = s.replace("password", "[redacted]")
-        s = s.replace("secret", "[redacted]")
-        s = s.replace("token", "[redacted]")
-        s = s.replace("key", "[redacted]")
-
-        # Apply regex patterns
-        s = replace_all(s)
-
-        return s
+        return _scrubber.redact(s)
 
     def _sanitize_solution_entry(payload: dict) -> dict:
         """Special handling for solution_entry type"""
@@ -58,5 +89,5 @@ def scrub_values(data: dict) -> dict:
 
     # Apply replacement to all string fields for other types
     return {
-        k: replace_all(str(v)) if isinstance(v, str) else v for k, v in data.items()
+        k: _scrubber.scrub(str(v)) if isinstance(v, str) else v for k, v in data.items()
     }
@@ -1,19 +1,65 @@
-from sanitizer.logic import scrub_values
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-PROFANITY_LIST = ["badword1", "badword2"]  # Extend as needed
+from sanitizer.literal_filter import LiteralFilter, load_terms
+from sanitizer.logic import scrub_text, scrub_values
+
+PROFANITY_LIST = ["badword1", "badword2"]  # Default when no list file is set
+PROFANITY_LIST_PATH = os.getenv("PROFANITY_LIST_PATH")
 GARBAGE_SYMBOLS = ["#$%&*~"]
+DEDUPE_WINDOW = int(os.getenv("TRANSCRIPT_DEDUPE_WINDOW", "100000"))
+INLINE_TEXT_MAX_CHARS = int(os.getenv("TRANSCRIPT_INLINE_MAX_CHARS", "1048576"))
+
+TRANSCRIPT_BLOCK_CHARS = 1 << 20
+SANITIZE_WORKERS = int(os.getenv("SANITIZE_WORKERS", str(os.cpu_count() or 1)))
+
+# Line boundaries as str.splitlines() sees them
+_LINE_BREAK = re.compile("[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def build_profanity_filter(path: str = None) -> LiteralFilter:
+    path = path or PROFANITY_LIST_PATH
+    terms = load_terms(path) if path else PROFANITY_LIST
+    return LiteralFilter.from_terms(terms, "[censored]")
+
+
+def reload_profanity_filter(path: str = None) -> int:
+    """Rebuild the profanity automaton from the list file; returns its size
+
+    The new filter is swapped in with one assignment, so requests already
+    running finish with the old one. Batch workers hold their own copy, so
+    the process pool is retired and the next batch starts workers that are
+    handed the new filter.
+    """
+    global _profanity_filter
+    _profanity_filter = build_profanity_filter(path)
+    retire_process_pool()
+    return len(_profanity_filter)
+
+
+def _use_profanity_filter(profanity_filter: LiteralFilter):
+    """Process pool initializer installing the parent's filter in a worker"""
+    global _profanity_filter
+    _profanity_filter = profanity_filter
+
+
+try:
+    _profanity_filter = build_profanity_filter()
+except OSError as e:
+    print(f"[SANITIZE] Could not load profanity list, using defaults: {e}")
+    _profanity_filter = LiteralFilter.from_terms(PROFANITY_LIST, "[censored]")
+_garbage_filter = LiteralFilter.from_terms(GARBAGE_SYMBOLS)
 
 
 def remove_profanity(text):
-    for word in PROFANITY_LIST:
-        text = text.replace(word, "[censored]")
-    return text
+    return _profanity_filter.replace(text)
 
 
 def remove_garbage(text):
-    for symbol in GARBAGE_SYMBOLS:
-        text = text.replace(symbol, "")
-    return text
+    return _garbage_filter.replace(text)
 
 
 def remove_duplicates(lines):
@@ -26,46 +72,149 @@ def remove_duplicates(lines):
     return result
 
 
-def sanitize_input(input_type: str, payload: dict):
-    if input_type == "youtube":
-        raw_text = payload.get("raw_text", "")
-        topic = payload.get("topic")
-        source = payload.get("source", "youtube")
-        metadata = payload.get("metadata", {})
-
-        # Remove garbage symbols and profanity
-        cleaned = remove_garbage(remove_profanity(raw_text))
-        # Split into lines, remove duplicates, join back
-        lines = cleaned.splitlines()
-        lines = [line.strip() for line in lines if line.strip()]
-        lines = remove_duplicates(lines)
-        cleaned_text = "\n".join(lines)
-        # Scrub PII and normalize
-        cleaned_text = scrub_values({"text": cleaned_text})["text"]
-
-        # Save to data lake or queue
-        from utils.file_writer import write_clean_log
+class FingerprintWindow:
+    """Dedupe memory holding fingerprints of the last capacity distinct lines
 
-        write_clean_log(
-            input_type,
-            {
-                "cleaned_text": cleaned_text,
-                "topic": topic,
-                "source": source,
-                "metadata": metadata,
-            },
-        )
-        return {
-            "cleaned_text": cleaned_text,
+    Memory is bounded however long the transcript is; a line repeated after
+    more than capacity distinct lines in between is kept again.
+    """
+
+    def __init__(self, capacity: int = DEDUPE_WINDOW):
+        self.capacity = capacity
+        self._seen = set()
+        self._order = deque()
+
+    def add(self, line: str) -> bool:
+        """Remember line; returns False if it is already in the window"""
+        fingerprint = hash(line)
+        if fingerprint in self._seen:
+            return False
+        self._seen.add(fingerprint)
+        self._order.append(fingerprint)
+        if len(self._order) > self.capacity:
+            self._seen.discard(self._order.popleft())
+        return True
+
+
+def iter_text_blocks(text: str, block_chars: int = TRANSCRIPT_BLOCK_CHARS):
+    """Yield slices of about block_chars, each ending on a line boundary"""
+    start = 0
+    while start < len(text):
+        boundary = _LINE_BREAK.search(text, start + block_chars)
+        end = boundary.end() if boundary else len(text)
+        yield text[start:end]
+        start = end
+
+
+def iter_transcript_lines(raw_text: str, stats: dict, window=None):
+    """Yield cleaned, deduplicated and scrubbed transcript text lazily
+
+    The transcript is processed a block of lines at a time: garbage and
+    profanity removal, dedupe of stripped non-empty lines and PII scrubbing.
+    No filter term spans a line break, so the result equals running each
+    step over the whole text. Yields "\n"-joined runs of kept lines;
+    stats["lines"] counts them.
+    """
+    window = window or FingerprintWindow()
+    for block in iter_text_blocks(raw_text):
+        kept = []
+        for line in remove_garbage(remove_profanity(block)).splitlines():
+            line = line.strip()
+            if line and window.add(line):
+                kept.append(line)
+        if kept:
+            stats["lines"] += len(kept)
+            yield scrub_text("\n".join(kept))
+
+
+def sanitize_youtube(payload: dict):
+    """Stream a transcript through the line pipeline into the data lake
+
+    The cleaned text is written to the segment store as it is produced. The
+    response carries it inline up to INLINE_TEXT_MAX_CHARS; longer results
+    are truncated there and point at their segment position instead.
+    """
+    from utils.file_writer import write_clean_log_stream
+
+    raw_text = payload.get("raw_text", "")
+    topic = payload.get("topic")
+    source = payload.get("source", "youtube")
+    metadata = payload.get("metadata", {})
+
+    stats = {"lines": 0, "cleaned_length": 0}
+    inline = []
+    inline_length = 0
+
+    def chunks():
+        nonlocal inline_length
+        for text in iter_transcript_lines(raw_text, stats):
+            chunk = "\n" + text if stats["cleaned_length"] else text
+            stats["cleaned_length"] += len(chunk)
+            if inline_length < INLINE_TEXT_MAX_CHARS:
+                chunk_inline = chunk[: INLINE_TEXT_MAX_CHARS - inline_length]
+                inline.append(chunk_inline)
+                inline_length += len(chunk_inline)
+            yield chunk
+
+    position = write_clean_log_stream(
+        "youtube",
+        {
+            "cleaned_text": None,
             "topic": topic,
             "source": source,
             "metadata": metadata,
-            "sanitization_stats": {
-                "lines": len(lines),
+        },
+        "cleaned_text",
+        chunks(),
+    )
+    result = {
+        "cleaned_text": "".join(inline),
+        "topic": topic,
+        "source": source,
+        "metadata": metadata,
+        "sanitization_stats": {
+            "lines": stats["lines"],
+            "original_length": len(raw_text),
+            "cleaned_length": stats["cleaned_length"],
+        },
+    }
+    if stats["cleaned_length"] > inline_length:
+        result["cleaned_text_truncated"] = True
+        result["segment_position"] = list(position)
+    return result
+
+
+def sanitize_payload(input_type: str, payload: dict):
+    """CPU-only part of sanitize_input, safe to run in a worker process
+
+    Returns (record payload for the data lake, API result). Transcripts are
+    joined in memory here, so this is for batch items of bounded size.
+    """
+    if input_type == "youtube":
+        raw_text = payload.get("raw_text", "")
+        stats = {"lines": 0}
+        cleaned_text = "\n".join(iter_transcript_lines(raw_text, stats))
+        record = {
+            "cleaned_text": cleaned_text,
+            "topic": payload.get("topic"),
+            "source": payload.get("source", "youtube"),
+            "metadata": payload.get("metadata", {}),
+        }
+        return record, dict(
+            record,
+            sanitization_stats={
+                "lines": stats["lines"],
                 "original_length": len(raw_text),
                 "cleaned_length": len(cleaned_text),
             },
-        }
+        )
+    cleaned = scrub_values(payload)
+    return cleaned, cleaned
+
+
+def sanitize_input(input_type: str, payload: dict):
+    if input_type == "youtube":
+        return sanitize_youtube(payload)
     else:
         cleaned = scrub_values(payload)
         # Save or emit for Whis
@@ -73,3 +222,80 @@ def sanitize_input(input_type: str, payload: dict):
 
         write_clean_log(input_type, cleaned)
         return cleaned
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=max(1, SANITIZE_WORKERS),
+                    initializer=_use_profanity_filter,
+                    initargs=(_profanity_filter,),
+                )
+    return _pool
+
+
+def retire_process_pool():
+    """Drop the pool; batches already submitted to it still complete"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _sanitize_isolated(item):
+    try:
+        return sanitize_payload(*item), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def sanitize_batch(items, pool=None):
+    """Sanitize (input_type, payload) pairs across the process pool
+
+    Scrubbing runs in worker processes; the results come back in input order
+    and are appended to the data lake here in one group commit, since the
+    segment store expects a single writer process. A failing item is
+    reported in its slot without affecting the rest of the batch.
+    """
+    from utils.file_writer import write_clean_logs
+
+    if not items:
+        return []
+    chunksize = max(1, len(items) // (max(1, SANITIZE_WORKERS) * 4))
+    if pool is not None:
+        outcomes = list(pool.map(_sanitize_isolated, items, chunksize=chunksize))
+    else:
+        pool = get_process_pool()
+        try:
+            outcomes = list(pool.map(_sanitize_isolated, items, chunksize=chunksize))
+        except RuntimeError:
+            # A filter reload retired the pool after we fetched it
+            if pool is _pool:
+                raise
+            outcomes = list(
+                get_process_pool().map(_sanitize_isolated, items, chunksize=chunksize)
+            )
+
+    write_clean_logs(
+        [
+            (input_type, outcome[0])
+            for (input_type, _), (outcome, _) in zip(items, outcomes)
+            if outcome is not None
+        ]
+    )
+    return [
+        (
+            {"status": "sanitized", "sanitized": outcome[1]}
+            if outcome is not None
+            else {"status": "error", "error": error}
+        )
+        for outcome, error in outcomes
+    ]
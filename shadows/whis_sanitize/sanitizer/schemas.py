@@ -1,14 +1,28 @@
 from pydantic import BaseModel
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, List, Optional
+
+InputType = Literal[
+    "task", "qna", "info", "image", "fixlog", "solution_entry", "youtube"
+]
 
 
 class SanitizationRequest(BaseModel):
-    input_type: Literal[
-        "task", "qna", "info", "image", "fixlog", "solution_entry", "youtube"
-    ]
+    input_type: InputType
     payload: dict
 
 
+class SanitizationBatchRequest(BaseModel):
+    items: List[SanitizationRequest]
+
+
+class IngestRequest(BaseModel):
+    """Bulk items from an external producer, all of one input type"""
+
+    source: str = "external"
+    input_type: InputType = "info"
+    items: List[dict]
+
+
 class YouTubeTranscriptRequest(BaseModel):
     raw_text: str
     source: str = "youtube"
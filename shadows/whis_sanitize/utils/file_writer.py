@@ -1,13 +1,60 @@
 import os
-import json
+import threading
 from datetime import datetime
+from utils.segment_store import STREAM_PLACEHOLDER, SegmentWriter, read_records
 
 DATA_DIR = "data_lake/sanitized_inputs"
 os.makedirs(DATA_DIR, exist_ok=True)
 
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_segment_writer() -> SegmentWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SegmentWriter(DATA_DIR)
+    return _writer
+
 
 def write_clean_log(input_type: str, payload: dict):
-    now = datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
-    filename = f"{DATA_DIR}/{input_type}_{now}.json"
-    with open(filename, "w") as f:
-        json.dump(payload, f, indent=2)
+    """Append a sanitized input to the data lake; returns its segment position"""
+    return get_segment_writer().append(
+        {
+            "input_type": input_type,
+            "written_at": datetime.utcnow().isoformat(),
+            "payload": payload,
+        }
+    )
+
+
+def write_clean_logs(entries):
+    """Append (input_type, payload) pairs in one group commit; returns positions"""
+    written_at = datetime.utcnow().isoformat()
+    return get_segment_writer().append_many(
+        [
+            {"input_type": input_type, "written_at": written_at, "payload": payload}
+            for input_type, payload in entries
+        ]
+    )
+
+
+def write_clean_log_stream(input_type: str, payload: dict, field: str, chunks):
+    """Like write_clean_log, but payload[field] is streamed from chunks"""
+    return get_segment_writer().append_stream(
+        {
+            "input_type": input_type,
+            "written_at": datetime.utcnow().isoformat(),
+            "payload": dict(payload, **{field: STREAM_PLACEHOLDER}),
+        },
+        chunks,
+    )
+
+
+def read_clean_log(position) -> dict:
+    """The payload of the record written at a segment position"""
+    for record, _, _ in read_records(get_segment_writer().data_dir, position):
+        return record["payload"]
+    raise KeyError(f"No record at {position}")
@@ -0,0 +1,289 @@
+"""
+Background forwarder from the sanitizer to Whis.
+
+Sanitized payloads are committed to a local SQLite spill queue and the
+request returns straight away. A daemon thread runs an asyncio loop that
+drains the queue in batches over a keep-alive httpx connection pool. A row
+is only deleted once Whis accepted it; transport errors, timeouts and 5xx
+are retried with capped exponential backoff, and payloads Whis rejects
+outright are kept as dead letters. Delivery is at-least-once: a crash
+between Whis accepting a payload and the ack resends it on restart.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import httpx
+
+WHIS_URL = os.getenv("WHIS_URL", "http://whis:8003/api/whis/train")
+QUEUE_DB_PATH = os.getenv("FORWARD_QUEUE_DB", "storage/forward_queue.db")
+BATCH_SIZE = int(os.getenv("FORWARD_BATCH_SIZE", "32"))
+MAX_CONNECTIONS = int(os.getenv("FORWARD_MAX_CONNECTIONS", "8"))
+REQUEST_TIMEOUT = float(os.getenv("FORWARD_TIMEOUT", "10"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 300.0
+IDLE_POLL_SECONDS = 5.0
+
+# Client errors that may succeed on retry; other 4xx are dead letters
+RETRYABLE_STATUS = {408, 409, 425, 429}
+
+
+def backoff_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at BACKOFF_MAX_SECONDS"""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** min(attempts, 20))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class ForwardQueue:
+    """Durable FIFO of request bodies waiting to be delivered to Whis"""
+
+    def __init__(self, path: str = QUEUE_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS forward_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS forward_queue_due
+                ON forward_queue (status, next_attempt_at, id);
+            """)
+
+    def enqueue_many(self, bodies) -> list:
+        now = time.time()
+        with self._lock, self._conn:
+            return [
+                self._conn.execute(
+                    "INSERT INTO forward_queue (body, enqueued_at, next_attempt_at) "
+                    "VALUES (?, ?, ?)",
+                    (json.dumps(body), now, now),
+                ).lastrowid
+                for body in bodies
+            ]
+
+    def due(self, limit: int, now: float = None):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, body, attempts FROM forward_queue "
+                "WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at, id LIMIT ?",
+                (time.time() if now is None else now, limit),
+            ).fetchall()
+
+    def next_attempt_at(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM forward_queue "
+                "WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def ack(self, ids):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM forward_queue WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def retry(self, failures):
+        """failures: (id, attempts so far, error) for rows to try again later"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE forward_queue SET attempts = ?, next_attempt_at = ?, "
+                "last_error = ? WHERE id = ?",
+                [
+                    (attempts + 1, now + backoff_delay(attempts), error, row_id)
+                    for row_id, attempts, error in failures
+                ],
+            )
+
+    def bury(self, failures):
+        """Park rows Whis rejected as dead letters instead of dropping them"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE forward_queue SET status = 'dead', attempts = ?, "
+                "last_error = ? WHERE id = ?",
+                [(attempts + 1, error, row_id) for row_id, attempts, error in failures],
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*), MIN(enqueued_at), MAX(attempts) "
+                "FROM forward_queue GROUP BY status"
+            ).fetchall()
+        by_status = {row[0]: row for row in rows}
+        pending = by_status.get("pending")
+        return {
+            "queue_depth": pending[1] if pending else 0,
+            "oldest_pending_age_seconds": (
+                round(time.time() - pending[2], 3) if pending else 0.0
+            ),
+            "max_attempts": pending[3] if pending else 0,
+            "dead_letters": by_status["dead"][1] if "dead" in by_status else 0,
+        }
+
+
+class WhisForwarder:
+    def __init__(
+        self,
+        queue: ForwardQueue,
+        url: str = WHIS_URL,
+        batch_size: int = BATCH_SIZE,
+        max_connections: int = MAX_CONNECTIONS,
+        timeout: float = REQUEST_TIMEOUT,
+    ):
+        self.queue = queue
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.counters = {"delivered": 0, "failed_attempts": 0, "dead_lettered": 0}
+        self.in_flight = 0
+        self.last_error = None
+        self._loop = None
+        self._wake = None
+        self._started = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self._run()),
+                name="whis-forwarder",
+                daemon=True,
+            )
+            self._thread.start()
+            self._started.wait()
+        return self
+
+    def enqueue(self, input_type: str, payload) -> int:
+        return self.enqueue_many([(input_type, payload)])[0]
+
+    def enqueue_many(self, items) -> list:
+        """Durably queue (input_type, payload) pairs and wake the sender"""
+        ids = self.queue.enqueue_many(
+            [
+                {"input_type": input_type, "payload": payload}
+                for input_type, payload in items
+            ]
+        )
+        if self._loop is not None and ids:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return ids
+
+    def metrics(self) -> dict:
+        return dict(
+            self.queue.stats(),
+            in_flight=self.in_flight,
+            running=self._thread is not None and self._thread.is_alive(),
+            last_error=self.last_error,
+            **self.counters,
+        )
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._started.set()
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            while True:
+                # Cleared before looking at the queue so no wakeup is missed
+                self._wake.clear()
+                try:
+                    sent = await self.drain_once(client)
+                except Exception as e:
+                    print(f"[SANITIZE] Forwarder error: {e}")
+                    self.last_error = str(e)
+                    sent = 0
+                if not sent:
+                    await self._idle()
+
+    async def _idle(self):
+        """Sleep until new work is queued or the next retry falls due"""
+        next_at = self.queue.next_attempt_at()
+        delay = IDLE_POLL_SECONDS
+        if next_at is not None:
+            delay = min(delay, max(0.0, next_at - time.time()))
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def drain_once(self, client) -> int:
+        """Send one batch of due rows concurrently; returns how many were tried"""
+        rows = self.queue.due(self.batch_size)
+        if not rows:
+            return 0
+        self.in_flight = len(rows)
+        try:
+            outcomes = await asyncio.gather(*(self._send(client, row) for row in rows))
+        finally:
+            self.in_flight = 0
+
+        delivered, retry, dead = [], [], []
+        for row, (status, error) in zip(rows, outcomes):
+            if status == "delivered":
+                delivered.append(row["id"])
+            elif status == "dead":
+                dead.append((row["id"], row["attempts"], error))
+            else:
+                retry.append((row["id"], row["attempts"], error))
+        self.queue.ack(delivered)
+        self.queue.retry(retry)
+        self.queue.bury(dead)
+
+        self.counters["delivered"] += len(delivered)
+        self.counters["failed_attempts"] += len(retry)
+        self.counters["dead_lettered"] += len(dead)
+        for _, _, error in retry + dead:
+            self.last_error = error
+        return len(rows)
+
+    async def _send(self, client, row):
+        try:
+            response = await client.post(
+                self.url,
+                content=row["body"],
+                headers={"Content-Type": "application/json"},
+            )
+        except httpx.HTTPError as e:
+            return "retry", f"{type(e).__name__}: {e}"
+        if response.is_success:
+            return "delivered", None
+        error = f"Whis returned {response.status_code}"
+        if response.status_code < 500 and response.status_code not in RETRYABLE_STATUS:
+            return "dead", error
+        return "retry", error
+
+
+_forwarder = None
+_forwarder_lock = threading.Lock()
+
+
+def get_forwarder() -> WhisForwarder:
+    global _forwarder
+    if _forwarder is None:
+        with _forwarder_lock:
+            if _forwarder is None:
+                _forwarder = WhisForwarder(ForwardQueue()).start()
+    return _forwarder
@@ -0,0 +1,281 @@
+"""
+Append-only JSONL segment store for the sanitized-input data lake.
+
+Records are appended as single JSON lines to size-capped segment files
+(segment-000001.jsonl, ...). Concurrent writers share one write + fsync per
+group commit, and a small segments.json index lists every segment so readers
+never have to list the data lake directory. A reader position is a
+(segment name, byte offset) pair, so consumers can resume from where they
+stopped. One writer process per data lake directory is assumed.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+INDEX_FILE = "segments.json"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+MAX_SEGMENT_BYTES = int(os.getenv("SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+FSYNC_ENABLED = os.getenv("SEGMENT_FSYNC", "1") != "0"
+STREAM_PLACEHOLDER = "\x00__segment_stream__\x00"
+
+
+def segment_name(seq: int) -> str:
+    return f"{SEGMENT_PREFIX}{seq:06d}{SEGMENT_SUFFIX}"
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load_index(data_dir: str) -> dict:
+    try:
+        with open(os.path.join(data_dir, INDEX_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"segments": []}
+
+
+def _write_index(data_dir: str, index: dict):
+    path = os.path.join(data_dir, INDEX_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=2)
+        f.flush()
+        if FSYNC_ENABLED:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if FSYNC_ENABLED:
+        _fsync_dir(data_dir)
+
+
+class SegmentWriter:
+    """Group-committing appender over rotating JSONL segments
+
+    Each append queues an encoded line and waits until it is durable. The
+    first waiting thread becomes the flush leader: it takes everything queued
+    so far, writes it with one write() and one fsync(), then wakes the rest.
+    Appends that arrive during a flush ride along in the next one.
+    """
+
+    def __init__(self, data_dir: str, max_segment_bytes: int = MAX_SEGMENT_BYTES):
+        self.data_dir = data_dir
+        self.max_segment_bytes = max_segment_bytes
+        os.makedirs(data_dir, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._next_seq = 0
+        self._durable_seq = -1
+        self._flushing = False
+        self._results = {}
+
+        self.index = load_index(data_dir)
+        if self.index["segments"]:
+            self._open_segment(self.index["segments"][-1]["name"])
+        else:
+            self._start_segment(1)
+
+    def _open_segment(self, name: str):
+        path = os.path.join(self.data_dir, name)
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        self._recover_torn_tail(path)
+
+    def _recover_torn_tail(self, path: str):
+        """Drop a partial last line left behind by a crash mid-write"""
+        if self._size == 0:
+            return
+        with open(path, "rb") as f:
+            f.seek(max(0, self._size - 65536))
+            tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        cut = tail.rfind(b"\n")
+        if cut < 0 and self._size > len(tail):
+            return  # Tail line longer than the scan window; leave it to readers
+        keep = self._size - len(tail) + cut + 1
+        self._file.truncate(keep)
+        self._file.seek(keep)
+        self._size = keep
+
+    def _start_segment(self, seq: int):
+        name = segment_name(seq)
+        self.index["segments"].append(
+            {
+                "name": name,
+                "created_at": datetime.utcnow().isoformat(),
+                "sealed": False,
+            }
+        )
+        self._file = open(os.path.join(self.data_dir, name), "ab")
+        self._size = self._file.tell()
+        _write_index(self.data_dir, self.index)
+
+    def _rotate(self):
+        self._file.flush()
+        if FSYNC_ENABLED:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+        active = self.index["segments"][-1]
+        active["sealed"] = True
+        active["bytes"] = self._size
+        active["sealed_at"] = datetime.utcnow().isoformat()
+        seq = int(active["name"][len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+        self._start_segment(seq + 1)
+
+    def _write_batch(self, items):
+        """Write queued lines, rotating whenever the active segment is full
+
+        Items are encoded lines, or (spool file, size) pairs for streamed
+        records, which are copied into the segment without being loaded.
+        """
+        positions = []
+        buffer = []
+        for item in items:
+            size = item[1] if isinstance(item, tuple) else len(item)
+            if self._size and self._size + size > self.max_segment_bytes:
+                if buffer:
+                    self._file.write(b"".join(buffer))
+                    buffer = []
+                self._rotate()
+            positions.append((self.index["segments"][-1]["name"], self._size))
+            if isinstance(item, tuple):
+                if buffer:
+                    self._file.write(b"".join(buffer))
+                    buffer = []
+                item[0].seek(0)
+                shutil.copyfileobj(item[0], self._file)
+            else:
+                buffer.append(item)
+            self._size += size
+        if buffer:
+            self._file.write(b"".join(buffer))
+        self._file.flush()
+        if FSYNC_ENABLED:
+            os.fsync(self._file.fileno())
+        return positions
+
+    def append(self, record: dict):
+        """Durably append one record; returns its (segment, offset) position"""
+        return self.append_many([record])[0]
+
+    def append_many(self, records):
+        """Durably append records in order; returns their positions
+
+        All records join the same group commit, so a batch costs one fsync.
+        """
+        return self._commit(
+            [
+                (json.dumps(record, separators=(",", ":")) + "\n").encode()
+                for record in records
+            ]
+        )
+
+    def append_stream(self, record: dict, chunks):
+        """Append a record with one string value produced by an iterable
+
+        The value equal to STREAM_PLACEHOLDER in record is replaced by the
+        concatenation of chunks. The encoded line is spooled to a temporary
+        file in the data lake as chunks arrive, so memory stays flat however
+        long the value is; returns the record's (segment, offset) position.
+        """
+        head, placeholder, tail = json.dumps(record, separators=(",", ":")).partition(
+            json.dumps(STREAM_PLACEHOLDER)
+        )
+        if not placeholder:
+            raise ValueError("record has no STREAM_PLACEHOLDER value")
+        with tempfile.TemporaryFile(dir=self.data_dir) as spool:
+            spool.write(head.encode() + b'"')
+            for chunk in chunks:
+                spool.write(json.dumps(chunk)[1:-1].encode())
+            spool.write(b'"' + tail.encode() + b"\n")
+            return self._commit([(spool, spool.tell())])[0]
+
+    def _commit(self, items):
+        if not items:
+            return []
+        with self._cond:
+            first = self._next_seq
+            self._next_seq += len(items)
+            self._pending.extend(enumerate(items, start=first))
+            last = self._next_seq - 1
+
+            while self._durable_seq < last:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+
+                self._flushing = True
+                batch, self._pending = self._pending, []
+                self._cond.release()
+                try:
+                    positions = self._write_batch([entry[1] for entry in batch])
+                    error = None
+                except Exception as e:
+                    positions, error = [], e
+                finally:
+                    self._cond.acquire()
+
+                self._flushing = False
+                for (batch_seq, _), position in zip(batch, positions):
+                    self._results[batch_seq] = position
+                if error is not None:
+                    for batch_seq, _ in batch:
+                        self._results[batch_seq] = error
+                self._durable_seq = batch[-1][0]
+                self._cond.notify_all()
+
+            results = [self._results.pop(seq) for seq in range(first, last + 1)]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def close(self):
+        with self._cond:
+            self._file.close()
+
+
+def read_records(data_dir: str, position=None):
+    """Yield (record, position, next_position) for records from position on
+
+    Positions are (segment name, byte offset) pairs. Pass the next_position
+    of a previous read (or an append position) to resume there; None starts
+    at the oldest segment. Only newline-terminated lines are yielded, so a
+    record still being written is picked up by the next read.
+    """
+    start_segment, start_offset = position or (None, 0)
+    for segment in load_index(data_dir)["segments"]:
+        name = segment["name"]
+        if start_segment is not None and name < start_segment:
+            continue
+        offset = start_offset if name == start_segment else 0
+        try:
+            f = open(os.path.join(data_dir, name), "rb")
+        except FileNotFoundError:
+            continue
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record_offset = offset
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(
+                        f"[SANITIZE] Skipping corrupt record in {name} at {record_offset}"
+                    )
+                    continue
+                yield record, (name, record_offset), (name, offset)
@@ -0,0 +1,83 @@
+"""
+Pre-serialized response cache for GET /orbs and GET /runes.
+
+A page is cached as the exact JSON bytes sent to clients, with an ETag,
+under the catalog generation it was built from. A request reads the
+current generation (one primary-key lookup) and, while it matches, returns
+the stored bytes without touching the catalog rows, parsing JSON or
+building Pydantic models; a matching If-None-Match gets a bodiless 304.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+CATALOG_CACHE_ENTRIES = int(os.getenv("CATALOG_CACHE_ENTRIES", "256"))
+
+
+class CachedPage(NamedTuple):
+    generation: int
+    body: bytes
+    etag: str
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class CatalogCache:
+    def __init__(self, max_entries: int = CATALOG_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[Tuple, CachedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def page(
+        self,
+        key: Tuple,
+        generation: int,
+        build: Callable[[], Dict[str, Any]],
+    ) -> CachedPage:
+        """The cached page for key, rebuilt if the generation moved on
+
+        The generation is read before building, so a write racing the
+        build can only leave the page tagged older than its content, and
+        it is rebuilt on the next request.
+        """
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached.generation == generation:
+                self._pages.move_to_end(key)
+                return cached
+
+        body = json.dumps(build(), separators=(",", ":")).encode()
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        cached = CachedPage(generation, body, f'"{generation}-{digest}"')
+        with self._lock:
+            self._pages[key] = cached
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        return cached
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_catalog_cache() -> CatalogCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CatalogCache()
+    return _cache
@@ -0,0 +1,270 @@
+"""
+Catalog store for smithing ORBs and RUNEs.
+
+Each ORB and RUNE is one row in a SQLite database in WAL mode, upserted by
+its id inside a transaction, so a crash mid-write never leaves a partial
+catalog. ORBs are indexed by (category, orb_id) with a separate tag table,
+RUNEs by (category, rune_id) and orb_id. Listing is keyset-paginated on the
+id, so a page costs O(page size) and returns the stored JSON as-is. Every
+write bumps a per-kind generation in the same transaction, which catalog
+caches compare against to know when a page has gone stale.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SMITHING_DB_PATH = os.getenv("SMITHING_DB_PATH", "/app/smithing.db")
+LEGACY_ORBS_PATH = os.getenv("ORBS_PATH", "/app/orbs.json")
+LEGACY_RUNES_PATH = os.getenv("RUNES_PATH", "/app/runes.json")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+ITER_BATCH_SIZE = 500
+
+
+def encode_cursor(item_id: str) -> str:
+    return base64.urlsafe_b64encode(item_id.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class CatalogStore:
+    def __init__(self, path: str = SMITHING_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS orbs (
+                orb_id TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS orbs_category ON orbs (category, orb_id);
+            CREATE TABLE IF NOT EXISTS orb_tags (
+                tag TEXT NOT NULL,
+                orb_id TEXT NOT NULL,
+                PRIMARY KEY (tag, orb_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS orb_tags_orb ON orb_tags (orb_id);
+            CREATE TABLE IF NOT EXISTS runes (
+                rune_id TEXT PRIMARY KEY,
+                orb_id TEXT NOT NULL,
+                category TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runes_category ON runes (category, rune_id);
+            CREATE INDEX IF NOT EXISTS runes_orb ON runes (orb_id);
+            CREATE TABLE IF NOT EXISTS catalog_generations (
+                kind TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO catalog_generations (kind, generation)
+                VALUES ('orbs', 0), ('runes', 0);
+            """)
+
+    def import_legacy_file(self, kind: str, path: str) -> int:
+        """Load an orbs.json/runes.json written before the store existed,
+        then move it aside so it is only read once"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            items = json.load(f)
+        if kind == "orbs":
+            self.upsert_orbs(items)
+        else:
+            self.upsert_runes(items)
+        os.replace(path, f"{path}.imported")
+        return len(items)
+
+    def _bump(self, kind: str):
+        self._conn.execute(
+            "UPDATE catalog_generations SET generation = generation + 1 "
+            "WHERE kind = ?",
+            (kind,),
+        )
+
+    def generation(self, kind: str) -> int:
+        """Counter bumped by every write to the orbs or runes catalog"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT generation FROM catalog_generations WHERE kind = ?", (kind,)
+            ).fetchone()[0]
+
+    def _upsert_orbs(self, orbs: List[Dict[str, Any]]):
+        if not orbs:
+            return
+        self._bump("orbs")
+        self._conn.executemany(
+            "INSERT INTO orbs (orb_id, category, data) VALUES (?, ?, ?) "
+            "ON CONFLICT (orb_id) DO UPDATE "
+            "SET category = excluded.category, data = excluded.data",
+            [(orb["orb_id"], orb["category"], json.dumps(orb)) for orb in orbs],
+        )
+        self._conn.executemany(
+            "DELETE FROM orb_tags WHERE orb_id = ?", [(orb["orb_id"],) for orb in orbs]
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO orb_tags (tag, orb_id) VALUES (?, ?)",
+            [(tag, orb["orb_id"]) for orb in orbs for tag in orb.get("tags", [])],
+        )
+
+    def _upsert_runes(self, runes: List[Dict[str, Any]]):
+        if not runes:
+            return
+        self._bump("runes")
+        self._conn.executemany(
+            "INSERT INTO runes (rune_id, orb_id, category, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (rune_id) DO UPDATE SET orb_id = excluded.orb_id, "
+            "category = excluded.category, data = excluded.data",
+            [
+                (
+                    rune["rune_id"],
+                    rune["orb_id"],
+                    rune.get("parameters", {}).get("category"),
+                    json.dumps(rune),
+                )
+                for rune in runes
+            ],
+        )
+
+    def upsert_orbs(self, orbs: Iterable[Dict[str, Any]]):
+        with self._lock, self._conn:
+            self._upsert_orbs(list(orbs))
+
+    def upsert_runes(self, runes: Iterable[Dict[str, Any]]):
+        with self._lock, self._conn:
+            self._upsert_runes(list(runes))
+
+    def replace_orbs(self, orbs: Iterable[Dict[str, Any]]):
+        """Swap in a full rebuild of the ORB catalog in one transaction"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM orb_tags")
+            self._conn.execute("DELETE FROM orbs")
+            self._bump("orbs")
+            self._upsert_orbs(list(orbs))
+
+    def replace_runes(self, runes: Iterable[Dict[str, Any]]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runes")
+            self._bump("runes")
+            self._upsert_runes(list(runes))
+
+    def get_orbs_by_category(self, categories: List[str]) -> List[Dict[str, Any]]:
+        if not categories:
+            return []
+        placeholders = ", ".join("?" * len(categories))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM orbs WHERE category IN ({placeholders})",
+                categories,
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def list_orbs(
+        self,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return (orbs, next_cursor) ordered by orb_id, via keyset pagination"""
+        clauses, params = [], []
+        if category:
+            clauses.append("orbs.category = ?")
+            params.append(category)
+        if tag:
+            clauses.append("orb_tags.tag = ?")
+            params.append(tag)
+        # Walk the tag table's (tag, orb_id) key when filtering by tag
+        source, order = "orbs", "orbs.orb_id"
+        if tag:
+            source = "orb_tags JOIN orbs ON orbs.orb_id = orb_tags.orb_id"
+            order = "orb_tags.orb_id"
+        if cursor:
+            clauses.append(f"{order} > ?")
+            params.append(decode_cursor(cursor))
+        return self._page(
+            f"SELECT {order}, orbs.data FROM {source}", clauses, params, order, limit
+        )
+
+    def list_runes(
+        self,
+        category: Optional[str] = None,
+        orb_id: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return (runes, next_cursor) ordered by rune_id, via keyset pagination"""
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if orb_id:
+            clauses.append("orb_id = ?")
+            params.append(orb_id)
+        if cursor:
+            clauses.append("rune_id > ?")
+            params.append(decode_cursor(cursor))
+        return self._page(
+            "SELECT rune_id, data FROM runes", clauses, params, "rune_id", limit
+        )
+
+    def _page(self, select: str, clauses, params, order: str, limit: int):
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"{select}{where} ORDER BY {order} LIMIT ?", (*params, limit + 1)
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0])
+        return [json.loads(data) for _, data in rows], next_cursor
+
+    def iter_orbs(self) -> Iterator[Dict[str, Any]]:
+        """Every ORB, fetched a page at a time"""
+        cursor = None
+        while True:
+            orbs, cursor = self.list_orbs(limit=ITER_BATCH_SIZE, cursor=cursor)
+            yield from orbs
+            if cursor is None:
+                return
+
+    def iter_runes(self) -> Iterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            runes, cursor = self.list_runes(limit=ITER_BATCH_SIZE, cursor=cursor)
+            yield from runes
+            if cursor is None:
+                return
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_catalog_store() -> CatalogStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = CatalogStore()
+                store.import_legacy_file("orbs", LEGACY_ORBS_PATH)
+                store.import_legacy_file("runes", LEGACY_RUNES_PATH)
+                _store = store
+    return _store
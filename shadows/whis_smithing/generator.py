@@ -1,8 +1,8 @@
 import os
 import json
 from logic.categorizer import categorize_task
-from logic.merger import dedupe_and_merge
-from logic.recurrence import update_recurrence
+from merger import dedupe_and_merge
+from recurrence import update_recurrence
 from logic.updater import generate_update_prompt
 from utils.io import save_orb, save_rune
 
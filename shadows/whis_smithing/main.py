@@ -1,9 +1,16 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from routes.smithing_routes import router as smithing_router
 from pydantic import BaseModel
-import csv
-import json
+from catalog_cache import etag_matches, get_catalog_cache
+from catalog_store import DEFAULT_PAGE_SIZE, get_catalog_store
+from training_queue import (
+    TRAINING_CHECKPOINT_PATH,
+    TRAINING_QUEUE_PATH,
+    TrainingQueueCheckpoint,
+    iter_completed_tasks,
+    task_category,
+)
 import requests
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -85,43 +92,68 @@ def health():
 
 
 @app.post("/generate-orbs")
-async def generate_orbs_from_training():
+async def generate_orbs_from_training(incremental: bool = False):
     """
     Generate ORBs from completed tasks in the training queue.
+
+    With incremental, only tasks completed since the last run are read
+    into memory, and only the ORBs of their categories are updated.
     """
     try:
-        csv_file_path = "/app/training_queue.csv"
-        orbs = []
-
-        if not os.path.exists(csv_file_path):
+        if not os.path.exists(TRAINING_QUEUE_PATH):
             return {"status": "error", "message": "Training queue not found"}
 
-        with open(csv_file_path, "r", newline="", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            completed_tasks = [row for row in reader if row["status"] == "completed"]
+        checkpoint = TrainingQueueCheckpoint(TRAINING_CHECKPOINT_PATH)
+        incremental = incremental and checkpoint.exists
+        queue_stat = os.stat(TRAINING_QUEUE_PATH)
+        if incremental and checkpoint.unchanged(queue_stat):
+            return {
+                "status": "success",
+                "mode": "incremental",
+                "new_completions": 0,
+                "orbs_generated": 0,
+                "orbs": [],
+            }
+        if not incremental:
+            checkpoint.reset()
 
         # Group tasks by category/tags to create ORBs
         task_groups = {}
-        for task in completed_tasks:
-            category = (
-                task.get("tags", "").split(",")[0].strip()
-                if task.get("tags")
-                else "general"
-            )
-            if category not in task_groups:
-                task_groups[category] = []
-            task_groups[category].append(task)
-
-        # Generate ORBs for each group
-        for category, tasks in task_groups.items():
-            orb = create_orb_from_tasks(category, tasks)
-            orbs.append(orb)
-
-        # Save ORBs to file
-        save_orbs(orbs)
+        new_completions = 0
+        for task in iter_completed_tasks(TRAINING_QUEUE_PATH, checkpoint):
+            checkpoint.advance(task)
+            task_groups.setdefault(task_category(task), []).append(task)
+            new_completions += 1
+
+        if incremental:
+            store = get_catalog_store()
+            stored = {
+                orb_data["category"]: Orb(**orb_data)
+                for orb_data in store.get_orbs_by_category(list(task_groups))
+            }
+            orbs = []
+            for category, tasks in task_groups.items():
+                if category in stored:
+                    orb = merge_tasks_into_orb(stored[category], tasks)
+                else:
+                    orb = create_orb_from_tasks(category, tasks)
+                orbs.append(orb)
+            store.upsert_orbs(orb.dict() for orb in orbs)
+        else:
+            # Generate ORBs for each group
+            orbs = [
+                create_orb_from_tasks(category, tasks)
+                for category, tasks in task_groups.items()
+            ]
+            save_orbs(orbs)
+
+        # Stat taken before reading, so a write made meanwhile is read next run
+        checkpoint.save(queue_stat)
 
         return {
             "status": "success",
+            "mode": "incremental" if incremental else "full",
+            "new_completions": new_completions,
             "orbs_generated": len(orbs),
             "orbs": [orb.dict() for orb in orbs],
         }
@@ -156,39 +188,82 @@ async def generate_runes_from_orbs():
         return {"status": "error", "error": str(e)}
 
 
+def catalog_response(request: Request, kind: str, params: tuple, build):
+    """Serve a catalog page from the cache, or 304 if the client has it"""
+    store = get_catalog_store()
+    page = get_catalog_cache().page(
+        (store.path, kind, *params), store.generation(kind), build
+    )
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
 @app.get("/orbs")
-async def get_orbs():
-    """Get all generated ORBs"""
+async def get_orbs(
+    request: Request,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """Get one page of generated ORBs, ordered by orb_id"""
+
+    def build():
+        orbs, next_cursor = get_catalog_store().list_orbs(
+            category=category, tag=tag, limit=limit, cursor=cursor
+        )
+        return {"orbs": orbs, "next_cursor": next_cursor}
+
     try:
-        orbs = load_orbs()
-        return {"orbs": [orb.dict() for orb in orbs]}
+        return catalog_response(request, "orbs", (category, tag, limit, cursor), build)
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
 @app.get("/runes")
-async def get_runes():
-    """Get all generated RUNEs"""
+async def get_runes(
+    request: Request,
+    category: Optional[str] = None,
+    orb_id: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    """Get one page of generated RUNEs, ordered by rune_id"""
+
+    def build():
+        runes, next_cursor = get_catalog_store().list_runes(
+            category=category, orb_id=orb_id, limit=limit, cursor=cursor
+        )
+        return {"runes": runes, "next_cursor": next_cursor}
+
     try:
-        runes = load_runes()
-        return {"runes": [rune.dict() for rune in runes]}
+        return catalog_response(
+            request, "runes", (category, orb_id, limit, cursor), build
+        )
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
 @app.post("/process-training-queue")
-async def process_training_queue():
+async def process_training_queue(incremental: bool = False):
     """
     Complete pipeline: Generate ORBs and RUNEs from training queue.
     """
     try:
         # Step 1: Generate ORBs
-        orbs_result = await generate_orbs_from_training()
+        orbs_result = await generate_orbs_from_training(incremental)
         if orbs_result["status"] != "success":
             return orbs_result
 
-        # Step 2: Generate RUNEs
-        runes_result = await generate_runes_from_orbs()
+        # Step 2: Generate RUNEs, only for the updated ORBs when incremental
+        if orbs_result["mode"] == "incremental":
+            runes_result = refresh_runes(
+                [Orb(**orb_data) for orb_data in orbs_result["orbs"]]
+            )
+        else:
+            runes_result = await generate_runes_from_orbs()
         if runes_result["status"] != "success":
             return runes_result
 
@@ -245,6 +320,47 @@ def create_orb_from_tasks(category: str, tasks: List[Dict[str, Any]]) -> Orb:
     return orb
 
 
+def merge_tasks_into_orb(orb: Orb, tasks: List[Dict[str, Any]]) -> Orb:
+    """Fold newly completed tasks into an existing ORB's aggregates"""
+    knowledge = orb.knowledge_base
+    tools_used = list(knowledge.get("tools_used", []))
+    commands = list(knowledge.get("common_commands", []))
+    success_patterns = list(knowledge.get("success_patterns", []))
+
+    for task in tasks:
+        if task.get("tools_used"):
+            tools_used.extend(task["tools_used"].split(","))
+        if task.get("commands"):
+            commands.append(task["commands"])
+        if task.get("solution_summary"):
+            success_patterns.append(task["solution_summary"])
+    tools_used = list(dict.fromkeys(tools_used))
+
+    previous_count = knowledge.get("task_count", 0)
+    task_count = previous_count + len(tasks)
+    completed = len([t for t in tasks if t.get("status") == "completed"])
+    success_rate = (
+        knowledge.get("success_rate", 0.0) * previous_count + completed
+    ) / task_count
+
+    return orb.copy(
+        update={
+            "description": f"Knowledge base for {orb.category} operations based on {task_count} completed tasks",
+            "tags": tools_used,
+            "knowledge_base": {
+                **knowledge,
+                "tools_used": tools_used,
+                "common_commands": commands,
+                "success_patterns": success_patterns,
+                "task_count": task_count,
+                "success_rate": success_rate,
+            },
+            "confidence": success_rate,
+            "updated_at": datetime.now().isoformat(),
+        }
+    )
+
+
 def create_rune_from_orb(orb: Orb) -> Rune:
     """Create a RUNE from an ORB"""
 
@@ -272,40 +388,35 @@ def create_rune_from_orb(orb: Orb) -> Rune:
     return rune
 
 
+def refresh_runes(orbs: List[Orb]) -> Dict[str, Any]:
+    """Regenerate the RUNEs of the given ORBs, keeping all others"""
+    refreshed = [create_rune_from_orb(orb) for orb in orbs]
+    get_catalog_store().upsert_runes(rune.dict() for rune in refreshed)
+    return {
+        "status": "success",
+        "runes_generated": len(refreshed),
+        "runes": [rune.dict() for rune in refreshed],
+    }
+
+
 def save_orbs(orbs: List[Orb]):
-    """Save ORBs to JSON file"""
-    orbs_file = "/app/orbs.json"
-    with open(orbs_file, "w") as f:
-        json.dump([orb.dict() for orb in orbs], f, indent=2)
+    """Replace the ORB catalog with orbs"""
+    get_catalog_store().replace_orbs(orb.dict() for orb in orbs)
 
 
 def load_orbs() -> List[Orb]:
-    """Load ORBs from JSON file"""
-    orbs_file = "/app/orbs.json"
-    if not os.path.exists(orbs_file):
-        return []
-
-    with open(orbs_file, "r") as f:
-        data = json.load(f)
-        return [Orb(**orb_data) for orb_data in data]
+    """Load every ORB from the catalog"""
+    return [Orb(**orb_data) for orb_data in get_catalog_store().iter_orbs()]
 
 
 def save_runes(runes: List[Rune]):
-    """Save RUNEs to JSON file"""
-    runes_file = "/app/runes.json"
-    with open(runes_file, "w") as f:
-        json.dump([rune.dict() for rune in runes], f, indent=2)
+    """Replace the RUNE catalog with runes"""
+    get_catalog_store().replace_runes(rune.dict() for rune in runes)
 
 
 def load_runes() -> List[Rune]:
-    """Load RUNEs from JSON file"""
-    runes_file = "/app/runes.json"
-    if not os.path.exists(runes_file):
-        return []
-
-    with open(runes_file, "r") as f:
-        data = json.load(f)
-        return [Rune(**rune_data) for rune_data in data]
+    """Load every RUNE from the catalog"""
+    return [Rune(**rune_data) for rune_data in get_catalog_store().iter_runes()]
 
 
 # Import routes (commented until routes are properly set up)
@@ -1,4 +1,260 @@
+"""
+Near-duplicate merging for smithing orbs and runes.
+
+Each orb (title/description) and rune (task/script) is MinHashed and looked
+up in LSH buckets kept in the smithing database, scoped by kind and agent.
+An item scoring DEDUPE_THRESHOLD or more against an entry is folded into
+that canonical entry: occurrences add up and confidence becomes their
+weighted mean. Lookups read only the bucket rows for the item's band keys,
+so an insert costs the same however many entries are stored, and the index
+carries over from one batch to the next.
+
+This is the engine whis_logic runs in logic/merger.py, kept here because
+the smithing image ships only this directory. Both use the same hashing
+and band layout, but each service keeps its own index.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from catalog_store import SMITHING_DB_PATH
+
+DEDUPE_THRESHOLD = float(os.getenv("WHIS_DEDUPE_THRESHOLD", "0.85"))
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace so trivial edits still hit"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def orb_text(orb: dict) -> str:
+    return " ".join(
+        str(orb.get(field, ""))
+        for field in ("title", "description", "task_description")
+    )
+
+
+def rune_text(rune: dict) -> str:
+    return f"{rune.get('task_description', '')} {rune.get('script', '')}"
+
+
+def _optimal_bands(threshold: float, num_perm: int, false_negative_weight=0.9):
+    """Pick (bands, rows) minimizing weighted false positive/negative area
+
+    Candidates are re-scored against full signatures, so false positives only
+    cost a comparison while false negatives lose a match; recall is favored.
+    """
+    grid = np.linspace(0.0, 1.0, 1001)
+    below, above = grid[grid < threshold], grid[grid >= threshold]
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        false_positive = np.mean(1 - (1 - below**rows) ** bands) * threshold
+        false_negative = np.mean((1 - above**rows) ** bands) * (1 - threshold)
+        error = (
+            1 - false_negative_weight
+        ) * false_positive + false_negative_weight * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(1)
+        # a < 2^31 and 32-bit shingle hashes keep a*x+b inside uint64
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, normalized: str):
+        if len(normalized) <= self.shingle_size:
+            return {normalized}
+        k = self.shingle_size
+        return {normalized[i : i + k] for i in range(len(normalized) - k + 1)}
+
+    def signature(self, normalized: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(s.encode(), digest_size=4).digest(), "little"
+                )
+                for s in self.shingles(normalized)
+            ),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+
+def merge_items(canonical: dict, item: dict) -> dict:
+    """Fold item into canonical, keeping the canonical id and content"""
+    canonical_count = canonical.get("occurrences", 1)
+    item_count = item.get("occurrences", 1)
+    merged = dict(canonical, occurrences=canonical_count + item_count)
+    if "confidence" in canonical or "confidence" in item:
+        merged["confidence"] = (
+            canonical.get("confidence", item.get("confidence", 0.0)) * canonical_count
+            + item.get("confidence", canonical.get("confidence", 0.0)) * item_count
+        ) / (canonical_count + item_count)
+    return merged
+
+
+class DedupeIndex:
+    def __init__(
+        self,
+        path: str = SMITHING_DB_PATH,
+        threshold: float = DEDUPE_THRESHOLD,
+        num_perm: int = NUM_PERM,
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dedupe_entries (
+                id INTEGER PRIMARY KEY,
+                scope TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                item TEXT NOT NULL,
+                occurrences INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS dedupe_entries_fingerprint
+                ON dedupe_entries (scope, fingerprint);
+            CREATE TABLE IF NOT EXISTS dedupe_buckets (
+                scope TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                entry_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS dedupe_buckets_lookup
+                ON dedupe_buckets (scope, bucket);
+            """)
+
+    def _bucket_keys(self, signature: np.ndarray):
+        """One signed 64-bit key per band, so buckets fit an integer index"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows : (band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                band.to_bytes(2, "little") + chunk.tobytes(), digest_size=8
+            ).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def _find(self, scope: str, fingerprint: str, signature, bucket_keys):
+        row = self._conn.execute(
+            "SELECT id, item FROM dedupe_entries "
+            "WHERE scope = ? AND fingerprint = ?",
+            (scope, fingerprint),
+        ).fetchone()
+        if row is not None:
+            return row
+
+        placeholders = ", ".join("?" * len(bucket_keys))
+        candidates = self._conn.execute(
+            "SELECT id, item, signature FROM dedupe_entries WHERE id IN ("
+            "SELECT entry_id FROM dedupe_buckets "
+            f"WHERE scope = ? AND bucket IN ({placeholders}))",
+            (scope, *bucket_keys),
+        ).fetchall()
+        best, best_score = None, 0.0
+        for entry_id, item, stored in candidates:
+            score = float(np.mean(np.frombuffer(stored, np.uint64) == signature))
+            if score > best_score:
+                best, best_score = (entry_id, item), score
+        return best if best_score >= self.threshold else None
+
+    def merge(self, kind: str, agent: str, item: dict, text: str) -> dict:
+        """Return the canonical entry for item, recording item in the index
+
+        A first sighting becomes canonical as-is; a near duplicate returns
+        the canonical entry it was merged into, carrying the combined
+        occurrences and confidence.
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return item
+        scope = f"{kind}:{agent}"
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()
+        signature = self.hasher.signature(normalized)
+        bucket_keys = self._bucket_keys(signature)
+        now = datetime.utcnow().isoformat()
+
+        with self._lock, self._conn:
+            match = self._find(scope, fingerprint, signature, bucket_keys)
+            if match is not None:
+                entry_id, stored = match
+                merged = merge_items(json.loads(stored), item)
+                self._conn.execute(
+                    "UPDATE dedupe_entries SET item = ?, occurrences = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (json.dumps(merged), merged["occurrences"], now, entry_id),
+                )
+                return merged
+
+            canonical = dict(item, occurrences=item.get("occurrences", 1))
+            entry_id = self._conn.execute(
+                "INSERT INTO dedupe_entries "
+                "(scope, fingerprint, signature, item, occurrences, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    scope,
+                    fingerprint,
+                    signature.tobytes(),
+                    json.dumps(canonical),
+                    canonical["occurrences"],
+                    now,
+                ),
+            ).lastrowid
+            self._conn.executemany(
+                "INSERT INTO dedupe_buckets (scope, bucket, entry_id) VALUES (?, ?, ?)",
+                [(scope, key, entry_id) for key in bucket_keys],
+            )
+            return canonical
+
+
+_dedupe_index = None
+_dedupe_index_lock = threading.Lock()
+
+
+def get_dedupe_index() -> DedupeIndex:
+    global _dedupe_index
+    if _dedupe_index is None:
+        with _dedupe_index_lock:
+            if _dedupe_index is None:
+                _dedupe_index = DedupeIndex()
+    return _dedupe_index
+
+
 def dedupe_and_merge(agent: str, orb: dict, rune: dict):
-    # TODO: Implement deduplication logic
-    # For now, just return the original orb and rune
-    return orb, rune
+    """Replace orb and rune with the canonical entries they duplicate"""
+    index = get_dedupe_index()
+    canonical_orb = index.merge("orb", agent, orb, orb_text(orb))
+    if "orb_id" in rune and rune["orb_id"] == orb.get("id"):
+        rune = dict(rune, orb_id=canonical_orb.get("id"))
+    canonical_rune = index.merge("rune", agent, rune, rune_text(rune))
+    return canonical_orb, canonical_rune
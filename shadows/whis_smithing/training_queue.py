@@ -0,0 +1,111 @@
+"""
+Whis Smithing - Training Queue Reader
+Streams completed tasks from the training queue CSV, incrementally
+"""
+
+import csv
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+TRAINING_QUEUE_PATH = os.getenv("TRAINING_QUEUE_PATH", "/app/training_queue.csv")
+TRAINING_CHECKPOINT_PATH = os.getenv(
+    "TRAINING_CHECKPOINT_PATH", "/app/training_queue.checkpoint.json"
+)
+
+
+def task_category(task: Dict[str, Any]) -> str:
+    """The ORB category of a task: its first tag, or general"""
+    tags = task.get("tags")
+    return tags.split(",")[0].strip() if tags else "general"
+
+
+def iter_completed_tasks(
+    path: str = TRAINING_QUEUE_PATH,
+    checkpoint: Optional["TrainingQueueCheckpoint"] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Completed rows of the training queue, one at a time
+
+    With a checkpoint, only rows completed since it are yielded. Rows are
+    filtered on their raw fields, so a dict is only built for those.
+    """
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        status = header.index("status")
+        task_id = header.index("task_id")
+        completed_at = header.index("completed_at")
+        for row in reader:
+            if len(row) <= max(status, task_id, completed_at):
+                continue
+            if row[status] != "completed":
+                continue
+            if checkpoint and not checkpoint.is_new(row[task_id], row[completed_at]):
+                continue
+            yield dict(zip(header, row))
+
+
+class TrainingQueueCheckpoint:
+    """How far smithing has got through the training queue
+
+    Tasks are completed by rewriting their row in place, so a byte offset
+    cannot tell new completions apart; the completed_at watermark can.
+    Timestamps are compared as isoformat() strings, which order the same
+    as the datetimes they encode. The task ids completed exactly at the
+    watermark are kept so a row is never merged twice, and the file's size
+    and mtime let an unchanged queue be skipped without reading it.
+    """
+
+    def __init__(self, path: str = TRAINING_CHECKPOINT_PATH):
+        self.path = path
+        self.watermark = ""
+        self.task_ids_at_watermark: List[str] = []
+        self.size = None
+        self.mtime_ns = None
+        self.exists = False
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                state = json.load(f)
+            self.watermark = state["watermark"]
+            self.task_ids_at_watermark = state["task_ids_at_watermark"]
+            self.size = state.get("size")
+            self.mtime_ns = state.get("mtime_ns")
+            self.exists = True
+
+    def reset(self) -> None:
+        """Start over, for a full rebuild of every ORB"""
+        self.watermark = ""
+        self.task_ids_at_watermark = []
+
+    def unchanged(self, stat: os.stat_result) -> bool:
+        return (self.size, self.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    def is_new(self, task_id: str, completed_at: str) -> bool:
+        if completed_at != self.watermark:
+            return completed_at > self.watermark
+        return task_id not in self.task_ids_at_watermark
+
+    def advance(self, task: Dict[str, Any]) -> None:
+        completed_at = task.get("completed_at") or ""
+        if completed_at > self.watermark:
+            self.watermark = completed_at
+            self.task_ids_at_watermark = [task["task_id"]]
+        elif completed_at == self.watermark:
+            self.task_ids_at_watermark.append(task["task_id"])
+
+    def save(self, stat: os.stat_result) -> None:
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        state = {
+            "watermark": self.watermark,
+            "task_ids_at_watermark": self.task_ids_at_watermark,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+        self.exists = True
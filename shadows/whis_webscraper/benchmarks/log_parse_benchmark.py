@@ -0,0 +1,135 @@
+"""
+Benchmark the compiled log line parser against the original per-line parsing.
+
+Generates a synthetic agent log (default 500k lines) mixing the ISO, standard
+and time-only formats in runs, the way each file is written by one logger,
+checks both parsers agree on every parseable line, and prints lines/second.
+
+    python benchmarks/log_parse_benchmark.py --lines 500000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from log_parser import LogLineParser  # noqa: E402
+
+LEGACY_PATTERNS = [
+    r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2}))"
+    r"\s+(\w+)\s+(.+)",
+    r"(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(\w+)\s+(.+)",
+    r"(\d{2}:\d{2}:\d{2})\s+(.+)",
+]
+MESSAGES = [
+    "deployment katie-api scaled to 3 replicas",
+    "error connecting to postgres, retrying",
+    "request completed in 42ms",
+    "training run finished successfully",
+    "recommend raising the memory limit",
+]
+
+
+def legacy_parse_timestamp(timestamp_str):
+    try:
+        if "T" in timestamp_str:
+            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        elif len(timestamp_str) > 10:
+            return datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+        else:
+            today = datetime.now().date()
+            time_part = datetime.strptime(timestamp_str, "%H:%M:%S").time()
+            return datetime.combine(today, time_part)
+    except Exception:
+        return datetime.now()
+
+
+def legacy_parse_line(line):
+    """The original AgentLogScraper._parse_log_line"""
+    line = line.strip()
+    if not line:
+        return None
+    for pattern in LEGACY_PATTERNS:
+        match = re.match(pattern, line)
+        if match:
+            groups = match.groups()
+            if len(groups) >= 2:
+                return {
+                    "timestamp": legacy_parse_timestamp(groups[0]),
+                    "level": groups[1] if len(groups) > 2 else "INFO",
+                    "message": groups[-1],
+                    "raw_line": line,
+                }
+    return {
+        "timestamp": datetime.now(),
+        "level": "UNKNOWN",
+        "message": line,
+        "raw_line": line,
+    }
+
+
+def make_lines(count, seed=7):
+    rng = random.Random(seed)
+    formats = [
+        "2025-06-{day:02d}T{h:02d}:{m:02d}:{s:02d}.{ms:03d}Z {level} {message}\n",
+        "2025-06-{day:02d}T{h:02d}:{m:02d}:{s:02d}+02:00 {level} {message}\n",
+        "2025-06-{day:02d} {h:02d}:{m:02d}:{s:02d} {level} {message}\n",
+        "{h:02d}:{m:02d}:{s:02d} {message}\n",
+    ]
+    lines = []
+    while len(lines) < count:
+        template = rng.choice(formats)
+        for _ in range(rng.randint(500, 5000)):
+            lines.append(
+                template.format(
+                    day=rng.randint(1, 28),
+                    h=rng.randint(0, 23),
+                    m=rng.randint(0, 59),
+                    s=rng.randint(0, 59),
+                    ms=rng.randint(0, 999),
+                    level=rng.choice(["INFO", "WARNING", "ERROR"]),
+                    message=rng.choice(MESSAGES),
+                )
+            )
+    return lines[:count]
+
+
+def comparable(entry):
+    return entry["timestamp"], entry["level"], entry["message"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+
+    start = time.perf_counter()
+    legacy = [legacy_parse_line(line) for line in lines]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    line_parser = LogLineParser()
+    compiled = [line_parser.parse(line) for line in lines]
+    compiled_seconds = time.perf_counter() - start
+
+    mismatches = sum(
+        comparable(old) != comparable(new) for old, new in zip(legacy, compiled)
+    )
+    if mismatches:
+        sys.exit(f"{mismatches} lines parsed differently")
+
+    print(f"lines: {len(lines):,}")
+    print(f"legacy:   {len(lines) / legacy_seconds:12,.0f} lines/s")
+    print(f"compiled: {len(lines) / compiled_seconds:12,.0f} lines/s")
+    print(f"speedup:  {legacy_seconds / compiled_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Whis WebScraper - Content Fingerprint Store
+SimHash fingerprints of items already sent to sanitize, to drop repeats
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_DB = os.getenv("SCRAPER_FINGERPRINT_DB", "storage/content_fingerprints.db")
+FINGERPRINT_TTL_DAYS = float(os.getenv("SCRAPER_FINGERPRINT_TTL_DAYS", "30"))
+MAX_DISTANCE = 3
+BANDS = 4
+BAND_BITS = 64 // BANDS
+SHINGLE_WORDS = 3
+
+# Fields that carry an item's content; volatile ones like stars are left out
+TEXT_FIELDS = ("title", "summary", "description", "message", "content")
+
+_WORD = re.compile(r"\w+")
+_MASK = (1 << 64) - 1
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    return "\n".join(
+        value for value in (item.get(field) for field in TEXT_FIELDS) if value
+    )
+
+
+def simhash(words: List[str]) -> int:
+    """64-bit SimHash over word shingles"""
+    if len(words) <= SHINGLE_WORDS:
+        grams = {" ".join(words)}
+    else:
+        grams = {
+            " ".join(words[i : i + SHINGLE_WORDS])
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        }
+    weights = [0] * 64
+    for gram in grams:
+        value = int.from_bytes(
+            hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big"
+        )
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(value: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [value >> (band * BAND_BITS) & mask for band in range(BANDS)]
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class Fingerprint:
+    __slots__ = ("exact", "simhash", "source")
+
+    def __init__(self, exact: str, simhash: int, source: str):
+        self.exact = exact
+        self.simhash = simhash
+        self.source = source
+
+
+class ContentFingerprintStore:
+    """Persistent SimHash index of content already delivered
+
+    An item is an exact duplicate when its normalized text hashes the same,
+    and a near duplicate when its SimHash is within MAX_DISTANCE bits of a
+    stored one. The 64 bits are split into BANDS bands; with MAX_DISTANCE
+    below BANDS any near duplicate agrees on at least one whole band, so
+    candidates come from indexed band lookups rather than a full scan.
+    Fingerprints expire after FINGERPRINT_TTL_DAYS, which keeps the index
+    bounded and lets a recurring log pattern through again.
+    """
+
+    def __init__(
+        self,
+        path: str = FINGERPRINT_DB,
+        max_distance: int = MAX_DISTANCE,
+        ttl_days: float = FINGERPRINT_TTL_DAYS,
+    ):
+        self.path = path
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            bands = ", ".join(f"band{band} INTEGER NOT NULL" for band in range(BANDS))
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    exact TEXT PRIMARY KEY,
+                    simhash INTEGER NOT NULL,
+                    {bands},
+                    source TEXT,
+                    seen_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS fingerprints_seen
+                    ON fingerprints (seen_at);
+                """)
+            for band in range(BANDS):
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS fingerprints_band{band} "
+                    f"ON fingerprints (band{band})"
+                )
+            self._conn = conn
+        return self._conn
+
+    def _is_near(self, value: int, candidates) -> bool:
+        return any(
+            ((value ^ other) & _MASK).bit_count() <= self.max_distance
+            for other in candidates
+        )
+
+    def _stored_near(self, conn, value: int) -> bool:
+        where = " OR ".join(f"band{band} = ?" for band in range(BANDS))
+        rows = conn.execute(
+            f"SELECT simhash FROM fingerprints WHERE {where}", _bands(value)
+        ).fetchall()
+        return self._is_near(value, (row[0] for row in rows))
+
+    def filter_new(
+        self, scraped_data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], List[Optional[Fingerprint]], Dict[str, int]]:
+        """Drop items seen before or repeated within scraped_data
+
+        Returns the remaining data, a fingerprint for each remaining item in
+        the order format_for_sanitize flattens them (None where an item has
+        no text), and the number suppressed per source. Nothing is recorded
+        here; pass the fingerprints of delivered items to remember().
+        """
+        kept_data: Dict[str, Any] = {}
+        pending: List[Optional[Fingerprint]] = []
+        suppressed: Dict[str, int] = {}
+        batch_exact = set()
+        batch_bands: Dict[Tuple[int, int], List[int]] = {}
+
+        with self._lock:
+            conn = self._connection()
+            for source, items in scraped_data.items():
+                if not isinstance(items, list):
+                    kept_data[source] = items
+                    pending.extend([None] * len(items))
+                    continue
+                kept = []
+                for item in items:
+                    words = (
+                        _WORD.findall(item_text(item).lower())
+                        if isinstance(item, dict)
+                        else []
+                    )
+                    if not words:
+                        kept.append(item)
+                        pending.append(None)
+                        continue
+
+                    exact = hashlib.sha256(" ".join(words).encode()).hexdigest()
+                    value = simhash(words)
+                    keys = list(enumerate(_bands(value)))
+                    duplicate = exact in batch_exact or self._is_near(
+                        value,
+                        (other for key in keys for other in batch_bands.get(key, ())),
+                    )
+                    if not duplicate:
+                        duplicate = conn.execute(
+                            "SELECT 1 FROM fingerprints WHERE exact = ?", (exact,)
+                        ).fetchone() is not None or self._stored_near(conn, value)
+                    if duplicate:
+                        suppressed[source] = suppressed.get(source, 0) + 1
+                        continue
+
+                    batch_exact.add(exact)
+                    for key in keys:
+                        batch_bands.setdefault(key, []).append(value)
+                    kept.append(item)
+                    pending.append(Fingerprint(exact, value, source))
+                kept_data[source] = kept
+
+        if suppressed:
+            logger.info(f"Suppressed duplicate items per source: {suppressed}")
+        return kept_data, pending, suppressed
+
+    def remember(self, fingerprints):
+        """Record delivered items and expire fingerprints past the TTL"""
+        now = time.time()
+        rows = [
+            (
+                fingerprint.exact,
+                _signed(fingerprint.simhash),
+                *_bands(fingerprint.simhash),
+                fingerprint.source,
+                now,
+            )
+            for fingerprint in fingerprints
+            if fingerprint is not None
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO fingerprints VALUES "
+                    f"({', '.join('?' * (BANDS + 4))})",
+                    rows,
+                )
+                conn.execute(
+                    "DELETE FROM fingerprints WHERE seen_at < ?",
+                    (now - self.ttl_seconds,),
+                )
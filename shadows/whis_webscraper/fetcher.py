@@ -0,0 +1,174 @@
+"""
+Whis WebScraper - Async Fetch Engine
+Pooled HTTP fetching with a global concurrency cap and per-host rate limits
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from http_cache import HttpCache
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "8"))
+PER_HOST_RATE = float(os.getenv("SCRAPER_PER_HOST_RATE", "1.0"))
+PER_HOST_BURST = int(os.getenv("SCRAPER_PER_HOST_BURST", "1"))
+REQUEST_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, bursting up to burst"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """Shared keep-alive client that spreads requests across hosts
+
+    Requests to different hosts run in parallel up to max_concurrency, while
+    each host gets its own token bucket so no single server sees more than
+    its rate. Client, semaphore and buckets are bound to the event loop that
+    first uses them and rebuilt if a different loop calls in.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        per_host_rate: float = PER_HOST_RATE,
+        per_host_burst: int = PER_HOST_BURST,
+        host_rates: Optional[Dict[str, float]] = None,
+        timeout: float = REQUEST_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[HttpCache] = None,
+    ):
+        self.headers = dict(headers or {})
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.host_rates = dict(host_rates or {})
+        self.timeout = timeout
+        self.transport = transport
+        self.cache = cache
+        self.stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+        }
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def _bind(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            stale = self._client
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._buckets = {}
+            if stale is not None:
+                await self._close_stale(stale)
+        return self._client
+
+    @staticmethod
+    async def _close_stale(client: httpx.AsyncClient):
+        """Close the client an earlier event loop left behind"""
+        try:
+            await client.aclose()
+        except RuntimeError as e:
+            # Connections opened on a loop that has since closed cannot be
+            # shut down from this one; call aclose() before the loop ends
+            logger.warning(f"Could not close HTTP client of a closed loop: {e}")
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self.host_rates.get(host, self.per_host_rate)
+            bucket = self._buckets[host] = TokenBucket(rate, self.per_host_burst)
+        return bucket
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """GET url once its host's bucket allows it; returns the httpx.Response"""
+        client = await self._bind()
+        await self._bucket(urlsplit(url).hostname or "").acquire()
+        async with self._semaphore:
+            logger.debug(f"Fetching {url}")
+            response = await client.get(url, headers=headers)
+        self.stats["requests"] += 1
+        self.stats["bytes_downloaded"] += len(response.content)
+        return response
+
+    async def get_parsed(
+        self, url: str, parser: str, parse: Callable[[bytes], Any]
+    ) -> Any:
+        """GET url and return parse(body), skipping work when nothing changed
+
+        With a cache, the stored ETag / Last-Modified go out as
+        If-None-Match / If-Modified-Since. A 304 returns the result stored
+        for this parser name without parsing; only a parser that has not
+        seen the body yet runs, once, on the cached copy. Parse results must
+        be JSON-serializable.
+        """
+        if self.cache is None:
+            response = await self.get(url)
+            response.raise_for_status()
+            return parse(response.content)
+
+        entry = self.cache.load(url)
+        response = await self.get(url, headers=self.cache.validators(entry))
+        if response.status_code == 304 and entry is not None:
+            self.stats["not_modified"] += 1
+            self.stats["bytes_saved"] += entry.get("size", 0)
+            if parser in entry["parsed"]:
+                return entry["parsed"][parser]
+            body = self.cache.load_body(url)
+            if body is not None:
+                entry["parsed"][parser] = parse(body)
+                self.cache.save(url, entry)
+                return entry["parsed"][parser]
+            response = await self.get(url)  # Cached body lost; fetch it again
+
+        response.raise_for_status()
+        result = parse(response.content)
+        self.cache.store(url, response.headers, response.content, {parser: result})
+        return result
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,88 @@
+"""
+Whis WebScraper - Conditional-GET HTTP Cache
+Per-URL validators, compressed bodies and parse results kept on disk
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", "storage/http_cache")
+
+
+class HttpCache:
+    """On-disk cache entry per URL, keyed by the SHA-256 of the URL
+
+    <key>.json holds the ETag / Last-Modified validators plus the parse
+    result of the body for each parser that has seen it; <key>.body.gz holds
+    the gzip-compressed body so a parser that has not seen it yet can still
+    run on a 304.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url, ".json")) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def validators(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        try:
+            with gzip.open(self._path(url, ".body.gz"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, headers, body: bytes, parsed: Dict[str, Any]):
+        """Store a 200 response with its parse results keyed by parser name
+
+        Responses without validators are skipped: a conditional GET could
+        never hit them.
+        """
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        self._write(self._path(url, ".body.gz"), gzip.compress(body, compresslevel=6))
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().isoformat(),
+            "size": len(body),
+            "parsed": parsed,
+        }
+        self.save(url, entry)
+
+    def save(self, url: str, entry: Dict[str, Any]):
+        self._write(self._path(url, ".json"), json.dumps(entry).encode())
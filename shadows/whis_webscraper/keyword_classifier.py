@@ -0,0 +1,36 @@
+"""
+Whis WebScraper - Keyword Classifier
+Tags text with every keyword category it mentions, searching the text once
+per distinct keyword
+"""
+
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Set, Tuple
+
+
+class KeywordClassifier:
+    """One lookup table for the keywords of all categories
+
+    Keywords match as case-insensitive substrings, like `keyword in text`.
+    They are lowercased and deduplicated once, each mapped to every category
+    that lists it, so a text is lowercased once and each distinct keyword is
+    searched for once however many categories share it.
+    """
+
+    def __init__(self, categories: Dict[Hashable, Iterable[str]]):
+        owners: Dict[str, Set[Hashable]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                if keyword:
+                    owners.setdefault(keyword.lower(), set()).add(category)
+        self._table: List[Tuple[str, FrozenSet[Hashable]]] = [
+            (keyword, frozenset(cats)) for keyword, cats in owners.items()
+        ]
+
+    def classify(self, text: str) -> Set[Hashable]:
+        """Every category with at least one keyword in text"""
+        if not text:
+            return set()
+        text = text.lower()
+        return set().union(
+            *[categories for keyword, categories in self._table if keyword in text]
+        )
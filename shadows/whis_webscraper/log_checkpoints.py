@@ -0,0 +1,97 @@
+"""
+Whis WebScraper - Log Tail Checkpoints
+Persisted per-file read offsets so agent logs are only parsed once
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = os.getenv("LOG_CHECKPOINT_PATH", "storage/log_checkpoints.json")
+HEAD_BYTES = 256
+
+
+def _head_hash(path: str, size: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(size)).hexdigest()
+
+
+def file_key(stat: os.stat_result) -> str:
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+class LogCheckpoints:
+    """Byte offset reached in each log file, keyed by device and inode
+
+    Keying by inode keeps a checkpoint attached to a file when rotation
+    renames it, so the rest of a rotated file is still read exactly once.
+    A checkpoint also records a hash of the first bytes already read; if
+    those bytes changed (inode reused by a new file) or the file shrank
+    below the offset (copytruncate), the file is read from the start.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._checkpoints = json.load(f)
+        except FileNotFoundError:
+            self._checkpoints = {}
+        except ValueError as e:
+            logger.warning(f"Log checkpoints unreadable, starting over: {e}")
+            self._checkpoints = {}
+
+    def __contains__(self, stat: os.stat_result) -> bool:
+        with self._lock:
+            return file_key(stat) in self._checkpoints
+
+    def start_position(self, path: str, stat: os.stat_result):
+        """Return (byte offset, lines already read) to resume path from"""
+        with self._lock:
+            checkpoint = self._checkpoints.get(file_key(stat))
+        if checkpoint is None:
+            return 0, 0
+        if stat.st_size < checkpoint["offset"]:
+            logger.info(f"{path} was truncated, reading from the start")
+            return 0, 0
+        if _head_hash(path, checkpoint["head_size"]) != checkpoint["head"]:
+            logger.info(f"{path} was replaced, reading from the start")
+            return 0, 0
+        return checkpoint["offset"], checkpoint["lines"]
+
+    def advance(self, path: str, stat: os.stat_result, offset: int, lines: int):
+        head_size = min(HEAD_BYTES, offset)
+        with self._lock:
+            self._checkpoints[file_key(stat)] = {
+                "path": path,
+                "offset": offset,
+                "lines": lines,
+                "head": _head_hash(path, head_size),
+                "head_size": head_size,
+                "updated_at": datetime.now().isoformat(),
+            }
+
+    def prune(self, live_keys):
+        """Forget checkpoints for files that no longer exist"""
+        with self._lock:
+            for key in set(self._checkpoints) - set(live_keys):
+                del self._checkpoints[key]
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self._checkpoints, indent=2)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
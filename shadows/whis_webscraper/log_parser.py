@@ -0,0 +1,84 @@
+"""
+Whis WebScraper - Agent Log Line Parser
+Compiled line formats with per-file format detection
+"""
+
+import re
+from datetime import date, datetime, time
+from typing import Any, Dict, Optional
+
+ISO_LINE = re.compile(
+    r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2}))"
+    r"\s+(\w+)\s+(.+)"
+)
+STANDARD_LINE = re.compile(r"(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(\w+)\s+(.+)")
+TIME_LINE = re.compile(r"(\d{2}:\d{2}:\d{2})\s+(.+)")
+
+
+def parse_iso_timestamp(text: str) -> Optional[datetime]:
+    """Timezone-aware datetime for an ISO_LINE timestamp, None if impossible"""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def parse_standard_timestamp(text: str) -> Optional[datetime]:
+    # Date and time sit at fixed offsets from either end of the match
+    try:
+        return datetime.fromisoformat(f"{text[:10]} {text[-8:]}")
+    except ValueError:
+        return None
+
+
+def parse_time_of_day(text: str, day: date) -> Optional[datetime]:
+    try:
+        return datetime.combine(day, time.fromisoformat(text))
+    except ValueError:
+        return None
+
+
+class LogLineParser:
+    """Parses the lines of one log file
+
+    A file is written by one logger, so the format the previous line matched
+    is tried first; the others are only tried when it stops matching. ISO
+    timestamps keep their UTC offset; the others are naive local time. Lines
+    that match no format, or carry an impossible timestamp, get a timestamp
+    of None so they never pass a time-window filter.
+    """
+
+    def __init__(self, today: Optional[date] = None):
+        self.today = today or date.today()
+        self._formats = [
+            (ISO_LINE, parse_iso_timestamp),
+            (STANDARD_LINE, parse_standard_timestamp),
+            (TIME_LINE, lambda text: parse_time_of_day(text, self.today)),
+        ]
+
+    def parse(self, line: str) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+
+        for index, (pattern, parse_timestamp) in enumerate(self._formats):
+            match = pattern.match(line)
+            if match is None:
+                continue
+            if index:
+                # Move the matching format to the front for the next line
+                self._formats.insert(0, self._formats.pop(index))
+            groups = match.groups()
+            return {
+                "timestamp": parse_timestamp(groups[0]),
+                "level": groups[1] if len(groups) > 2 else "INFO",
+                "message": groups[-1],
+                "raw_line": line,
+            }
+
+        return {
+            "timestamp": None,
+            "level": "UNKNOWN",
+            "message": line,
+            "raw_line": line,
+        }
@@ -6,6 +6,7 @@ Scrapes external sources and agent logs, sends to whis_sanitize for processing
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
+import asyncio
 import logging
 from datetime import datetime
 
@@ -30,6 +31,12 @@ sanitize_sender = WhisSanitizeSender()
 log_scraper = AgentLogScraper()
 
 
+@app.on_event("shutdown")
+async def close_fetcher():
+    """Release the pooled HTTP connections on the loop that opened them"""
+    await web_scraper.session.aclose()
+
+
 class ScrapeRequest(BaseModel):
     sources: List[str] = [
         "blogs",
@@ -41,6 +48,7 @@ class ScrapeRequest(BaseModel):
     hours_back: int = 24
     send_to_sanitize: bool = True
     auto_process: bool = True
+    incremental_logs: bool = False
 
 
 class ScrapeResponse(BaseModel):
@@ -87,32 +95,36 @@ async def scrape_intelligence(
         sources_scraped = []
         total_items = 0
 
-        # Scrape web sources
+        # Scrape web sources concurrently; each host is rate limited on its own
+        web_tasks = {}
         if "blogs" in request.sources:
             logger.info("Scraping development blogs")
-            all_scraped_data.update(web_scraper.scrape_dev_blogs(request.hours_back))
+            web_tasks["blog_posts"] = web_scraper.scrape_dev_blogs(request.hours_back)
             sources_scraped.append("blogs")
 
         if "github" in request.sources:
             logger.info("Scraping GitHub trending")
-            all_scraped_data["github_trending"] = web_scraper.scrape_github_trending()
+            web_tasks["github_trending"] = web_scraper.scrape_github_trending()
             sources_scraped.append("github")
 
         if "kubernetes_docs" in request.sources:
             logger.info("Scraping Kubernetes documentation")
-            all_scraped_data["kubernetes_docs"] = web_scraper.scrape_kubernetes_docs()
+            web_tasks["kubernetes_docs"] = web_scraper.scrape_kubernetes_docs()
             sources_scraped.append("kubernetes_docs")
 
         if "terraform_guides" in request.sources:
             logger.info("Scraping Terraform guides")
-            all_scraped_data["terraform_guides"] = web_scraper.scrape_terraform_guides()
+            web_tasks["terraform_guides"] = web_scraper.scrape_terraform_guides()
             sources_scraped.append("terraform_guides")
 
+        web_results = await asyncio.gather(*web_tasks.values())
+        all_scraped_data.update(zip(web_tasks.keys(), web_results))
+
         # Scrape agent logs
         if "agent_logs" in request.sources:
             logger.info("Scraping agent logs")
             all_scraped_data["agent_logs"] = log_scraper.scrape_agent_logs(
-                request.hours_back
+                request.hours_back, incremental=request.incremental_logs
             )
             sources_scraped.append("agent_logs")
 
@@ -154,7 +166,7 @@ async def scrape_web_sources(hours_back: int = 24, send_to_sanitize: bool = True
         logger.info(f"Scraping web sources for last {hours_back} hours")
 
         # Scrape all web sources
-        web_data = web_scraper.scrape_all_sources(hours_back)
+        web_data = await web_scraper.scrape_all_sources(hours_back)
 
         # Send to sanitize if requested
         sanitize_results = None
@@ -175,21 +187,28 @@ async def scrape_web_sources(hours_back: int = 24, send_to_sanitize: bool = True
 
 
 @app.post("/scrape/agent_logs")
-async def scrape_agent_logs(hours_back: int = 24, send_to_sanitize: bool = True):
+async def scrape_agent_logs(
+    hours_back: int = 24, send_to_sanitize: bool = True, incremental: bool = False
+):
     """
     Scrape agent logs for intelligence patterns
+
+    With incremental=true only lines written since the previous incremental
+    scrape are read.
     """
     try:
         logger.info(f"Scraping agent logs for last {hours_back} hours")
 
         # Scrape agent logs
-        log_entries = log_scraper.scrape_agent_logs(hours_back)
+        log_entries = log_scraper.scrape_agent_logs(hours_back, incremental=incremental)
 
         # Extract patterns
         patterns = log_scraper.extract_intelligence_patterns(log_entries)
 
-        # Generate report
-        report = log_scraper.generate_intelligence_report(hours_back)
+        # Generate report from the entries already scraped
+        report = log_scraper.generate_intelligence_report(
+            hours_back, log_entries=log_entries
+        )
 
         # Send to sanitize if requested
         sanitize_results = None
@@ -222,7 +241,7 @@ async def scrape_blogs(hours_back: int = 24, send_to_sanitize: bool = True):
     try:
         logger.info(f"Scraping blogs for last {hours_back} hours")
 
-        blog_posts = web_scraper.scrape_dev_blogs(hours_back)
+        blog_posts = await web_scraper.scrape_dev_blogs(hours_back)
 
         # Send to sanitize if requested
         sanitize_results = None
@@ -251,7 +270,7 @@ async def scrape_github_trending(send_to_sanitize: bool = True):
     try:
         logger.info("Scraping GitHub trending repositories")
 
-        trending_repos = web_scraper.scrape_github_trending()
+        trending_repos = await web_scraper.scrape_github_trending()
 
         # Send to sanitize if requested
         sanitize_results = None
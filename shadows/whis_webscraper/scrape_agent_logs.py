@@ -4,20 +4,169 @@ Scrapes logs from LinkOps agents for intelligence and pattern analysis
 """
 
 import os
-import re
+import gzip
 import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import glob
 
+from keyword_classifier import KeywordClassifier
+from log_checkpoints import LogCheckpoints, file_key
+from log_parser import LogLineParser
+
 logger = logging.getLogger(__name__)
 
+LOG_SCRAPE_WORKERS = int(os.getenv("LOG_SCRAPE_WORKERS", str(os.cpu_count() or 1)))
+READ_BUFFER_BYTES = 1 << 20
+MAX_PATTERN_EXAMPLES = int(os.getenv("INTELLIGENCE_MAX_EXAMPLES", "1000"))
+
+# Intelligence tags, in the priority that picks an entry's pattern bucket
+INTELLIGENCE_KEYWORDS = {
+    "error": ["error"],
+    "success": ["success", "completed", "finished"],
+    "performance": ["performance", "latency", "throughput", "cpu", "memory"],
+    "usage": ["request", "api", "endpoint", "call"],
+    "recommendation": ["recommend", "suggest", "advice", "best practice"],
+}
+PATTERN_BUCKETS = {
+    "error": ("error_patterns", "errors"),
+    "success": ("success_patterns", "successes"),
+    "performance": ("performance_patterns", "performance"),
+    "usage": ("usage_patterns", "usage"),
+    "recommendation": ("recommendations", "recommendations"),
+}
+
+
+def _read_lines(log_file: str, offset: int = 0, complete_only=False):
+    """Yield (line, offset after it) reading log_file from byte offset
+
+    .gz archives are decompressed as a stream, offsets counting decompressed
+    bytes. With complete_only an unterminated last line is not yielded, so a
+    line still being written is read whole on the next pass.
+    """
+    if log_file.endswith(".gz"):
+        f = gzip.open(log_file, "rb")
+    else:
+        f = open(log_file, "rb", buffering=READ_BUFFER_BYTES)
+    with f:
+        if offset:
+            f.seek(offset)
+        for raw in f:
+            if complete_only and not raw.endswith(b"\n"):
+                return
+            offset += len(raw)
+            yield raw.decode("utf-8", errors="replace"), offset
+
+
+def _intelligence_tags(tags) -> List[str]:
+    return [tag for tag in INTELLIGENCE_KEYWORDS if tag in tags]
+
+
+def scan_log_file(
+    log_file: str,
+    agent_name: str,
+    config: Dict[str, Any],
+    cutoff_time: datetime,
+    offset: int = 0,
+    first_line: int = 1,
+    complete_only: bool = False,
+):
+    """Relevant entries within the time window from byte offset on
+
+    Each message is classified once against the agent's keywords and the
+    intelligence keywords together; the first decide relevance and the
+    intelligence tags are kept on the entry as "tags".
+    Returns (entries, offset after the last line read, lines read). Runs in
+    the scrape pool's worker processes, so it only uses its arguments.
+    """
+    entries = []
+    parser = LogLineParser()
+    # ISO timestamps carry an offset and compare against an aware cutoff
+    aware_cutoff = cutoff_time.astimezone()
+    log_name = os.path.basename(log_file)
+    classifier = KeywordClassifier(
+        dict(INTELLIGENCE_KEYWORDS, relevant=config["keywords"])
+    )
+    line_num = first_line - 1
+
+    for line, offset in _read_lines(log_file, offset, complete_only):
+        line_num += 1
+        try:
+            # Parse log line
+            parsed_entry = parser.parse(line)
+
+            if parsed_entry:
+                # Check if entry is within time window
+                timestamp = parsed_entry["timestamp"]
+                if timestamp and timestamp >= (
+                    aware_cutoff if timestamp.tzinfo else cutoff_time
+                ):
+                    # Check if entry contains relevant keywords
+                    tags = classifier.classify(parsed_entry.get("message", ""))
+                    if "relevant" in tags:
+                        # Add agent-specific metadata
+                        parsed_entry.update(
+                            {
+                                "agent": agent_name,
+                                "category": config["category"],
+                                "log_file": log_name,
+                                "line_number": line_num,
+                                "tags": _intelligence_tags(tags),
+                            }
+                        )
+                        entries.append(parsed_entry)
+
+        except Exception as e:
+            logger.debug(f"Error parsing line {line_num} in {log_file}: {str(e)}")
+            continue
+
+    return entries, offset, line_num - first_line + 1
+
+
+def _entry_order(entry: Dict[str, Any]) -> float:
+    # Naive timestamps are local time, which is what .timestamp() assumes
+    return entry["timestamp"].timestamp()
+
+
+def _run_inline(fn, *args) -> Future:
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared pool for log parsing; None when LOG_SCRAPE_WORKERS is 1"""
+    global _pool
+    if _pool is None and LOG_SCRAPE_WORKERS > 1:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=LOG_SCRAPE_WORKERS)
+    return _pool
+
 
 class AgentLogScraper:
     """Scrapes logs from LinkOps agents for intelligence gathering"""
 
-    def __init__(self, logs_base_path: str = "/app/logs"):
+    def __init__(
+        self,
+        logs_base_path: str = "/app/logs",
+        checkpoint_path: Optional[str] = None,
+        pool: Optional[Executor] = None,
+    ):
         self.logs_base_path = logs_base_path
+        self.pool = pool
+        self.checkpoints = (
+            LogCheckpoints(checkpoint_path) if checkpoint_path else LogCheckpoints()
+        )
         self.agent_patterns = {
             "katie": {
                 "log_pattern": "katie*.log",
@@ -50,252 +199,180 @@ class AgentLogScraper:
                 "category": "ml_training",
             },
         }
+        self.classifier = KeywordClassifier(INTELLIGENCE_KEYWORDS)
 
-    def scrape_agent_logs(self, hours_back: int = 24) -> List[Dict[str, Any]]:
-        """Scrape logs from all LinkOps agents"""
+    def scrape_agent_logs(
+        self, hours_back: int = 24, incremental: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Scrape logs from all LinkOps agents
+
+        Files of all agents are parsed in parallel on the scrape pool and the
+        entries come back merged in timestamp order. With incremental, each
+        file is read from the byte offset the previous incremental scrape
+        stopped at, so only lines written since are parsed.
+        """
         logger.info(f"Scraping agent logs for last {hours_back} hours")
 
-        all_log_data = []
         cutoff_time = datetime.now() - timedelta(hours=hours_back)
 
+        jobs = []
         for agent_name, config in self.agent_patterns.items():
             try:
-                agent_logs = self._scrape_single_agent_logs(
-                    agent_name, config, cutoff_time
-                )
-                all_log_data.extend(agent_logs)
-                logger.info(f"Scraped {len(agent_logs)} log entries from {agent_name}")
-
+                for job in self._file_jobs(agent_name, config, incremental):
+                    jobs.append((agent_name, config) + job)
             except Exception as e:
                 logger.error(f"Error scraping {agent_name} logs: {str(e)}")
                 continue
 
+        pool = self.pool or get_process_pool()
+        args = [
+            (
+                log_file,
+                agent_name,
+                config,
+                cutoff_time,
+                offset,
+                lines + 1,
+                incremental and live,
+            )
+            for agent_name, config, log_file, _, offset, lines, live in jobs
+        ]
+        submit = pool.submit if pool is not None else _run_inline
+        futures = [submit(scan_log_file, *job_args) for job_args in args]
+
+        per_agent = dict.fromkeys(self.agent_patterns, 0)
+        all_log_data = []
+        for (agent_name, _, log_file, stat, _, lines, _), future in zip(jobs, futures):
+            try:
+                entries, offset, lines_read = future.result()
+            except Exception as e:
+                logger.error(f"Error parsing log file {log_file}: {str(e)}")
+                continue
+            if incremental:
+                self.checkpoints.advance(log_file, stat, offset, lines + lines_read)
+            per_agent[agent_name] += len(entries)
+            all_log_data.extend(entries)
+
+        for agent_name, count in per_agent.items():
+            logger.info(f"Scraped {count} log entries from {agent_name}")
+
+        if incremental:
+            self._save_checkpoints()
+
+        # Each file is already in order, so this sort is a merge of its runs
+        all_log_data.sort(key=_entry_order)
+
         logger.info(f"Total agent log entries scraped: {len(all_log_data)}")
         return all_log_data
 
-    def _scrape_single_agent_logs(
-        self, agent_name: str, config: Dict[str, Any], cutoff_time: datetime
-    ) -> List[Dict[str, Any]]:
-        """Scrape logs from a single agent"""
-        log_entries = []
+    def _save_checkpoints(self):
+        live_keys = []
+        for path in glob.glob(os.path.join(self.logs_base_path, "*")):
+            try:
+                live_keys.append(file_key(os.stat(path)))
+            except OSError:
+                continue
+        self.checkpoints.prune(live_keys)
+        try:
+            self.checkpoints.save()
+        except OSError as e:
+            logger.error(f"Error saving log checkpoints: {str(e)}")
 
+    def _file_jobs(self, agent_name: str, config: Dict[str, Any], incremental: bool):
+        """(log_file, stat, start offset, lines before it, live) for one agent
+
+        live is False for rotated files, which are no longer written to.
+        """
         # Find log files matching pattern
         log_pattern = os.path.join(self.logs_base_path, config["log_pattern"])
         log_files = glob.glob(log_pattern)
+        live_files = set(log_files)
+        if incremental:
+            # Rotated files we were part-way through; their archives are
+            # copies of lines already read
+            log_files = self._rotated_with_checkpoint(log_pattern) + log_files
+        else:
+            log_files = sorted(glob.glob(f"{log_pattern}*.gz")) + log_files
 
         if not log_files:
             logger.warning(
                 f"No log files found for {agent_name} with pattern {log_pattern}"
             )
-            return log_entries
 
+        jobs = []
         for log_file in log_files:
             try:
-                file_entries = self._parse_log_file(
-                    log_file, agent_name, config, cutoff_time
+                stat = os.stat(log_file)
+                offset, lines = (
+                    self.checkpoints.start_position(log_file, stat)
+                    if incremental
+                    else (0, 0)
                 )
-                log_entries.extend(file_entries)
-
-            except Exception as e:
-                logger.error(f"Error parsing log file {log_file}: {str(e)}")
+            except OSError as e:
+                logger.error(f"Error reading log file {log_file}: {str(e)}")
                 continue
-
-        return log_entries
-
-    def _parse_log_file(
-        self,
-        log_file: str,
-        agent_name: str,
-        config: Dict[str, Any],
-        cutoff_time: datetime,
-    ) -> List[Dict[str, Any]]:
-        """Parse individual log file for relevant entries"""
-        entries = []
-
-        try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    try:
-                        # Parse log line
-                        parsed_entry = self._parse_log_line(line, line_num)
-
-                        if parsed_entry:
-                            # Check if entry is within time window
-                            if (
-                                parsed_entry.get("timestamp")
-                                and parsed_entry["timestamp"] >= cutoff_time
-                            ):
-                                # Check if entry contains relevant keywords
-                                if self._is_relevant_entry(
-                                    parsed_entry.get("message", ""), config["keywords"]
-                                ):
-                                    # Add agent-specific metadata
-                                    parsed_entry.update(
-                                        {
-                                            "agent": agent_name,
-                                            "category": config["category"],
-                                            "log_file": os.path.basename(log_file),
-                                            "line_number": line_num,
-                                        }
-                                    )
-                                    entries.append(parsed_entry)
-
-                    except Exception as e:
-                        logger.debug(
-                            f"Error parsing line {line_num} in {log_file}: {str(e)}"
-                        )
-                        continue
-
-        except Exception as e:
-            logger.error(f"Error reading log file {log_file}: {str(e)}")
-
-        return entries
-
-    def _parse_log_line(self, line: str, line_num: int) -> Optional[Dict[str, Any]]:
-        """Parse a single log line into structured data"""
-        line = line.strip()
-        if not line:
-            return None
-
-        # Common log formats
-        log_patterns = [
-            # ISO timestamp format
-            r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2}))"
-            r"\s+(\w+)\s+(.+)",
-            # Standard timestamp format
-            r"(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})\s+(\w+)\s+(.+)",
-            # Simple timestamp
-            r"(\d{2}:\d{2}:\d{2})\s+(.+)",
-        ]
-
-        for pattern in log_patterns:
-            match = re.match(pattern, line)
-            if match:
-                groups = match.groups()
-
-                if len(groups) >= 2:
-                    timestamp_str = groups[0]
-                    level = groups[1] if len(groups) > 2 else "INFO"
-                    message = groups[-1]
-
-                    # Parse timestamp
-                    timestamp = self._parse_timestamp(timestamp_str)
-
-                    return {
-                        "timestamp": timestamp,
-                        "level": level,
-                        "message": message,
-                        "raw_line": line,
-                    }
-
-        # If no pattern matches, create basic entry
-        return {
-            "timestamp": datetime.now(),
-            "level": "UNKNOWN",
-            "message": line,
-            "raw_line": line,
-        }
-
-    def _parse_timestamp(self, timestamp_str: str) -> datetime:
-        """Parse various timestamp formats"""
-        try:
-            # ISO format
-            if "T" in timestamp_str:
-                return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-            # Standard format
-            elif len(timestamp_str) > 10:
-                return datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            # Time only (assume today)
-            else:
-                today = datetime.now().date()
-                time_part = datetime.strptime(timestamp_str, "%H:%M:%S").time()
-                return datetime.combine(today, time_part)
-        except Exception:
-            return datetime.now()
-
-    def _is_relevant_entry(self, message: str, keywords: List[str]) -> bool:
-        """Check if log entry contains relevant keywords"""
-        message_lower = message.lower()
-        return any(keyword.lower() in message_lower for keyword in keywords)
+            jobs.append((log_file, stat, offset, lines, log_file in live_files))
+        return jobs
+
+    def _rotated_with_checkpoint(self, log_pattern: str) -> List[str]:
+        """Rotated copies (app.log.1, ...) of files we have a checkpoint for"""
+        rotated = []
+        for path in glob.glob(f"{log_pattern}.*"):
+            if path.endswith(".gz"):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat in self.checkpoints:
+                rotated.append((stat.st_mtime, path))
+        return [path for _, path in sorted(rotated)]
 
     def extract_intelligence_patterns(
         self, log_entries: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Extract intelligence patterns from log entries"""
+        """Extract intelligence patterns from log entries
+
+        Each entry is counted in one pattern bucket (errors first, then
+        successes, performance, usage, recommendations) and in tag_counts for
+        every tag it carries. Only the first MAX_PATTERN_EXAMPLES entries of a
+        bucket are kept as examples; the counts cover all of them.
+        """
         logger.info("Extracting intelligence patterns from agent logs")
 
-        patterns = {
-            "error_patterns": [],
-            "success_patterns": [],
-            "performance_patterns": [],
-            "usage_patterns": [],
-            "recommendations": [],
-        }
+        patterns = {bucket: [] for bucket, _ in PATTERN_BUCKETS.values()}
+        bucket_counts = dict.fromkeys(PATTERN_BUCKETS, 0)
+        tag_counts = dict.fromkeys(INTELLIGENCE_KEYWORDS, 0)
 
         for entry in log_entries:
-            message = entry.get("message", "").lower()
             level = entry.get("level", "").upper()
-
-            # Error patterns
-            if level in ["ERROR", "CRITICAL"] or "error" in message:
-                patterns["error_patterns"].append(
-                    {
-                        "agent": entry.get("agent"),
-                        "pattern": message,
-                        "timestamp": entry.get("timestamp"),
-                        "category": entry.get("category"),
-                    }
+            tags = entry.get("tags")
+            if tags is None:
+                tags = _intelligence_tags(
+                    self.classifier.classify(entry.get("message", ""))
                 )
-
-            # Success patterns
-            elif level == "INFO" and any(
-                word in message for word in ["success", "completed", "finished"]
-            ):
-                patterns["success_patterns"].append(
-                    {
-                        "agent": entry.get("agent"),
-                        "pattern": message,
-                        "timestamp": entry.get("timestamp"),
-                        "category": entry.get("category"),
-                    }
-                )
-
-            # Performance patterns
-            elif any(
-                word in message
-                for word in ["performance", "latency", "throughput", "cpu", "memory"]
-            ):
-                patterns["performance_patterns"].append(
-                    {
-                        "agent": entry.get("agent"),
-                        "pattern": message,
-                        "timestamp": entry.get("timestamp"),
-                        "category": entry.get("category"),
-                    }
-                )
-
-            # Usage patterns
-            elif any(
-                word in message for word in ["request", "api", "endpoint", "call"]
-            ):
-                patterns["usage_patterns"].append(
-                    {
-                        "agent": entry.get("agent"),
-                        "pattern": message,
-                        "timestamp": entry.get("timestamp"),
-                        "category": entry.get("category"),
-                    }
+            for tag in tags:
+                tag_counts[tag] += 1
+
+            # Tags are in bucket priority; successes only count on INFO lines
+            if level in ["ERROR", "CRITICAL"]:
+                if "error" not in tags:
+                    tag_counts["error"] += 1
+                kind = "error"
+            else:
+                kind = next(
+                    (tag for tag in tags if tag != "success" or level == "INFO"), None
                 )
+                if kind is None:
+                    continue
 
-            # Recommendations
-            elif any(
-                word in message
-                for word in ["recommend", "suggest", "advice", "best practice"]
-            ):
-                patterns["recommendations"].append(
+            bucket_counts[kind] += 1
+            examples = patterns[PATTERN_BUCKETS[kind][0]]
+            if len(examples) < MAX_PATTERN_EXAMPLES:
+                examples.append(
                     {
                         "agent": entry.get("agent"),
-                        "pattern": message,
+                        "pattern": entry.get("message", "").lower(),
                         "timestamp": entry.get("timestamp"),
                         "category": entry.get("category"),
                     }
@@ -305,24 +382,30 @@ class AgentLogScraper:
         patterns["summary"] = {
             "total_entries_analyzed": len(log_entries),
             "pattern_counts": {
-                "errors": len(patterns["error_patterns"]),
-                "successes": len(patterns["success_patterns"]),
-                "performance": len(patterns["performance_patterns"]),
-                "usage": len(patterns["usage_patterns"]),
-                "recommendations": len(patterns["recommendations"]),
+                name: bucket_counts[kind] for kind, (_, name) in PATTERN_BUCKETS.items()
             },
+            "tag_counts": tag_counts,
             "analysis_timestamp": datetime.now().isoformat(),
         }
 
         logger.info(f"Extracted patterns: {patterns['summary']['pattern_counts']}")
         return patterns
 
-    def generate_intelligence_report(self, hours_back: int = 24) -> Dict[str, Any]:
-        """Generate comprehensive intelligence report from agent logs"""
+    def generate_intelligence_report(
+        self,
+        hours_back: int = 24,
+        log_entries: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Generate comprehensive intelligence report from agent logs
+
+        Pass log_entries to report on entries already scraped instead of
+        scraping again.
+        """
         logger.info(f"Generating intelligence report for last {hours_back} hours")
 
         # Scrape logs
-        log_entries = self.scrape_agent_logs(hours_back)
+        if log_entries is None:
+            log_entries = self.scrape_agent_logs(hours_back)
 
         # Extract patterns
         patterns = self.extract_intelligence_patterns(log_entries)
@@ -344,35 +427,36 @@ class AgentLogScraper:
     def _generate_insights(self, patterns: Dict[str, Any]) -> List[str]:
         """Generate insights from patterns"""
         insights = []
+        counts = patterns["summary"]["pattern_counts"]
 
         # Error insights
-        error_count = len(patterns["error_patterns"])
+        error_count = counts.get("errors", 0)
         if error_count > 0:
             insights.append(
                 f"Found {error_count} error patterns that may need attention"
             )
 
         # Success insights
-        success_count = len(patterns["success_patterns"])
+        success_count = counts.get("successes", 0)
         if success_count > 0:
             insights.append(f"Identified {success_count} successful operation patterns")
 
         # Performance insights
-        perf_count = len(patterns["performance_patterns"])
+        perf_count = counts.get("performance", 0)
         if perf_count > 0:
             insights.append(
                 f"Detected {perf_count} performance-related patterns for optimization"
             )
 
         # Usage insights
-        usage_count = len(patterns["usage_patterns"])
+        usage_count = counts.get("usage", 0)
         if usage_count > 0:
             insights.append(
                 f"Tracked {usage_count} usage patterns for capacity planning"
             )
 
         # Recommendation insights
-        rec_count = len(patterns["recommendations"])
+        rec_count = counts.get("recommendations", 0)
         if rec_count > 0:
             insights.append(f"Collected {rec_count} recommendations for improvement")
 
@@ -381,27 +465,28 @@ class AgentLogScraper:
     def _generate_recommendations(self, patterns: Dict[str, Any]) -> List[str]:
         """Generate recommendations based on patterns"""
         recommendations = []
+        counts = patterns["summary"]["pattern_counts"]
 
         # Error-based recommendations
-        if patterns["error_patterns"]:
+        if counts.get("errors"):
             recommendations.append(
                 "Review error patterns and implement error handling improvements"
             )
 
         # Performance-based recommendations
-        if patterns["performance_patterns"]:
+        if counts.get("performance"):
             recommendations.append(
                 "Analyze performance patterns for optimization opportunities"
             )
 
         # Usage-based recommendations
-        if patterns["usage_patterns"]:
+        if counts.get("usage"):
             recommendations.append(
                 "Monitor usage patterns for capacity planning and scaling"
             )
 
         # Success-based recommendations
-        if patterns["success_patterns"]:
+        if counts.get("successes"):
             recommendations.append(
                 "Document successful operation patterns for best practices"
             )
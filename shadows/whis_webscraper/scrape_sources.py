@@ -3,13 +3,15 @@ Whis WebScraper - External Intelligence Harvester
 Scrapes top posts from dev blogs, K8s docs, Terraform guides for Whis training
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 import feedparser
-import time
-import requests
+
+from fetcher import AsyncFetcher
+from http_cache import HttpCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +20,11 @@ class WhisWebScraper:
     """Intelligence harvester for Whis training data"""
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {"User-Agent": "Whis-WebScraper/2.0 (LinkOps MLOps Platform)"}
+        # Pooled async session; each host is rate limited on its own
+        self.session = AsyncFetcher(
+            headers={"User-Agent": "Whis-WebScraper/2.0 (LinkOps MLOps Platform)"},
+            host_rates={"github.com": 0.5},  # Be respectful to GitHub
+            cache=HttpCache(),
         )
 
         # Target sources for intelligence gathering
@@ -60,38 +64,43 @@ class WhisWebScraper:
             "mlops": "https://github.com/trending?q=mlops&since=weekly",
         }
 
-    def scrape_dev_blogs(self, hours_back: int = 24) -> List[Dict[str, Any]]:
+    async def scrape_dev_blogs(self, hours_back: int = 24) -> List[Dict[str, Any]]:
         """Scrape recent posts from development blogs"""
         logger.info(f"Scraping dev blogs for last {hours_back} hours")
 
         scraped_data = []
         cutoff_time = datetime.now() - timedelta(hours=hours_back)
 
-        for source_name, source_config in self.dev_sources.items():
+        # Feeds live on different hosts, so they are fetched in parallel
+        rss_sources = {
+            name: config
+            for name, config in self.dev_sources.items()
+            if config["type"] == "rss"
+        }
+        feeds = await asyncio.gather(
+            *(self._scrape_rss_feed(config["url"]) for config in rss_sources.values())
+        )
+
+        for (source_name, source_config), feed_data in zip(rss_sources.items(), feeds):
             try:
                 logger.info(f"Scraping {source_name}")
 
-                if source_config["type"] == "rss":
-                    feed_data = self._scrape_rss_feed(source_config["url"])
-
-                    for entry in feed_data:
-                        # Parse publication date
-                        pub_date = self._parse_date(entry.get("published", ""))
-
-                        if pub_date and pub_date >= cutoff_time:
-                            scraped_item = {
-                                "source": source_name,
-                                "category": source_config["category"],
-                                "title": entry.get("title", ""),
-                                "link": entry.get("link", ""),
-                                "summary": entry.get("summary", ""),
-                                "published": pub_date.isoformat(),
-                                "content_type": "blog_post",
-                                "scraped_at": datetime.now().isoformat(),
-                            }
-                            scraped_data.append(scraped_item)
-
-                time.sleep(1)  # Be respectful to servers
+                for entry in feed_data:
+                    # Parse publication date
+                    pub_date = self._parse_date(entry.get("published", ""))
+
+                    if pub_date and pub_date >= cutoff_time:
+                        scraped_item = {
+                            "source": source_name,
+                            "category": source_config["category"],
+                            "title": entry.get("title", ""),
+                            "link": entry.get("link", ""),
+                            "summary": entry.get("summary", ""),
+                            "published": pub_date.isoformat(),
+                            "content_type": "blog_post",
+                            "scraped_at": datetime.now().isoformat(),
+                        }
+                        scraped_data.append(scraped_item)
 
             except Exception as e:
                 logger.error(f"Error scraping {source_name}: {str(e)}")
@@ -100,61 +109,77 @@ class WhisWebScraper:
         logger.info(f"Scraped {len(scraped_data)} blog posts")
         return scraped_data
 
-    def scrape_github_trending(self) -> List[Dict[str, Any]]:
+    async def scrape_github_trending(self) -> List[Dict[str, Any]]:
         """Scrape trending GitHub repositories"""
         logger.info("Scraping GitHub trending repositories")
 
         trending_data = []
+        pages = await asyncio.gather(
+            *(
+                self._scrape_trending_page(category, url)
+                for category, url in self.github_trending.items()
+            )
+        )
+        for repos in pages:
+            trending_data.extend(repos)
 
-        for category, url in self.github_trending.items():
-            try:
-                logger.info(f"Scraping GitHub trending for {category}")
-
-                response = self.session.get(url)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                # Find repository entries
-                repo_entries = soup.find_all("article", class_="Box-row")
-
-                for entry in repo_entries[:10]:  # Top 10 repos
-                    repo_name_elem = entry.find("h2", class_="h3")
-                    if repo_name_elem:
-                        repo_name = repo_name_elem.get_text().strip()
-
-                        # Get description
-                        desc_elem = entry.find("p")
-                        description = desc_elem.get_text().strip() if desc_elem else ""
-
-                        # Get stars
-                        stars_elem = entry.find(
-                            "a", href=lambda x: x and "stargazers" in x
-                        )
-                        stars = stars_elem.get_text().strip() if stars_elem else "0"
-
-                        trending_item = {
-                            "source": "github_trending",
-                            "category": category,
-                            "title": repo_name,
-                            "description": description,
-                            "stars": stars,
-                            "link": f"https://github.com/{repo_name}",
-                            "content_type": "github_repo",
-                            "scraped_at": datetime.now().isoformat(),
-                        }
-                        trending_data.append(trending_item)
+        logger.info(f"Scraped {len(trending_data)} trending repositories")
+        return trending_data
 
-                time.sleep(2)  # Be respectful to GitHub
+    async def _scrape_trending_page(self, category: str, url: str):
+        try:
+            logger.info(f"Scraping GitHub trending for {category}")
+            repos = await self.session.get_parsed(
+                url, "github_trending", self._parse_trending_page
+            )
+        except Exception as e:
+            logger.error(f"Error scraping GitHub trending for {category}: {str(e)}")
+            return []
 
-            except Exception as e:
-                logger.error(f"Error scraping GitHub trending for {category}: {str(e)}")
-                continue
+        scraped_at = datetime.now().isoformat()
+        return [
+            dict(
+                repo,
+                source="github_trending",
+                category=category,
+                content_type="github_repo",
+                scraped_at=scraped_at,
+            )
+            for repo in repos
+        ]
 
-        logger.info(f"Scraped {len(trending_data)} trending repositories")
-        return trending_data
+    @staticmethod
+    def _parse_trending_page(content: bytes) -> List[Dict[str, Any]]:
+        soup = BeautifulSoup(content, "html.parser")
+
+        # Find repository entries
+        repo_entries = soup.find_all("article", class_="Box-row")
+
+        repos = []
+        for entry in repo_entries[:10]:  # Top 10 repos
+            repo_name_elem = entry.find("h2", class_="h3")
+            if repo_name_elem:
+                repo_name = repo_name_elem.get_text().strip()
+
+                # Get description
+                desc_elem = entry.find("p")
+                description = desc_elem.get_text().strip() if desc_elem else ""
+
+                # Get stars
+                stars_elem = entry.find("a", href=lambda x: x and "stargazers" in x)
+                stars = stars_elem.get_text().strip() if stars_elem else "0"
+
+                repos.append(
+                    {
+                        "title": repo_name,
+                        "description": description,
+                        "stars": stars,
+                        "link": f"https://github.com/{repo_name}",
+                    }
+                )
+        return repos
 
-    def scrape_kubernetes_docs(self) -> List[Dict[str, Any]]:
+    async def scrape_kubernetes_docs(self) -> List[Dict[str, Any]]:
         """Scrape latest Kubernetes documentation updates"""
         logger.info("Scraping Kubernetes documentation")
 
@@ -163,33 +188,22 @@ class WhisWebScraper:
         try:
             # Scrape K8s concepts page
             concepts_url = "https://kubernetes.io/docs/concepts/"
-            response = self.session.get(concepts_url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # Find main content sections
-            content_sections = soup.find_all("div", class_="content")
-
-            for section in content_sections[:5]:  # Top 5 sections
-                title_elem = section.find("h1") or section.find("h2")
-                if title_elem:
-                    title = title_elem.get_text().strip()
-
-                    # Get first paragraph
-                    para_elem = section.find("p")
-                    summary = para_elem.get_text().strip() if para_elem else ""
-
-                    doc_item = {
-                        "source": "kubernetes_docs",
-                        "category": "kubernetes",
-                        "title": title,
-                        "summary": summary,
-                        "link": concepts_url,
-                        "content_type": "documentation",
-                        "scraped_at": datetime.now().isoformat(),
-                    }
-                    k8s_docs.append(doc_item)
+            sections = await self.session.get_parsed(
+                concepts_url, "kubernetes_docs", self._parse_kubernetes_docs
+            )
+
+            scraped_at = datetime.now().isoformat()
+            for section in sections:
+                doc_item = {
+                    "source": "kubernetes_docs",
+                    "category": "kubernetes",
+                    "title": section["title"],
+                    "summary": section["summary"],
+                    "link": concepts_url,
+                    "content_type": "documentation",
+                    "scraped_at": scraped_at,
+                }
+                k8s_docs.append(doc_item)
 
         except Exception as e:
             logger.error(f"Error scraping Kubernetes docs: {str(e)}")
@@ -197,7 +211,28 @@ class WhisWebScraper:
         logger.info(f"Scraped {len(k8s_docs)} K8s documentation items")
         return k8s_docs
 
-    def scrape_terraform_guides(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _parse_kubernetes_docs(content: bytes) -> List[Dict[str, str]]:
+        soup = BeautifulSoup(content, "html.parser")
+
+        # Find main content sections
+        content_sections = soup.find_all("div", class_="content")
+
+        sections = []
+        for section in content_sections[:5]:  # Top 5 sections
+            title_elem = section.find("h1") or section.find("h2")
+            if title_elem:
+                # Get first paragraph
+                para_elem = section.find("p")
+                sections.append(
+                    {
+                        "title": title_elem.get_text().strip(),
+                        "summary": para_elem.get_text().strip() if para_elem else "",
+                    }
+                )
+        return sections
+
+    async def scrape_terraform_guides(self) -> List[Dict[str, Any]]:
         """Scrape Terraform best practices and guides"""
         logger.info("Scraping Terraform guides")
 
@@ -206,28 +241,21 @@ class WhisWebScraper:
         try:
             # Scrape Terraform docs
             tf_docs_url = "https://www.terraform.io/docs"
-            response = self.session.get(tf_docs_url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # Find guide links
-            guide_links = soup.find_all("a", href=lambda x: x and "/guides/" in x)
-
-            for link in guide_links[:10]:  # Top 10 guides
-                title = link.get_text().strip()
-                href = link.get("href", "")
-
-                if title and href:
-                    guide_item = {
-                        "source": "terraform_docs",
-                        "category": "terraform",
-                        "title": title,
-                        "link": f"https://www.terraform.io{href}",
-                        "content_type": "guide",
-                        "scraped_at": datetime.now().isoformat(),
-                    }
-                    terraform_data.append(guide_item)
+            guides = await self.session.get_parsed(
+                tf_docs_url, "terraform_guides", self._parse_terraform_guides
+            )
+
+            scraped_at = datetime.now().isoformat()
+            for guide in guides:
+                guide_item = {
+                    "source": "terraform_docs",
+                    "category": "terraform",
+                    "title": guide["title"],
+                    "link": f"https://www.terraform.io{guide['href']}",
+                    "content_type": "guide",
+                    "scraped_at": scraped_at,
+                }
+                terraform_data.append(guide_item)
 
         except Exception as e:
             logger.error(f"Error scraping Terraform guides: {str(e)}")
@@ -235,15 +263,42 @@ class WhisWebScraper:
         logger.info(f"Scraped {len(terraform_data)} Terraform guides")
         return terraform_data
 
-    def _scrape_rss_feed(self, feed_url: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _parse_terraform_guides(content: bytes) -> List[Dict[str, str]]:
+        soup = BeautifulSoup(content, "html.parser")
+
+        # Find guide links
+        guide_links = soup.find_all("a", href=lambda x: x and "/guides/" in x)
+
+        guides = []
+        for link in guide_links[:10]:  # Top 10 guides
+            title = link.get_text().strip()
+            href = link.get("href", "")
+            if title and href:
+                guides.append({"title": title, "href": href})
+        return guides
+
+    async def _scrape_rss_feed(self, feed_url: str) -> List[Dict[str, Any]]:
         """Scrape RSS feed and return entries"""
         try:
-            feed = feedparser.parse(feed_url)
-            return feed.entries
+            return await self.session.get_parsed(
+                feed_url, "rss_entries", self._parse_feed
+            )
         except Exception as e:
             logger.error(f"Error parsing RSS feed {feed_url}: {str(e)}")
             return []
 
+    @staticmethod
+    def _parse_feed(content: bytes) -> List[Dict[str, str]]:
+        """Keep the entry fields the scraper reads, in cacheable form"""
+        return [
+            {
+                field: entry.get(field, "")
+                for field in ("title", "link", "summary", "published")
+            }
+            for entry in feedparser.parse(content).entries
+        ]
+
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse various date formats"""
         if not date_str:
@@ -265,17 +320,25 @@ class WhisWebScraper:
 
         return None
 
-    def scrape_all_sources(
+    async def scrape_all_sources(
         self, hours_back: int = 24
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Scrape all intelligence sources"""
         logger.info("Starting comprehensive intelligence gathering")
 
+        blog_posts, github_trending, kubernetes_docs, terraform_guides = (
+            await asyncio.gather(
+                self.scrape_dev_blogs(hours_back),
+                self.scrape_github_trending(),
+                self.scrape_kubernetes_docs(),
+                self.scrape_terraform_guides(),
+            )
+        )
         all_data = {
-            "blog_posts": self.scrape_dev_blogs(hours_back),
-            "github_trending": self.scrape_github_trending(),
-            "kubernetes_docs": self.scrape_kubernetes_docs(),
-            "terraform_guides": self.scrape_terraform_guides(),
+            "blog_posts": blog_posts,
+            "github_trending": github_trending,
+            "kubernetes_docs": kubernetes_docs,
+            "terraform_guides": terraform_guides,
         }
 
         total_items = sum(len(items) for items in all_data.values())
@@ -3,23 +3,48 @@ Whis WebScraper - Send to Sanitize Module
 Sends scraped intelligence to whis_sanitize for processing and training queue
 """
 
+import gzip
+import json
 import logging
-from typing import Dict, List, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
+
+from content_fingerprints import ContentFingerprintStore
 
 logger = logging.getLogger(__name__)
 
+SANITIZE_BATCH_SIZE = int(os.getenv("SANITIZE_BATCH_SIZE", "250"))
+SANITIZE_SEND_CONCURRENCY = int(os.getenv("SANITIZE_SEND_CONCURRENCY", "4"))
+SANITIZE_TIMEOUT = float(os.getenv("SANITIZE_TIMEOUT", "60"))
+
 
 class WhisSanitizeSender:
     """Sends scraped data to whis_sanitize for processing"""
 
-    def __init__(self, sanitize_service_url: str = "http://whis_sanitize:8003"):
+    def __init__(
+        self,
+        sanitize_service_url: str = "http://whis_sanitize:8003",
+        batch_size: int = SANITIZE_BATCH_SIZE,
+        concurrency: int = SANITIZE_SEND_CONCURRENCY,
+        fingerprints: Optional[ContentFingerprintStore] = None,
+    ):
         self.sanitize_url = sanitize_service_url
+        self.fingerprints = fingerprints or ContentFingerprintStore()
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
         self.session = requests.Session()
         self.session.headers.update(
             {"Content-Type": "application/json", "User-Agent": "Whis-WebScraper/2.0"}
         )
+        # One pooled connection per concurrent batch
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def format_for_sanitize(
         self, scraped_data: Dict[str, List[Dict[str, Any]]]
@@ -60,7 +85,12 @@ class WhisSanitizeSender:
         return formatted_items
 
     def send_to_sanitize(self, formatted_items: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Send formatted data to whis_sanitize service"""
+        """Send formatted data to whis_sanitize service
+
+        Items go to the bulk ingest endpoint in gzip-compressed batches of
+        batch_size, with up to concurrency batches in flight. A batch that
+        fails as a whole marks each of its items as an error.
+        """
         logger.info(f"Sending {len(formatted_items)} items to whis_sanitize")
 
         results = {
@@ -70,54 +100,37 @@ class WhisSanitizeSender:
             "processed_items": [],
         }
 
-        for item in formatted_items:
-            try:
-                # Send to sanitize endpoint
-                sanitize_endpoint = f"{self.sanitize_url}/api/process_external"
-
-                payload = {
-                    "data": item,
-                    "source": "whis_webscraper",
-                    "auto_process": True,
-                    "add_to_training_queue": True,
-                }
-
-                response = self.session.post(sanitize_endpoint, json=payload)
-                response.raise_for_status()
-
-                result = response.json()
-
-                if result.get("status") == "success":
-                    results["success_count"] += 1
-                    results["processed_items"].append(
-                        {
-                            "id": result.get("id"),
-                            "title": item.get("title"),
-                            "status": "processed",
-                        }
-                    )
-                else:
-                    results["error_count"] += 1
-                    results["errors"].append(
-                        {
-                            "title": item.get("title"),
-                            "error": result.get("error", "Unknown error"),
-                        }
-                    )
-
-            except requests.exceptions.RequestException as e:
-                results["error_count"] += 1
-                results["errors"].append(
-                    {"title": item.get("title"), "error": f"Network error: {str(e)}"}
+        batches = [
+            formatted_items[start : start + self.batch_size]
+            for start in range(0, len(formatted_items), self.batch_size)
+        ]
+        if batches:
+            workers = min(self.concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(self._send_batch, batches))
+        else:
+            outcomes = []
+
+        statuses = chain.from_iterable(outcomes)
+        for index, (item, status) in enumerate(zip(formatted_items, statuses)):
+            if status.get("status") == "accepted":
+                results["success_count"] += 1
+                results["processed_items"].append(
+                    {
+                        "id": status.get("forward_id"),
+                        "index": index,
+                        "title": item.get("title"),
+                        "status": "processed",
+                    }
                 )
-                logger.error(f"Error sending item to sanitize: {str(e)}")
-
-            except Exception as e:
+            else:
                 results["error_count"] += 1
                 results["errors"].append(
-                    {"title": item.get("title"), "error": f"Processing error: {str(e)}"}
+                    {
+                        "title": item.get("title"),
+                        "error": status.get("error", "Unknown error"),
+                    }
                 )
-                logger.error(f"Unexpected error processing item: {str(e)}")
 
         logger.info(
             f"Sanitize processing complete: {results['success_count']} success, "
@@ -125,23 +138,72 @@ class WhisSanitizeSender:
         )
         return results
 
+    def _send_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """POST one batch; returns one status dict per item"""
+        body = gzip.compress(
+            json.dumps(
+                {"source": "whis_webscraper", "input_type": "info", "items": batch},
+                default=str,
+            ).encode(),
+            compresslevel=6,
+        )
+        try:
+            response = self.session.post(
+                f"{self.sanitize_url}/api/sanitize/ingest",
+                data=body,
+                headers={"Content-Encoding": "gzip"},
+                timeout=SANITIZE_TIMEOUT,
+            )
+            response.raise_for_status()
+            statuses = response.json()["results"]
+            if len(statuses) != len(batch):
+                raise ValueError(f"{len(statuses)} results for a batch of {len(batch)}")
+            return statuses
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error sending batch to sanitize: {str(e)}")
+            error = f"Network error: {str(e)}"
+
+        except Exception as e:
+            logger.error(f"Unexpected error processing batch: {str(e)}")
+            error = f"Processing error: {str(e)}"
+
+        return [{"status": "error", "error": error}] * len(batch)
+
     def send_batch_to_sanitize(
         self, scraped_data: Dict[str, List[Dict[str, Any]]]
     ) -> Dict[str, Any]:
-        """Complete pipeline: format and send to sanitize"""
+        """Complete pipeline: drop duplicates, format and send to sanitize
+
+        Items whose content was already delivered, exactly or nearly, are
+        dropped first; only items sanitize accepts are remembered, so a failed
+        send is retried on the next scrape.
+        """
         logger.info("Starting batch processing pipeline")
 
+        # Drop content already sent
+        source_breakdown = {
+            source: len(items) for source, items in scraped_data.items()
+        }
+        scraped_data, fingerprints, suppressed = self.fingerprints.filter_new(
+            scraped_data
+        )
+
         # Format data for sanitize
         formatted_items = self.format_for_sanitize(scraped_data)
 
         # Send to sanitize
         results = self.send_to_sanitize(formatted_items)
+        self.fingerprints.remember(
+            fingerprints[processed["index"]] for processed in results["processed_items"]
+        )
 
         # Add summary
         results["summary"] = {
             "total_items_formatted": len(formatted_items),
-            "source_breakdown": {
-                source: len(items) for source, items in scraped_data.items()
+            "source_breakdown": source_breakdown,
+            "duplicates_suppressed": {
+                source: suppressed.get(source, 0) for source in source_breakdown
             },
             "processing_timestamp": datetime.now().isoformat(),
         }
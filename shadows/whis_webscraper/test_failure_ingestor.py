@@ -5,12 +5,18 @@ Captures test failures and generates structured fixes as Runes
 
 import json
 import logging
+import os
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterable, Iterator, List, Optional, TextIO
+from dataclasses import dataclass, asdict, fields
 
 logger = logging.getLogger(__name__)
 
+TEST_FAILURE_DB = os.getenv("TEST_FAILURE_DB", "storage/test_failures.db")
+BATCH_SIZE = 1000
+
 
 @dataclass
 class TestFailure:
@@ -36,13 +42,118 @@ class TestFailure:
             self.created_at = datetime.utcnow().isoformat()
 
 
+FAILURE_COLUMNS = [field.name for field in fields(TestFailure)]
+
+
+class FailureStore:
+    """SQLite store of test failures, indexed by test name and status
+
+    Rows keep ingestion order through their rowid, so a transition always
+    picks the oldest failure of a test in the expected status, as the
+    original list scan did, through an index lookup instead of a scan.
+    """
+
+    def __init__(self, path: str = TEST_FAILURE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(FAILURE_COLUMNS)
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS failures (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    {columns}
+                );
+                CREATE INDEX IF NOT EXISTS failures_test_status
+                    ON failures (test_name, status, id);
+                CREATE INDEX IF NOT EXISTS failures_status
+                    ON failures (status, id);
+                """)
+            self._conn = conn
+        return self._conn
+
+    def add_many(self, failures: Iterable[TestFailure]) -> int:
+        placeholders = ", ".join("?" * len(FAILURE_COLUMNS))
+        rows = [
+            [getattr(failure, column) for column in FAILURE_COLUMNS]
+            for failure in failures
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO failures ({', '.join(FAILURE_COLUMNS)}) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+        return len(rows)
+
+    def add(self, failure: TestFailure) -> None:
+        self.add_many([failure])
+
+    def transition(
+        self, test_name: str, from_status: str, assignments: str, params=()
+    ) -> bool:
+        """Apply assignments to the oldest failure of test_name in from_status"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE failures SET {assignments} WHERE id = ("
+                    "SELECT id FROM failures WHERE test_name = ? AND status = ? "
+                    "ORDER BY id LIMIT 1)",
+                    (*params, test_name, from_status),
+                )
+        return cursor.rowcount > 0
+
+    def iter_failures(self, status: Optional[str] = None) -> Iterator[TestFailure]:
+        """Failures in ingestion order, fetched in keyset-paginated batches
+
+        The lock is only held per batch, so approvals are not blocked while
+        a large export is written out.
+        """
+        query = f"SELECT id, {', '.join(FAILURE_COLUMNS)} FROM failures WHERE id > ?"
+        if status is not None:
+            query += " AND status = ?"
+        query += " ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            params = (last_id,) if status is None else (last_id, status)
+            with self._lock:
+                rows = (
+                    self._connection().execute(query, (*params, BATCH_SIZE)).fetchall()
+                )
+            for row in rows:
+                yield TestFailure(**{key: row[key] for key in FAILURE_COLUMNS})
+            if len(rows) < BATCH_SIZE:
+                return
+            last_id = rows[-1]["id"]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute("SELECT status, COUNT(*) FROM failures GROUP BY status")
+                .fetchall()
+            )
+        return {status: count for status, count in rows}
+
+
 class TestFailureIngestor:
     """
     Ingests test failures and generates structured fixes
     """
 
-    def __init__(self):
-        self.failures_db: List[TestFailure] = []
+    def __init__(self, store: Optional[FailureStore] = None):
+        self.store = store or FailureStore()
         self.fix_patterns = self._load_fix_patterns()
 
     def ingest_failure(self, failure_data: Dict[str, Any]) -> TestFailure:
@@ -70,7 +181,7 @@ class TestFailureIngestor:
         failure.suggested_fix = self._generate_fix_suggestion(failure)
 
         # Store failure
-        self.failures_db.append(failure)
+        self.store.add(failure)
 
         logger.info(f"Generated fix suggestion for {failure.test_name}")
         return failure
@@ -168,38 +279,50 @@ from main import app  # noqa: E402
 # Review the test and service implementation for compatibility
 """
 
+    @property
+    def failures_db(self) -> List[TestFailure]:
+        """All stored failures; prefer iter_failures for large stores"""
+        return list(self.store.iter_failures())
+
     def get_pending_failures(self) -> List[TestFailure]:
         """Get all pending failures awaiting approval"""
-        return [f for f in self.failures_db if f.status == "pending_approval"]
+        return list(self.store.iter_failures("pending_approval"))
 
     def approve_failure(self, test_name: str) -> bool:
         """Approve a failure fix"""
-        for failure in self.failures_db:
-            if failure.test_name == test_name and failure.status == "pending_approval":
-                failure.status = "approved"
-                failure.approved_at = datetime.utcnow().isoformat()
-                logger.info(f"Approved fix for {test_name}")
-                return True
+        if self.store.transition(
+            test_name,
+            "pending_approval",
+            "status = 'approved', approved_at = ?",
+            (datetime.utcnow().isoformat(),),
+        ):
+            logger.info(f"Approved fix for {test_name}")
+            return True
         return False
 
     def reject_failure(self, test_name: str, reason: str = "") -> bool:
         """Reject a failure fix"""
-        for failure in self.failures_db:
-            if failure.test_name == test_name and failure.status == "pending_approval":
-                failure.status = "rejected"
-                failure.suggested_fix = f"REJECTED: {reason}\n\n{failure.suggested_fix}"
-                logger.info(f"Rejected fix for {test_name}: {reason}")
-                return True
+        if self.store.transition(
+            test_name,
+            "pending_approval",
+            "status = 'rejected', "
+            "suggested_fix = ? || COALESCE(suggested_fix, 'None')",
+            (f"REJECTED: {reason}\n\n",),
+        ):
+            logger.info(f"Rejected fix for {test_name}: {reason}")
+            return True
         return False
 
     def mark_applied(self, test_name: str) -> bool:
         """Mark a fix as applied"""
-        for failure in self.failures_db:
-            if failure.test_name == test_name and failure.status == "approved":
-                failure.status = "applied"
-                failure.applied_at = datetime.utcnow().isoformat()
-                logger.info(f"Marked fix as applied for {test_name}")
-                return True
+        if self.store.transition(
+            test_name,
+            "approved",
+            "status = 'applied', applied_at = ?",
+            (datetime.utcnow().isoformat(),),
+        ):
+            logger.info(f"Marked fix as applied for {test_name}")
+            return True
         return False
 
     def _load_fix_patterns(self) -> Dict[str, Any]:
@@ -225,14 +348,34 @@ from main import app  # noqa: E402
 
     def export_failures(self) -> str:
         """Export failures as JSON for Katie Logic"""
-        return json.dumps([asdict(f) for f in self.failures_db], indent=2)
+        return json.dumps([asdict(f) for f in self.store.iter_failures()], indent=2)
 
     def import_failures(self, failures_json: str) -> None:
         """Import failures from JSON"""
         failures_data = json.loads(failures_json)
-        for failure_data in failures_data:
-            failure = TestFailure(**failure_data)
-            self.failures_db.append(failure)
+        self.store.add_many(TestFailure(**data) for data in failures_data)
+
+    def export_failures_jsonl(self, stream: TextIO) -> int:
+        """Write one failure per line, without building the whole export"""
+        count = 0
+        for failure in self.store.iter_failures():
+            stream.write(json.dumps(asdict(failure)) + "\n")
+            count += 1
+        return count
+
+    def import_failures_jsonl(self, stream: TextIO) -> int:
+        """Read failures written by export_failures_jsonl, in batches"""
+        count = 0
+        batch: List[TestFailure] = []
+        for line in stream:
+            if line.strip():
+                batch.append(TestFailure(**json.loads(line)))
+            if len(batch) >= BATCH_SIZE:
+                count += self.store.add_many(batch)
+                batch = []
+        count += self.store.add_many(batch)
+        logger.info(f"Imported {count} test failures")
+        return count
 
 
 # Global instance
@@ -6,9 +6,10 @@ import os
 import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from unittest.mock import patch, MagicMock  # noqa: E402
+from unittest.mock import patch, AsyncMock, MagicMock  # noqa: E402
 from fastapi.testclient import TestClient  # noqa: E402
 from main import app  # noqa: E402
+from fetcher import AsyncFetcher  # noqa: E402
 from scrape_sources import WhisWebScraper  # noqa: E402
 from send_to_sanitize import WhisSanitizeSender  # noqa: E402
 from scrape_agent_logs import AgentLogScraper  # noqa: E402
@@ -258,37 +259,53 @@ class TestWhisWebScraper:
 
     def test_scrape_dev_blogs(self):
         """Test dev blog scraping"""
-        with patch.object(WhisWebScraper, "_scrape_rss_feed") as mock_rss:
+        import asyncio
+        from datetime import datetime
+
+        with patch.object(
+            WhisWebScraper, "_scrape_rss_feed", new_callable=AsyncMock
+        ) as mock_rss:
             mock_rss.return_value = [
                 {
                     "title": "Test Blog Post",
                     "link": "https://test.com/post",
                     "summary": "Test summary",
-                    "published": "2024-01-01T10:00:00Z",
+                    "published": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 }
             ]
 
             scraper = WhisWebScraper()
-            results = scraper.scrape_dev_blogs(hours_back=24)
+            results = asyncio.run(scraper.scrape_dev_blogs(hours_back=24))
 
             assert len(results) > 0
             assert results[0]["title"] == "Test Blog Post"
+            assert mock_rss.await_count == len(scraper.dev_sources)
 
     def test_scrape_github_trending(self):
         """Test GitHub trending scraping"""
-        with patch.object(WhisWebScraper, "session") as mock_session:
-            mock_response = MagicMock()
-            mock_response.content = (
-                '<html><body><article class="Box-row"><h2 class="h3">test/repo</h2>'
-                "<p>Test description</p></article></body></html>"
-            )
-            mock_response.raise_for_status.return_value = None
-            mock_session.get.return_value = mock_response
+        import asyncio
+
+        content = (
+            b'<html><body><article class="Box-row"><h2 class="h3">test/repo</h2>'
+            b"<p>Test description</p></article></body></html>"
+        )
+
+        async def get_parsed(url, parser, parse):
+            return parse(content)
+
+        with patch.object(
+            AsyncFetcher, "get_parsed", new_callable=AsyncMock
+        ) as mock_get_parsed:
+            mock_get_parsed.side_effect = get_parsed
 
             scraper = WhisWebScraper()
-            results = scraper.scrape_github_trending()
+            results = asyncio.run(scraper.scrape_github_trending())
 
-            assert len(results) > 0
+            assert len(results) == len(scraper.github_trending)
+            assert {result["category"] for result in results} == set(
+                scraper.github_trending
+            )
+            assert all(result["source"] == "github_trending" for result in results)
 
 
 class TestWhisSanitizeSender:
@@ -319,19 +336,85 @@ class TestWhisSanitizeSender:
         assert formatted[0]["source"] == "whis_webscraper"
 
     def test_send_to_sanitize(self):
-        """Test sending data to sanitize"""
-        with patch.object(WhisSanitizeSender, "session") as mock_session:
-            mock_response = MagicMock()
-            mock_response.json.return_value = {"status": "success", "id": "test-123"}
-            mock_response.raise_for_status.return_value = None
-            mock_session.post.return_value = mock_response
-
-            sender = WhisSanitizeSender()
-            formatted_items = [{"title": "Test", "content": "Test content"}]
+        """Items go out in gzip batches and come back with per-item status"""
+        import gzip
+        import json
+
+        sender = WhisSanitizeSender(batch_size=2, concurrency=2)
+        bodies = []
+
+        def post(url, data, headers, timeout):
+            assert url.endswith("/api/sanitize/ingest")
+            assert headers["Content-Encoding"] == "gzip"
+            items = json.loads(gzip.decompress(data))["items"]
+            bodies.append(items)
+            response = MagicMock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = {
+                "results": [
+                    (
+                        {"status": "error", "error": "bad"}
+                        if item["title"] == "Bad"
+                        else {"status": "accepted", "forward_id": 7}
+                    )
+                    for item in items
+                ]
+            }
+            return response
 
+        with patch.object(sender.session, "post", side_effect=post):
+            formatted_items = [
+                {"title": "Test", "content": "Test content"},
+                {"title": "Bad", "content": ""},
+                {"title": "Other", "content": "More content"},
+            ]
             results = sender.send_to_sanitize(formatted_items)
-            assert results["success_count"] == 1
-            assert results["error_count"] == 0
+
+        assert sorted(len(items) for items in bodies) == [1, 2]
+        assert results["success_count"] == 2
+        assert results["error_count"] == 1
+        assert results["errors"] == [{"title": "Bad", "error": "bad"}]
+
+    def test_send_batch_suppresses_repeated_content(self, tmp_path):
+        """Exact and near duplicates are dropped, within a run and across runs"""
+        from content_fingerprints import ContentFingerprintStore
+
+        store = ContentFingerprintStore(str(tmp_path / "fingerprints.db"))
+        sender = WhisSanitizeSender(fingerprints=store)
+        summary = " ".join(
+            f"Kubernetes 1.31 change {number} graduates feature {number * 7} to "
+            f"stable and fixes issue {number * 13} in the kubelet"
+            for number in range(12)
+        )
+        post = {"title": "K8s 1.31", "summary": summary, "source": "cncf"}
+        near = dict(post, summary=summary.replace("issue 13 ", "bug 13 "))
+        other = {"title": "Terraform 1.9", "summary": "Input validation improves"}
+
+        def accept(formatted_items):
+            return {
+                "processed_items": [
+                    {"index": index} for index in range(len(formatted_items))
+                ]
+            }
+
+        with patch.object(sender, "send_to_sanitize", side_effect=accept) as send:
+            first = sender.send_batch_to_sanitize(
+                {"blog_posts": [post, near, post], "github_trending": [other]}
+            )
+            assert len(send.call_args[0][0]) == 2
+            second = sender.send_batch_to_sanitize(
+                {"blog_posts": [near], "github_trending": [other]}
+            )
+            assert send.call_args[0][0] == []
+
+        assert first["summary"]["duplicates_suppressed"] == {
+            "blog_posts": 2,
+            "github_trending": 0,
+        }
+        assert second["summary"]["duplicates_suppressed"] == {
+            "blog_posts": 1,
+            "github_trending": 1,
+        }
 
 
 class TestAgentLogScraper:
@@ -365,6 +448,42 @@ class TestAgentLogScraper:
         assert patterns["summary"]["pattern_counts"]["errors"] == 1
         assert patterns["summary"]["pattern_counts"]["successes"] == 1
 
+    def test_intelligence_tags_and_bounded_examples(self):
+        """Every tag is counted while stored examples stay capped"""
+        import scrape_agent_logs
+        from keyword_classifier import KeywordClassifier
+
+        classifier = KeywordClassifier({"a": ["API", "call"], "b": ["apical"]})
+        assert classifier.classify("the apicall failed") == {"a", "b"}
+        assert classifier.classify("nothing here") == set()
+
+        scraper = AgentLogScraper()
+        log_entries = [
+            {"message": "API latency error", "level": "INFO"},
+            {"message": "request completed", "level": "INFO"},
+            {"message": "request completed", "level": "DEBUG"},
+            {"message": "disk full", "level": "CRITICAL"},
+        ] * 3
+        with patch.object(scrape_agent_logs, "MAX_PATTERN_EXAMPLES", 2):
+            patterns = scraper.extract_intelligence_patterns(log_entries)
+
+        summary = patterns["summary"]
+        assert summary["pattern_counts"] == {
+            "errors": 6,
+            "successes": 3,
+            "performance": 0,
+            "usage": 3,
+            "recommendations": 0,
+        }
+        assert summary["tag_counts"] == {
+            "error": 6,
+            "success": 6,
+            "performance": 3,
+            "usage": 9,
+            "recommendation": 0,
+        }
+        assert len(patterns["error_patterns"]) == 2
+
     def test_generate_intelligence_report(self):
         """Test intelligence report generation"""
         with (
@@ -387,3 +506,247 @@ class TestAgentLogScraper:
             assert report["report_type"] == "agent_intelligence"
             assert "insights" in report
             assert "recommendations" in report
+
+    def test_incremental_tail_resumes_and_handles_rotation(self, tmp_path):
+        """Incremental scrapes only parse lines written since the last one"""
+        logs = tmp_path / "logs"
+        logs.mkdir()
+        log_file = logs / "katie.log"
+        checkpoint_path = str(tmp_path / "checkpoints.json")
+
+        def line(message):
+            return f"2099-01-01 10:00:00 INFO {message}\n"
+
+        def scrape():
+            scraper = AgentLogScraper(str(logs), checkpoint_path=checkpoint_path)
+            entries = scraper.scrape_agent_logs(hours_back=1, incremental=True)
+            return [(e["message"], e["line_number"]) for e in entries]
+
+        log_file.write_text(line("deployment one") + line("deployment tw"))
+        assert scrape() == [("deployment one", 1), ("deployment tw", 2)]
+        assert scrape() == []
+
+        # A line still being written is left for the next scrape
+        with open(log_file, "a") as f:
+            f.write(line("scale three") + "2099-01-01 10:00:00 INFO scale fo")
+        assert scrape() == [("scale three", 3)]
+
+        # Rotation: the rest of the renamed file, then the new one from the top
+        with open(log_file, "a") as f:
+            f.write("ur\n")
+        os.rename(log_file, logs / "katie.log.1")
+        log_file.write_text(line("deployment five"))
+        assert scrape() == [("scale four", 4), ("deployment five", 1)]
+
+        # copytruncate: the file shrank below the checkpoint
+        log_file.write_text(line("error six"))
+        assert scrape() == [("error six", 1)]
+
+        # A rotated file is closed, so its unterminated last line is whole
+        with open(log_file, "a") as f:
+            f.write("2099-01-01 10:00:00 INFO scale seven")
+        assert scrape() == []
+        os.rename(log_file, logs / "katie.log.1")
+        log_file.write_text("")
+        assert scrape() == [("scale seven", 2)]
+
+    def test_parallel_scrape_merges_archives_in_time_order(self, tmp_path):
+        """Files of all agents, gzip archives included, merge by timestamp"""
+        import gzip
+        from concurrent.futures import ProcessPoolExecutor
+
+        with gzip.open(tmp_path / "katie.log.1.gz", "wt") as f:
+            f.write("2099-01-01 09:00:00 INFO deployment archived\n")
+        (tmp_path / "katie.log").write_text(
+            "2099-01-01 11:00:00 INFO deployment current\n"
+        )
+        (tmp_path / "whis.log").write_text(
+            "2099-01-01T08:00:00Z INFO training started\n"
+            "2099-01-01 10:00:00 INFO training done\n"
+        )
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            scraper = AgentLogScraper(
+                str(tmp_path),
+                checkpoint_path=str(tmp_path / "checkpoints.json"),
+                pool=pool,
+            )
+            entries = scraper.scrape_agent_logs(hours_back=1)
+
+        messages = [entry["message"] for entry in entries]
+        assert set(messages) == {
+            "deployment archived",
+            "deployment current",
+            "training started",
+            "training done",
+        }
+        stamps = [entry["timestamp"].timestamp() for entry in entries]
+        assert stamps == sorted(stamps)
+
+    def test_log_line_parser(self):
+        """Formats are detected per line and bad timestamps are never 'now'"""
+        from datetime import date, datetime, timezone
+        from log_parser import LogLineParser
+
+        parser = LogLineParser(today=date(2025, 6, 1))
+        iso = parser.parse("2025-06-01T10:00:00.5+02:00 ERROR pod crashed\n")
+        assert iso["timestamp"] == datetime(2025, 6, 1, 8, 0, 0, 500000, timezone.utc)
+        assert (iso["level"], iso["message"]) == ("ERROR", "pod crashed")
+        standard = parser.parse("2025-06-01  10:00:00 INFO scaled")
+        assert standard["timestamp"] == datetime(2025, 6, 1, 10, 0, 0)
+        clock = parser.parse("10:00:00 scaled again")
+        assert (clock["timestamp"], clock["level"]) == (
+            datetime(2025, 6, 1, 10, 0, 0),
+            "INFO",
+        )
+        assert parser.parse("   ") is None
+        assert parser.parse("Traceback (most recent call last):")["timestamp"] is None
+        assert parser.parse("2025-02-30 10:00:00 INFO bad date")["timestamp"] is None
+
+
+class TestAsyncFetcher:
+    def test_hosts_run_in_parallel_but_each_is_rate_limited(self):
+        """Test per-host token buckets and cross-host concurrency"""
+        import asyncio
+        import time
+
+        import httpx
+        from fetcher import AsyncFetcher
+
+        seen = []
+
+        async def handler(request):
+            seen.append((request.url.host, time.monotonic()))
+            return httpx.Response(200, text="ok")
+
+        fetcher = AsyncFetcher(
+            per_host_rate=10.0, transport=httpx.MockTransport(handler)
+        )
+        urls = [
+            f"https://{host}/{n}" for host in ("a.test", "b.test") for n in range(3)
+        ]
+
+        async def fetch_all():
+            responses = await asyncio.gather(*(fetcher.get(url) for url in urls))
+            await fetcher.aclose()
+            return responses
+
+        start = time.monotonic()
+        responses = asyncio.run(fetch_all())
+        elapsed = time.monotonic() - start
+
+        assert all(response.status_code == 200 for response in responses)
+        for host in ("a.test", "b.test"):
+            times = [t for h, t in seen if h == host]
+            assert times[-1] - times[0] >= 0.18  # 3 requests at 10/s, burst 1
+        assert elapsed < 0.5  # Both hosts were paced concurrently
+
+    def test_conditional_get_reuses_parse_on_304(self, tmp_path):
+        """Test ETag revalidation short-circuits parsing"""
+        import asyncio
+        import gzip
+
+        import httpx
+        from fetcher import AsyncFetcher
+        from http_cache import HttpCache
+
+        body = b"<rss>feed</rss>" * 100
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+        parses = []
+
+        def parse(content):
+            parses.append(content)
+            return {"length": len(content)}
+
+        fetcher = AsyncFetcher(
+            per_host_rate=1000.0,
+            transport=httpx.MockTransport(handler),
+            cache=HttpCache(str(tmp_path)),
+        )
+
+        async def fetch_twice():
+            first = await fetcher.get_parsed("https://feeds.test/rss", "len", parse)
+            second = await fetcher.get_parsed("https://feeds.test/rss", "len", parse)
+            await fetcher.aclose()
+            return first, second
+
+        first, second = asyncio.run(fetch_twice())
+
+        assert first == second == {"length": len(body)}
+        assert requests_seen == [None, '"v1"']
+        assert len(parses) == 1
+        assert fetcher.stats["not_modified"] == 1
+        (cached_body,) = tmp_path.glob("*.body.gz")
+        assert gzip.decompress(cached_body.read_bytes()) == body
+
+    def test_new_event_loop_closes_the_previous_client(self):
+        """Test rebinding to another loop does not leak the old pool"""
+        import asyncio
+
+        import httpx
+        from fetcher import AsyncFetcher
+
+        fetcher = AsyncFetcher(
+            per_host_rate=1000.0,
+            transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+        )
+
+        async def fetch():
+            await fetcher.get("https://a.test/")
+            return fetcher._client
+
+        first = asyncio.run(fetch())
+        second = asyncio.run(fetch())
+
+        assert first is not second
+        assert first.is_closed and not second.is_closed
+        asyncio.run(fetcher.aclose())
+
+
+class TestFailureIngestion:
+    def test_transitions_and_jsonl_round_trip(self, tmp_path):
+        """Failures persist, move through approval and survive a JSONL export"""
+        import io
+
+        from test_failure_ingestor import FailureStore, TestFailureIngestor
+
+        ingestor = TestFailureIngestor(FailureStore(str(tmp_path / "failures.db")))
+        for test_name in ["test_scale", "test_scale", "test_certs"]:
+            ingestor.ingest_failure(
+                {
+                    "test_name": test_name,
+                    "service": "katie",
+                    "failure_type": "keyerror",
+                    "assertion_failed": "KeyError: 'replicas'",
+                }
+            )
+
+        assert ingestor.approve_failure("test_scale")
+        assert ingestor.reject_failure("test_certs", "flaky")
+        assert not ingestor.mark_applied("test_certs")
+        assert ingestor.mark_applied("test_scale")
+        assert [f.test_name for f in ingestor.get_pending_failures()] == ["test_scale"]
+
+        exported = io.StringIO()
+        assert ingestor.export_failures_jsonl(exported) == 3
+
+        reopened = TestFailureIngestor(FailureStore(str(tmp_path / "failures.db")))
+        assert reopened.store.count_by_status() == {
+            "applied": 1,
+            "pending_approval": 1,
+            "rejected": 1,
+        }
+
+        copy = TestFailureIngestor(FailureStore(str(tmp_path / "copy.db")))
+        exported.seek(0)
+        assert copy.import_failures_jsonl(exported) == 3
+        assert copy.export_failures() == ingestor.export_failures()
+        rejected = next(copy.store.iter_failures("rejected"))
+        assert rejected.suggested_fix.startswith("REJECTED: flaky\n\n")
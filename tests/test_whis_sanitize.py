@@ -25,3 +25,253 @@ def test_invalid_payload():
     payload = {"input_type": "fixlog"}  # missing content
     response = client.post("/api/sanitize", json=payload)
     assert response.status_code == 422
+
+
+def test_segment_store_rotates_and_resumes(tmp_path):
+    from utils.segment_store import SegmentWriter, read_records
+
+    writer = SegmentWriter(str(tmp_path), max_segment_bytes=120)
+    positions = [writer.append({"input_type": "qna", "n": n}) for n in range(6)]
+
+    records = list(read_records(str(tmp_path)))
+    assert [record["n"] for record, _, _ in records] == list(range(6))
+    assert [position for _, position, _ in records] == positions
+    assert len({segment for segment, _ in positions}) > 1
+
+    _, _, resume_at = records[3]
+    assert [r["n"] for r, _, _ in read_records(str(tmp_path), resume_at)] == [4, 5]
+
+
+def test_compiled_scrubber_matches_sequential_rules():
+    import re
+
+    from sanitizer.logic import SCRUB_RULES, SECRET_WORDS, Scrubber
+
+    def sequential(text, redact):
+        if redact:
+            for word in SECRET_WORDS:
+                text = text.replace(word, "[redacted]")
+        for pattern, replacement, _ in SCRUB_RULES:
+            text = re.sub(pattern, replacement, text)
+        return text
+
+    samples = [
+        "/10.0.0.1",
+        "10.0.0.1@host.com and bob@mail.example.com",
+        "/home/prod/file.txt\nns-prod.svc error-deadbeef01",
+        "ab.cd/ef.txt secretoken prod.example.com",
+        "plain line. Next line\n\nno matches here",
+    ]
+    scrubber = Scrubber()
+    for text in samples:
+        assert scrubber.scrub(text) == sequential(text, False)
+        assert scrubber.redact(text) == sequential(text, True)
+
+
+def test_literal_filter_replaces_leftmost_longest(tmp_path):
+    from sanitizer import processor
+    from sanitizer.literal_filter import LiteralFilter
+
+    literal_filter = LiteralFilter({"he": "<he>", "she": "<she>", "hers": "<hers>"})
+    assert literal_filter.replace("ushers and he") == "u<she>rs and <he>"
+
+    word_list = tmp_path / "profanity.txt"
+    word_list.write_text("# comment\nfrak\n\nsmeg\n")
+    try:
+        assert processor.reload_profanity_filter(str(word_list)) == 2
+        assert processor.remove_profanity("frak this smeg") == (
+            "[censored] this [censored]"
+        )
+    finally:
+        processor.reload_profanity_filter()
+    assert processor.remove_garbage("a#$%&*~b") == "ab"
+
+
+def test_youtube_transcript_streams_into_segment(tmp_path, monkeypatch):
+    from sanitizer import processor
+    from utils import file_writer
+    from utils.segment_store import SegmentWriter, read_records
+
+    monkeypatch.setattr(file_writer, "_writer", SegmentWriter(str(tmp_path)))
+    monkeypatch.setattr(processor, "INLINE_TEXT_MAX_CHARS", 20)
+    raw_text = "ping 10.0.0.1 #$%&*~\r\nhello badword1\n\nping 10.0.0.1\nbye\n"
+
+    result = processor.sanitize_input("youtube", {"raw_text": raw_text})
+
+    cleaned = "ping <IP_ADDR>\nhello [censored]\nbye"
+    assert result["sanitization_stats"]["lines"] == 3
+    assert result["cleaned_text"] == cleaned[:20]
+    assert result["cleaned_text_truncated"] is True
+    ((record, position, _),) = read_records(str(tmp_path))
+    assert record["payload"]["cleaned_text"] == cleaned
+    assert list(position) == result["segment_position"]
+
+
+def test_truncated_transcript_is_forwarded_whole(tmp_path, monkeypatch):
+    import json
+
+    from routes import clean
+    from sanitizer import processor
+    from utils import file_writer
+    from utils.forwarder import ForwardQueue, WhisForwarder
+    from utils.segment_store import SegmentWriter
+
+    monkeypatch.setattr(file_writer, "_writer", SegmentWriter(str(tmp_path)))
+    monkeypatch.setattr(processor, "INLINE_TEXT_MAX_CHARS", 10)
+    forwarder = WhisForwarder(ForwardQueue(str(tmp_path / "queue.db")))
+    monkeypatch.setattr(clean, "get_forwarder", lambda: forwarder)
+
+    response = client.post(
+        "/api/sanitize/",
+        json={"input_type": "youtube", "payload": {"raw_text": "hello\nworld\n"}},
+    )
+
+    assert response.json()["sanitized"]["cleaned_text"] == "hello\nworl"
+    ((_, body, _),) = forwarder.queue.due(10)
+    payload = json.loads(body)["payload"]
+    assert payload["cleaned_text"] == "hello\nworld"
+    assert payload["sanitization_stats"]["lines"] == 2
+
+
+def test_sanitize_batch_keeps_order_and_isolates_failures(tmp_path, monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from sanitizer import processor
+    from utils import file_writer
+    from utils.segment_store import SegmentWriter, read_records
+
+    monkeypatch.setattr(file_writer, "_writer", SegmentWriter(str(tmp_path)))
+    items = [("qna", {"question": f"is 10.0.0.{n} up?"}) for n in range(20)]
+    items.insert(5, ("qna", None))
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = processor.sanitize_batch(items, pool=pool)
+
+    assert results[5]["status"] == "error"
+    sanitized = [result["sanitized"] for result in results if "sanitized" in result]
+    assert sanitized == [{"question": "is <IP_ADDR> up?"}] * 20
+    assert len(list(read_records(str(tmp_path)))) == 20
+
+
+def test_filter_reload_reaches_batch_workers(tmp_path, monkeypatch):
+    from sanitizer import processor
+    from utils import file_writer
+    from utils.segment_store import SegmentWriter
+
+    monkeypatch.setattr(file_writer, "_writer", SegmentWriter(str(tmp_path)))
+    monkeypatch.setattr(processor, "SANITIZE_WORKERS", 1)
+    items = [("youtube", {"raw_text": "frak badword1"})]
+    word_list = tmp_path / "profanity.txt"
+    word_list.write_text("frak\n")
+    try:
+        # Start the workers with the default list before reloading
+        (before,) = processor.sanitize_batch(items)
+        assert before["sanitized"]["cleaned_text"] == "frak [censored]"
+
+        processor.reload_profanity_filter(str(word_list))
+        (after,) = processor.sanitize_batch(items)
+        assert after["sanitized"]["cleaned_text"] == "[censored] badword1"
+    finally:
+        processor.reload_profanity_filter()
+        processor.retire_process_pool()
+
+
+def test_batch_retries_on_pool_retired_by_reload(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sanitizer import processor
+    from utils import file_writer
+    from utils.segment_store import SegmentWriter
+
+    monkeypatch.setattr(file_writer, "_writer", SegmentWriter(str(tmp_path)))
+    retired, fresh = ThreadPoolExecutor(max_workers=1), ThreadPoolExecutor(1)
+    retired.shutdown()
+    pools = iter([retired, fresh])
+    monkeypatch.setattr(processor, "get_process_pool", lambda: next(pools))
+
+    (result,) = processor.sanitize_batch([("qna", {"question": "is 10.0.0.1 up?"})])
+
+    assert result["sanitized"] == {"question": "is <IP_ADDR> up?"}
+    fresh.shutdown()
+
+
+def test_forwarder_retries_and_keeps_rejected_payloads(tmp_path, monkeypatch):
+    import asyncio
+    import json
+
+    import httpx
+    from utils import forwarder as forwarder_module
+    from utils.forwarder import ForwardQueue, WhisForwarder
+
+    calls = []
+
+    def whis(request):
+        payload = json.loads(request.content)["payload"]
+        calls.append(payload)
+        if payload.get("bad"):
+            return httpx.Response(422)
+        if payload.get("flaky") and calls.count(payload) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(forwarder_module, "BACKOFF_BASE_SECONDS", 0.0)
+    forwarder = WhisForwarder(ForwardQueue(str(tmp_path / "queue.db")))
+    forwarder.enqueue_many([("qna", {"n": 1}), ("qna", {"flaky": 1})])
+    forwarder.enqueue("qna", {"bad": 1})
+
+    async def drain():
+        transport = httpx.MockTransport(whis)
+        async with httpx.AsyncClient(transport=transport) as client:
+            assert await forwarder.drain_once(client) == 3
+            assert forwarder.metrics()["queue_depth"] == 1
+            assert await forwarder.drain_once(client) == 1
+            assert await forwarder.drain_once(client) == 0
+
+    asyncio.run(drain())
+    metrics = forwarder.metrics()
+    assert metrics["delivered"] == 2
+    assert metrics["failed_attempts"] == 1
+    assert metrics["dead_letters"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_bulk_ingest_accepts_gzip_and_reports_each_item(tmp_path, monkeypatch):
+    import gzip
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+
+    from routes import clean
+    from sanitizer import processor
+    from utils import file_writer
+    from utils.forwarder import ForwardQueue, WhisForwarder
+    from utils.segment_store import SegmentWriter
+
+    monkeypatch.setattr(file_writer, "_writer", SegmentWriter(str(tmp_path)))
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(processor, "get_process_pool", lambda: pool)
+    forwarder = WhisForwarder(ForwardQueue(str(tmp_path / "queue.db")))
+    monkeypatch.setattr(clean, "get_forwarder", lambda: forwarder)
+
+    items = [
+        {"title": f"post {n}", "content": "mail ops@example.com"} for n in range(3)
+    ]
+    body = gzip.compress(
+        json.dumps({"source": "whis_webscraper", "items": items}).encode()
+    )
+    response = client.post(
+        "/api/sanitize/ingest", content=body, headers={"Content-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["count"], data["accepted"], data["errors"]) == (3, 3, 0)
+    assert [result["status"] for result in data["results"]] == ["accepted"] * 3
+    assert forwarder.metrics()["queue_depth"] == 3
+
+    bad = client.post(
+        "/api/sanitize/ingest",
+        content=b"not gzip",
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert bad.status_code == 400
+    assert client.post("/api/sanitize/ingest", json={"items": "x"}).status_code == 422
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from fastapi.testclient import TestClient
 
 try:
@@ -16,3 +18,148 @@ def test_generate_rune():
     response = client.post("/api/v1/smithing/generate-rune", json=payload)
     assert response.status_code in [200, 201]
     assert "rune" in response.json() or "result" in response.json()
+
+
+def test_incremental_orb_generation_merges_new_completions(tmp_path, monkeypatch):
+    import csv
+    import catalog_store
+    import main as smithing
+
+    for name, filename in [
+        ("TRAINING_QUEUE_PATH", "training_queue.csv"),
+        ("TRAINING_CHECKPOINT_PATH", "checkpoint.json"),
+    ]:
+        monkeypatch.setattr(smithing, name, str(tmp_path / filename))
+    store = catalog_store.CatalogStore(str(tmp_path / "smithing.db"))
+    monkeypatch.setattr(catalog_store, "_store", store)
+
+    fieldnames = ["task_id", "tools_used", "commands", "status", "tags"]
+    fieldnames += ["solution_summary", "completed_at"]
+
+    def write_queue(rows):
+        with open(smithing.TRAINING_QUEUE_PATH, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def task(task_id, tags, status="completed", completed_at="2025-01-01T10:00:00"):
+        return {
+            "task_id": task_id,
+            "tools_used": "kubectl",
+            "commands": f"kubectl apply -f {task_id}.yaml",
+            "status": status,
+            "tags": tags,
+            "solution_summary": f"fixed {task_id}",
+            "completed_at": completed_at if status == "completed" else "",
+        }
+
+    rows = [
+        task("t1", "kubernetes"),
+        task("t2", "terraform"),
+        task("t3", "helm", "Pending"),
+    ]
+    write_queue(rows)
+    first = client.post("/process-training-queue?incremental=true").json()
+    assert first["orbs_generated"] == 2
+
+    rows[2] = task("t3", "kubernetes", completed_at="2025-01-01T11:00:00")
+    write_queue(rows)
+    second = client.post("/generate-orbs?incremental=true").json()
+    assert second["mode"] == "incremental"
+    assert second["new_completions"] == 1
+    assert [orb["category"] for orb in second["orbs"]] == ["kubernetes"]
+    assert second["orbs"][0]["knowledge_base"]["task_count"] == 2
+
+    assert client.post("/generate-orbs?incremental=true").json()["orbs_generated"] == 0
+    assert len(smithing.load_orbs()) == 2
+
+
+def test_catalog_pages_by_cursor_with_category_and_tag(tmp_path):
+    from catalog_store import CatalogStore
+
+    store = CatalogStore(str(tmp_path / "smithing.db"))
+    store.upsert_orbs(
+        {
+            "orb_id": f"orb-{n:02d}",
+            "category": "kubernetes" if n % 2 else "terraform",
+            "tags": ["kubectl"] if n % 3 == 0 else [],
+            "name": f"v1-{n}",
+        }
+        for n in range(10)
+    )
+    store.upsert_orbs([{"orb_id": "orb-03", "category": "helm", "name": "v2-3"}])
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = store.list_orbs(limit=4, cursor=cursor)
+        pages.append([orb["orb_id"] for orb in page])
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert sum(pages, []) == [f"orb-{n:02d}" for n in range(10)]
+
+    kubernetes, _ = store.list_orbs(category="kubernetes")
+    assert [orb["orb_id"] for orb in kubernetes] == [
+        "orb-01",
+        "orb-05",
+        "orb-07",
+        "orb-09",
+    ]
+    tagged, _ = store.list_orbs(tag="kubectl")
+    assert [orb["orb_id"] for orb in tagged] == ["orb-00", "orb-06", "orb-09"]
+    assert store.get_orbs_by_category(["helm"])[0]["name"] == "v2-3"
+
+
+def test_catalog_reads_are_cached_and_revalidated(tmp_path, monkeypatch):
+    import catalog_store
+
+    store = catalog_store.CatalogStore(str(tmp_path / "smithing.db"))
+    monkeypatch.setattr(catalog_store, "_store", store)
+    store.upsert_orbs([{"orb_id": "orb-1", "category": "kubernetes", "tags": []}])
+
+    first = client.get("/orbs")
+    etag = first.headers["etag"]
+    assert first.json()["orbs"][0]["orb_id"] == "orb-1"
+
+    with patch.object(store, "list_orbs", side_effect=AssertionError("not cached")):
+        assert client.get("/orbs").content == first.content
+        revalidated = client.get("/orbs", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+    store.upsert_orbs([{"orb_id": "orb-2", "category": "helm", "tags": []}])
+    changed = client.get("/orbs", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["orbs"]) == 2
+
+
+def test_dedupe_runs_from_the_smithing_database(tmp_path, monkeypatch):
+    import merger
+
+    index = merger.DedupeIndex(str(tmp_path / "smithing.db"))
+    monkeypatch.setattr(merger, "_dedupe_index", index)
+    orb = {"id": "orb_1", "title": "Restart crashlooping pod in kubernetes"}
+    rune = {"id": "rune_1", "orb_id": "orb_1", "script": "kubectl delete pod web"}
+
+    merger.dedupe_and_merge("katie", orb, rune)
+    near_orb = dict(orb, id="orb_2", title=orb["title"] + "!")
+    canonical_orb, _ = merger.dedupe_and_merge("katie", near_orb, rune)
+
+    assert canonical_orb["id"] == "orb_1"
+    assert canonical_orb["occurrences"] == 2
+
+
+def test_recurrence_runs_from_the_smithing_database(tmp_path, monkeypatch):
+    import recurrence
+
+    tracker = recurrence.RecurrenceTracker(str(tmp_path / "smithing.db"))
+    monkeypatch.setattr(recurrence, "_tracker", tracker)
+    orb = {"id": "orb_1", "title": "Restart crashlooping pod in kubernetes"}
+
+    # Decay between calls keeps the score just under the count
+    for _ in range(4):
+        orb = recurrence.update_recurrence(orb)
+
+    assert orb["recurrence"] == "medium"
+    assert tracker.top(limit=1)[0]["key"] == "orb_1"